@@ -0,0 +1,115 @@
+"""
+Compares avatar decoding speed of the memoryview decoder (bonk_bot.Parsers.parse_avatar) with the previous
+decoder that sliced the buffer on every read.
+
+Run from the repository root::
+
+    python benchmarks/bench_avatar.py
+"""
+
+import base64
+import os
+import struct
+import sys
+import timeit
+from urllib.parse import quote_plus, unquote_plus
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bonk_bot.Avatar import Avatar
+from bonk_bot.Parsers import parse_avatar, parse_avatars
+
+
+def legacy_parse_avatar(avatar: str) -> Avatar:
+    """Previous implementation of parse_avatar, kept here for comparison."""
+
+    avatar = unquote_plus(avatar)
+    avatar = base64.b64decode(avatar + "==")
+
+    def peek(count, offset: int = 0):
+        nonlocal avatar
+        data = avatar[offset:count + offset]
+        avatar = avatar[offset + count:]
+        return data
+
+    _ = peek(7)
+
+    shapes_count = (int.from_bytes(peek(1), "big") - 1) // 2
+    shapes = []
+    _ = peek(3)
+    if shapes_count > 0:
+        _ = peek(6)
+        for i in range(shapes_count):
+            shape = dict()
+
+            shape["id"] = int.from_bytes(peek(1), "big")
+            shape["scale"] = struct.unpack(">f", peek(4))[0]
+            shape["angle"] = struct.unpack(">f", peek(4))[0]
+            shape["x"] = struct.unpack(">f", peek(4))[0]
+            shape["y"] = struct.unpack(">f", peek(4))[0]
+            shape["flipX"] = int.from_bytes(peek(1), "big") == 1
+            shape["flipY"] = int.from_bytes(peek(1), "big") == 1
+            shape["color"] = int.from_bytes(peek(3, 1), "big")
+
+            shapes.append(shape)
+
+            if i != shapes_count - 1:
+                peek(5)
+
+    base_color = int.from_bytes(peek(3), "big")
+    avatar = dict()
+
+    avatar["layers"] = shapes
+    avatar["bc"] = base_color
+
+    return Avatar(avatar)
+
+
+def make_avatar(layers_count: int) -> str:
+    """Builds avatar string with given amount of layers in the bonk.io avatar layout."""
+
+    data = bytearray(7)
+    data.append(layers_count * 2 + 1)
+    data += bytes(3)
+
+    if layers_count > 0:
+        data += bytes(6)
+
+        for index in range(layers_count):
+            data += struct.pack(">B4fBBx", index % 256, 1.5, index * 0.25, index * 2.0, -index * 2.0, index % 2, 0)
+            data += (0x123456 + index).to_bytes(3, "big")
+
+            if index != layers_count - 1:
+                data += bytes(5)
+
+    data += (0xABCDEF).to_bytes(3, "big")
+
+    return quote_plus(base64.b64encode(bytes(data)).decode())
+
+
+def bench(name: str, function, avatars: list, number: int) -> float:
+    seconds = timeit.timeit(lambda: [function(avatar) for avatar in avatars], number=number)
+    per_avatar = seconds / (number * len(avatars)) * 1e6
+    print(f"{name:>24}: {per_avatar:9.2f} us/avatar")
+
+    return per_avatar
+
+
+def main() -> None:
+    for layers_count in (0, 1, 4, 16, 64):
+        avatars = [make_avatar(layers_count) for _ in range(5)]
+
+        for avatar in avatars:
+            assert parse_avatar(avatar).json_data == legacy_parse_avatar(avatar).json_data
+
+        number = max(10, 20000 // (layers_count + 1))
+        print(f"{layers_count} layers, {number} rounds of {len(avatars)} avatars")
+        legacy = bench("legacy parse_avatar", legacy_parse_avatar, avatars, number)
+        current = bench("parse_avatar", parse_avatar, avatars, number)
+        seconds = timeit.timeit(lambda: parse_avatars(avatars), number=number)
+        print(f"{'parse_avatars':>24}: {seconds / (number * len(avatars)) * 1e6:9.2f} us/avatar")
+        print(f"{'speedup':>24}: {legacy / current:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
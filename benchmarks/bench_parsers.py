@@ -0,0 +1,170 @@
+"""
+Microbenchmarks of hot parsing functions: parse_avatar (login, every player join), db_id_to_date, team_from_number
+(every team change), mode_from_short_name (every mode change and lobby load) and BonkBot.get_level.
+
+Every function runs over a seeded random stream of realistic inputs. Reported numbers:
+
+- ops/s: calls per second, best of several rounds
+- retained B/op: traced memory that is still allocated after the call while its results are kept
+- peak B/call: the biggest traced memory growth during one call
+
+Run from the repository root::
+
+    python benchmarks/bench_parsers.py --output parsers.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable, Dict, Union
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bonk_bot.Avatar import Avatar
+from bonk_bot.BonkBot import BonkBot
+from bonk_bot.Parsers import (
+    _load_db_ids,
+    db_id_to_date,
+    db_ids_to_dates,
+    mode_from_short_name,
+    parse_avatar,
+    team_from_number
+)
+
+STREAM_SIZE = 1000
+# Layer counts of generated avatars and their weights, most players have few layers
+AVATAR_LAYERS = (0, 1, 4, 16, 64)
+AVATAR_WEIGHTS = (20, 20, 30, 20, 10)
+MODE_SHORT_NAMES = ("b", "ar", "ard", "sp", "v", "f")
+
+
+def random_avatar(generator: random.Random, layers_count: int) -> str:
+    """Returns encoded avatar with random layers. Values are multiples of 0.25, so they survive float32 packing."""
+
+    return Avatar({
+        "layers": [
+            {
+                "id": generator.randint(1, 255),
+                "scale": generator.randint(1, 16) * 0.25,
+                "angle": generator.randint(-720, 720) * 0.25,
+                "x": generator.randint(-400, 400) * 0.25,
+                "y": generator.randint(-400, 400) * 0.25,
+                "flipX": generator.random() < 0.5,
+                "flipY": generator.random() < 0.5,
+                "color": generator.randint(0, 0xFFFFFF)
+            }
+            for _ in range(layers_count)
+        ],
+        "bc": generator.randint(0, 0xFFFFFF)
+    }).encode()
+
+
+def fixtures(seed: int) -> Dict[str, list]:
+    """Returns input streams of benchmarked functions."""
+
+    generator = random.Random(seed)
+    numbers = _load_db_ids()[0]
+
+    return {
+        "avatars": [
+            random_avatar(generator, layers_count)
+            for layers_count in generator.choices(AVATAR_LAYERS, AVATAR_WEIGHTS, k=STREAM_SIZE)
+        ],
+        "db_ids": [generator.randint(numbers[0] - 1000, numbers[-1] + 1000) for _ in range(STREAM_SIZE)],
+        "teams": [generator.randint(0, 5) for _ in range(STREAM_SIZE)],
+        "modes": [generator.choice(MODE_SHORT_NAMES) for _ in range(STREAM_SIZE)],
+        "accounts": [
+            SimpleNamespace(is_guest=generator.random() < 0.3, xp=generator.randint(0, 2_000_000))
+            for _ in range(STREAM_SIZE)
+        ]
+    }
+
+
+def measure(function: Callable, stream: list, rounds: int, min_seconds: float) -> Dict[str, Union[float, None]]:
+    """Returns ops/s, retained bytes per call and peak bytes per call of function over the stream."""
+
+    # Warm-up fills caches (e.g. db ID table) so they aren't counted as allocations
+    for value in stream:
+        function(value)
+
+    timer = timeit.Timer(lambda: [function(value) for value in stream])
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_seconds / 0.2))
+    seconds = min(timer.repeat(repeat=rounds, number=number))
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results = [function(value) for value in stream]
+    retained = (tracemalloc.get_traced_memory()[0] - before) / len(stream)
+    del results
+
+    peak = None
+
+    if hasattr(tracemalloc, "reset_peak"):
+        peak = 0
+
+        for value in stream[:100]:
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            function(value)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+
+    tracemalloc.stop()
+
+    return {
+        "ops_per_second": number * len(stream) / seconds,
+        "retained_bytes_per_op": retained,
+        "peak_bytes_per_call": peak
+    }
+
+
+def benchmarks(streams: Dict[str, list]) -> Dict[str, tuple]:
+    """Returns benchmark name -> (function, input stream)."""
+
+    return {
+        "parse_avatar": (parse_avatar, streams["avatars"]),
+        "db_id_to_date": (db_id_to_date, streams["db_ids"]),
+        "db_ids_to_dates (100 IDs)": (db_ids_to_dates, [streams["db_ids"][:100]] * 10),
+        "team_from_number": (team_from_number, streams["teams"]),
+        "mode_from_short_name": (mode_from_short_name, streams["modes"]),
+        "BonkBot.get_level": (BonkBot.get_level, streams["accounts"])
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5, help="timing rounds, the best one is reported")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="minimal duration of one timing round")
+    parser.add_argument("--seed", type=int, default=0, help="seed of random input streams")
+    parser.add_argument("--output", help="path of JSON results. Default is None (only the table is printed)")
+    args = parser.parse_args()
+
+    results: Dict[str, Union[str, int, dict]] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "benchmarks": {}
+    }
+    print(f"{'function':<28} {'ops/s':>14} {'retained B/op':>14} {'peak B/call':>12}")
+
+    for name, (function, stream) in benchmarks(fixtures(args.seed)).items():
+        result = results["benchmarks"][name] = measure(function, stream, args.rounds, args.min_seconds)
+        peak = "-" if result["peak_bytes_per_call"] is None else f"{result['peak_bytes_per_call']:.0f}"
+        print(
+            f"{name:<28} {result['ops_per_second']:>14,.0f} "
+            f"{result['retained_bytes_per_op']:>14.1f} {peak:>12}"
+        )
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(json.dumps(results, indent=4) + "\n")
+
+
+if __name__ == "__main__":
+    main()
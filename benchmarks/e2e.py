@@ -0,0 +1,297 @@
+"""
+End-to-end load and latency benchmarks against the local FakeServer (benchmarks/fake_server.py):
+
+- create_game and Room.join time until the server confirms the room, for 1, 100 and 1000 concurrent games
+- memory per hosted game and per joined game (tracemalloc, client side only)
+- inbound player join, player leave and chat event throughput of one game
+- memory per player
+- router dispatch overhead per event with 0, 1 and 10 handlers (measured without tracemalloc)
+
+The fake server runs in a child process, so its CPU time and memory are not counted. Results are written as JSON to
+compare them between releases.
+
+Run from the repository root::
+
+    python benchmarks/e2e.py --games 1 100 1000 --output e2e.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Dict, List, Union
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bonk_bot.BonkBot import bonk_guest_login
+from bonk_bot.Settings import use_server
+from fake_server import FakeServer
+
+
+def serve(connection) -> None:
+    """Runs FakeServer in the child process and executes commands from the benchmark process."""
+
+    server = FakeServer()
+    connection.send(server.start_in_thread())
+
+    while True:
+        command, args = connection.recv()
+
+        if command == "stop":
+            break
+
+        room = server.rooms[args[0]]
+
+        if command == "add_players":
+            result = len(server.call(server.add_players(room, args[1])))
+        elif command == "remove_players":
+            synthetic = [player.short_id for player in room.players.values() if player.sid is None]
+
+            for short_id in synthetic[:args[1]]:
+                server.call(server.remove_player(room, short_id))
+
+            result = min(len(synthetic), args[1])
+        else:
+            result = server.call(server.chatter(room, *args[1:]))
+
+        connection.send(result)
+
+    server.stop_thread()
+    connection.send(None)
+
+
+class RemoteServer:
+    """FakeServer in a child process."""
+
+    def __init__(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        self.__connection, child_connection = context.Pipe()
+        self.process = context.Process(target=serve, args=(child_connection,), daemon=True)
+        self.process.start()
+        self.address: str = self.__connection.recv()
+
+    async def call(self, command: str, *args):
+        return await asyncio.get_event_loop().run_in_executor(None, self.__request, command, args)
+
+    def stop(self) -> None:
+        self.__request("stop", ())
+        self.process.join()
+
+    def __request(self, command: str, args: tuple):
+        self.__connection.send((command, args))
+
+        return self.__connection.recv()
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    """Returns p50, p95 and max of values in milliseconds."""
+
+    values = sorted(values)
+
+    return {
+        "p50_ms": values[len(values) // 2] * 1000,
+        "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))] * 1000,
+        "max_ms": values[-1] * 1000
+    }
+
+
+def traced_memory() -> int:
+    """Returns the amount of currently traced bytes or 0 if memory isn't traced."""
+
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+async def wait_for_count(counter: List[int], expected: int, timeout: float) -> float:
+    """Waits until counter[0] reaches expected value. Returns monotonic time of the wait end."""
+
+    deadline = time.monotonic() + timeout
+
+    while counter[0] < expected and time.monotonic() < deadline:
+        await asyncio.sleep(0.001)
+
+    return time.monotonic()
+
+
+async def close_bot(bot) -> None:
+    """Leaves all bot games and closes its http session."""
+
+    await bot.stop()
+    await bot.aiohttp_session.close()
+
+
+async def bench_scale(games_count: int) -> dict:
+    """Hosts games_count games with one bot and joins all of them with another bot."""
+
+    host = bonk_guest_login("bench_host")
+    guest = bonk_guest_login("bench_guest")
+    memory = traced_memory()
+    create_times = []
+
+    for index in range(games_count):
+        start = time.perf_counter()
+        await host.create_game(name=f"bench{index}", max_players=8)
+        create_times.append(time.perf_counter() - start)
+
+    memory_per_game = (traced_memory() - memory) / games_count
+    rooms = [room for room in await guest.get_rooms() if room.name.startswith("bench")]
+    memory = traced_memory()
+    join_times = []
+
+    for room in rooms:
+        start = time.perf_counter()
+        await room.join()
+        join_times.append(time.perf_counter() - start)
+
+    memory_per_joined_game = (traced_memory() - memory) / len(rooms)
+
+    await close_bot(host)
+    await close_bot(guest)
+
+    result = {
+        "games": games_count,
+        "create_game": distribution(create_times),
+        "join": distribution(join_times)
+    }
+
+    if tracemalloc.is_tracing():
+        result["memory_per_game_bytes"] = memory_per_game
+        result["memory_per_joined_game_bytes"] = memory_per_joined_game
+
+    return result
+
+
+async def bench_events(server: RemoteServer, players_count: int, chat_rate: float, duration: float) -> dict:
+    """Measures inbound event throughput and memory per player in one joined game."""
+
+    host = bonk_guest_login("bench_host")
+    guest = bonk_guest_login("bench_guest")
+    await host.create_game(name="bench_events", max_players=8)
+    room = [room for room in await guest.get_rooms() if room.name == "bench_events"][0]
+    game = await room.join()
+    joins, leaves, messages = [0], [0], [0]
+
+    @game.on("player_join")
+    async def on_player_join(game, player):
+        joins[0] += 1
+
+    @game.on("player_left")
+    async def on_player_left(game, player):
+        leaves[0] += 1
+
+    @game.on("message")
+    async def on_message(game, message):
+        messages[0] += 1
+
+    memory = traced_memory()
+    start = time.monotonic()
+    await server.call("add_players", room.room_id, players_count)
+    joins_end = await wait_for_count(joins, players_count, 60)
+    memory_per_player = (traced_memory() - memory) / players_count
+
+    start_chat = time.monotonic()
+    sent = await server.call("chatter", room.room_id, chat_rate, duration)
+    await wait_for_count(messages, sent, 5)
+    chat_end = time.monotonic()
+
+    start_leaves = time.monotonic()
+    removed = await server.call("remove_players", room.room_id, players_count)
+    leaves_end = await wait_for_count(leaves, removed, 60)
+
+    await close_bot(host)
+    await close_bot(guest)
+
+    result = {
+        "players": players_count,
+        "player_join_events_per_second": joins[0] / (joins_end - start),
+        "player_leave_events_per_second": leaves[0] / (leaves_end - start_leaves),
+        "chat_rate": chat_rate,
+        "chat_sent": sent,
+        "chat_received": messages[0],
+        "chat_events_per_second": messages[0] / (chat_end - start_chat)
+    }
+
+    if tracemalloc.is_tracing():
+        result["memory_per_player_bytes"] = memory_per_player
+
+    return result
+
+
+async def bench_dispatch(number: int) -> Dict[str, float]:
+    """Measures bot.router.emit time per event with sync handlers."""
+
+    bot = bonk_guest_login("bench_dispatch")
+    result = {}
+
+    for handlers_count in (0, 1, 10):
+        for index in range(handlers_count):
+            bot.router.on(f"bench_{handlers_count}", lambda game, value: None)
+
+        seconds = timeit.timeit(lambda: bot.router.emit(f"bench_{handlers_count}", None, 1), number=number)
+        result[f"{handlers_count}_handlers_us"] = seconds / number * 1e6
+
+    await close_bot(bot)
+
+    return result
+
+
+async def run(args: argparse.Namespace, server: RemoteServer) -> dict:
+    results: Dict[str, Union[str, bool, list, dict]] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "tracemalloc": not args.no_memory,
+        "scales": []
+    }
+
+    for games_count in args.games:
+        print(f"{games_count} games...", file=sys.stderr)
+        results["scales"].append(await bench_scale(games_count))
+
+    print("events...", file=sys.stderr)
+    results["events"] = await bench_events(server, args.players, args.chat_rate, args.duration)
+    print("dispatch...", file=sys.stderr)
+    # Dispatch is a microbenchmark, memory tracing would dominate its timings
+    tracemalloc.stop()
+    results["dispatch"] = await bench_dispatch(args.dispatch_number)
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, nargs="+", default=[1, 100, 1000], help="amounts of concurrent games")
+    parser.add_argument("--players", type=int, default=1000, help="synthetic players in the events benchmark")
+    parser.add_argument("--chat-rate", type=float, default=100, help="chat messages per second")
+    parser.add_argument("--duration", type=float, default=5, help="seconds of chat")
+    parser.add_argument("--dispatch-number", type=int, default=100000, help="emits per dispatch measurement")
+    parser.add_argument("--no-memory", action="store_true", help="don't trace memory (tracemalloc slows timings)")
+    parser.add_argument("--output", help="path of JSON results. Default is stdout")
+    args = parser.parse_args()
+
+    server = RemoteServer()
+    use_server(server.address)
+
+    if not args.no_memory:
+        tracemalloc.start()
+
+    try:
+        results = asyncio.run(run(args, server))
+    finally:
+        server.stop()
+
+    text = json.dumps(results, indent=4)
+
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,775 @@
+"""
+Local fake bonk.io server for tests and benchmarks. It isn't part of the installed bonk_bot package.
+
+Import it from the repository root::
+
+    from benchmarks.fake_server import FakeServer
+"""
+
+import asyncio
+import random
+import threading
+import time
+from string import ascii_lowercase
+from typing import Any, Dict, List, Set, Union
+
+import socketio
+from aiohttp import web
+
+from bonk_bot.Avatar import Avatar
+from bonk_bot.Settings import use_server
+
+# Avatar of synthetic players and accounts that log into the fake server
+DEFAULT_AVATAR = Avatar({"layers": [], "bc": 4492031})
+# Amount of maps in one page of map search results
+MAPS_PAGE_SIZE = 16
+
+
+class FakePlayer:
+    """
+    Player in the fake server room. Synthetic players have no socket connection.
+
+    :param short_id: player's id in the room.
+    :param peer_id: player's peer id.
+    :param username: player's username.
+    :param is_guest: indicates whether player is guest or not.
+    :param level: player's level.
+    :param avatar: player's avatar json data.
+    :param sid: socketio session id of the player or None for synthetic players.
+    """
+
+    __slots__ = ("short_id", "peer_id", "username", "is_guest", "level", "avatar", "sid", "team", "is_ready")
+
+    def __init__(
+        self,
+        short_id: int,
+        peer_id: str,
+        username: str,
+        is_guest: bool,
+        level: int,
+        avatar: dict,
+        sid: Union[str, None] = None
+    ) -> None:
+        self.short_id: int = short_id
+        self.peer_id: str = peer_id
+        self.username: str = username
+        self.is_guest: bool = is_guest
+        self.level: int = level
+        self.avatar: dict = avatar
+        self.sid: Union[str, None] = sid
+        self.team: int = 1
+        self.is_ready: bool = False
+
+    def to_json(self) -> dict:
+        """Returns player data that is sent to joining players. You don't need to use it."""
+
+        return {
+            "peerID": self.peer_id,
+            "userName": self.username,
+            "guest": self.is_guest,
+            "level": self.level,
+            "ready": self.is_ready,
+            "tabbed": False,
+            "team": self.team,
+            "avatar": self.avatar
+        }
+
+
+class FakeRoom:
+    """
+    Room in the fake server.
+
+    :param room_id: room id in the room list.
+    :param name: room name.
+    :param password: room password.
+    :param max_players: maximal amount of players with socket connection.
+    :param min_level: minimal level of joining players.
+    :param max_level: maximal level of joining players.
+    :param is_hidden: indicates whether room is hidden from the room list or not.
+    """
+
+    def __init__(
+        self,
+        room_id: int,
+        name: str,
+        password: str = "",
+        max_players: int = 8,
+        min_level: int = 0,
+        max_level: int = 999,
+        is_hidden: bool = False
+    ) -> None:
+        self.room_id: int = room_id
+        self.address: str = f"fake{room_id}"
+        self.name: str = name
+        self.password: str = password
+        self.max_players: int = max_players
+        self.min_level: int = min_level
+        self.max_level: int = max_level
+        self.is_hidden: bool = is_hidden
+        self.mode: str = "b"
+        self.ga: str = "b"
+        self.rounds: int = 3
+        self.team_lock: bool = False
+        self.extended_teams: bool = False
+        self.map_data: Union[str, None] = None
+        self.host: Union[int, None] = None
+        self.players: Dict[int, FakePlayer] = {}
+        self.bans: Set[str] = set()
+        self.__next_short_id: int = 0
+
+    @property
+    def channel(self) -> str:
+        """socketio room of the room players. You don't need to use it."""
+
+        return f"room{self.room_id}"
+
+    def new_short_id(self) -> int:
+        """Returns id for the next joining player. You don't need to use it."""
+
+        short_id = self.__next_short_id
+        self.__next_short_id += 1
+
+        return short_id
+
+    def connected_players(self) -> int:
+        """Returns the amount of players with socket connection."""
+
+        return sum(1 for player in self.players.values() if player.sid is not None)
+
+    def game_state(self) -> dict:
+        """Returns lobby state that is sent to joining players when host is synthetic. You don't need to use it."""
+
+        return {
+            "map": None,
+            "gt": 2,
+            "wl": self.rounds,
+            "q": False,
+            "tl": self.team_lock,
+            "tea": self.extended_teams,
+            "ga": self.ga,
+            "mo": self.mode,
+            "bal": [],
+            "GMMode": ""
+        }
+
+    def to_json(self) -> dict:
+        """Returns room data that is sent in the room list. You don't need to use it."""
+
+        return {
+            "id": self.room_id,
+            "roomname": self.name,
+            "players": len(self.players),
+            "maxplayers": self.max_players,
+            "password": int(bool(self.password)),
+            "mode_ga": self.ga,
+            "mode_mo": self.mode,
+            "minlevel": self.min_level,
+            "maxlevel": self.max_level,
+            "country": "PL",
+            "ver": 49
+        }
+
+
+class FakeServer:
+    """
+    Local stand-in for bonk.io socket.io game server and http api, so bots can be tested and benchmarked without
+    bonk.io. Server handles room creation and joining, chat, teams, ready marks, kicks and bans, mode, map, host and
+    room settings changes. Api serves login (any username and password), friends, map search and room list.
+
+    Synthetic players are kept only in the server memory and sent to the real players as usual, so thousands of them
+    can be simulated in one process.
+
+    :param host: address to listen on.
+    :param port: port to listen on. Default is 0 (random free port).
+
+    Example usage::
+
+        server = FakeServer()
+        server.start_in_thread()
+        server.use()
+
+        bot = bonk_guest_login("name")
+
+        async def main():
+            game = await bot.create_game()
+            await server.call(server.add_players(server.rooms[1], 1000))
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.host: str = host
+        self.port: int = port
+        self.rooms: Dict[int, FakeRoom] = {}
+        self.maps: List[dict] = []
+        self.sio: socketio.AsyncServer = socketio.AsyncServer(async_mode="aiohttp", cors_allowed_origins="*")
+        self.app: web.Application = web.Application()
+        self.__sessions: Dict[str, FakeRoom] = {}
+        self.__players: Dict[str, FakePlayer] = {}
+        self.__next_room_id: int = 1
+        self.__next_user_id: int = 1
+        # token -> (username, xp) of accounts that logged in
+        self.__accounts: Dict[str, tuple] = {}
+        self.__runner: Union[web.AppRunner, None] = None
+        self.__loop: Union[asyncio.AbstractEventLoop, None] = None
+        self.__thread: Union[threading.Thread, None] = None
+
+        self.sio.attach(self.app)
+        self.app.router.add_post("/scripts/login_legacy.php", self.__login)
+        self.app.router.add_post("/scripts/friends.php", self.__friends)
+        self.app.router.add_post("/scripts/map_getown.php", self.__search_maps)
+        self.app.router.add_post("/scripts/map_getsearch.php", self.__search_maps)
+        self.app.router.add_post("/scripts/map_b1_getsearch.php", self.__search_maps)
+        self.app.router.add_post("/scripts/map_delete.php", self.__success)
+        self.app.router.add_post("/scripts/getrooms.php", self.__get_rooms)
+        self.app.router.add_post("/scripts/getroomaddress.php", self.__get_room_address)
+        self.__socket_events()
+
+    @property
+    def address(self) -> str:
+        """Http address of the running server."""
+
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> str:
+        """Starts server in the current event loop and returns its address."""
+
+        self.__runner = web.AppRunner(self.app)
+        await self.__runner.setup()
+        await web.TCPSite(self.__runner, self.host, self.port).start()
+        self.port = self.__runner.addresses[0][1]
+
+        return self.address
+
+    async def stop(self) -> None:
+        """Stops server."""
+
+        for sid in list(self.__players):
+            await self.sio.disconnect(sid)
+
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    def start_in_thread(self) -> str:
+        """Starts server in its own event loop in a background thread and returns its address."""
+
+        started = threading.Event()
+        self.__loop = asyncio.new_event_loop()
+
+        def run() -> None:
+            asyncio.set_event_loop(self.__loop)
+            self.__loop.run_until_complete(self.start())
+            started.set()
+            self.__loop.run_forever()
+
+        self.__thread = threading.Thread(target=run, name="bonk_bot_fake_server", daemon=True)
+        self.__thread.start()
+        started.wait()
+
+        return self.address
+
+    def stop_thread(self) -> None:
+        """Stops server that was started with start_in_thread()."""
+
+        if self.__thread is None:
+            return
+
+        self.call(self.stop())
+        self.call(_cancel_tasks())
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join()
+        self.__loop.close()
+        self.__thread = None
+        self.__loop = None
+
+    def call(self, coroutine) -> Any:
+        """
+        Runs server coroutine (e.g. add_players()) in the server thread. Returns awaitable future if it's called from
+        another event loop, otherwise waits for the result.
+
+        :param coroutine: coroutine of the server method.
+        """
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.__loop)
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return future.result()
+
+        return asyncio.wrap_future(future)
+
+    def use(self) -> None:
+        """Points bonk_bot api links and game servers to this server."""
+
+        use_server(self.address)
+
+    def add_room(
+        self,
+        name: str = "Fake room",
+        password: str = "",
+        max_players: int = 8,
+        min_level: int = 0,
+        max_level: int = 999
+    ) -> FakeRoom:
+        """
+        Creates room with synthetic host. Real players can join it with Room.join().
+
+        :param name: room name.
+        :param password: room password.
+        :param max_players: maximal amount of players with socket connection.
+        :param min_level: minimal level of joining players.
+        :param max_level: maximal level of joining players.
+        """
+
+        room = self.__create_room(name, password, max_players, min_level, max_level, False)
+        room.host = self.__add_synthetic_player(room).short_id
+
+        return room
+
+    def add_map(self, name: str, map_data: str, author: str = "fake") -> dict:
+        """
+        Adds map to map search results.
+
+        :param name: map name.
+        :param map_data: map data string.
+        :param author: map author name.
+        """
+
+        bonk_map = {
+            "id": len(self.maps) + 1,
+            "name": name,
+            "authorname": author,
+            "leveldata": map_data,
+            "publisheddate": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "creationdate": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "published": 1,
+            "vu": 0,
+            "vd": 0
+        }
+        self.maps.append(bonk_map)
+
+        return bonk_map
+
+    async def add_players(self, room: FakeRoom, count: int) -> List[FakePlayer]:
+        """
+        Adds synthetic players to the room.
+
+        :param room: FakeRoom class instance.
+        :param count: amount of players.
+        """
+
+        players = []
+
+        for _ in range(count):
+            player = self.__add_synthetic_player(room)
+            players.append(player)
+
+            await self.sio.emit(
+                4,
+                (player.short_id, player.peer_id, player.username, player.is_guest, player.level, False, player.avatar),
+                to=room.channel
+            )
+
+        return players
+
+    async def remove_player(self, room: FakeRoom, short_id: int) -> None:
+        """
+        Removes synthetic player from the room.
+
+        :param room: FakeRoom class instance.
+        :param short_id: player's id in the room.
+        """
+
+        if room.players.pop(short_id, None) is not None:
+            await self.sio.emit(5, (short_id, 0), to=room.channel)
+
+    async def send_message(self, room: FakeRoom, short_id: int, message: str) -> None:
+        """
+        Sends chat message from the synthetic player.
+
+        :param room: FakeRoom class instance.
+        :param short_id: player's id in the room.
+        :param message: message content.
+        """
+
+        await self.sio.emit(20, (short_id, message), to=room.channel)
+
+    async def chatter(self, room: FakeRoom, rate: float, duration: float) -> int:
+        """
+        Sends messages from random synthetic players of the room at a constant rate. Returns the amount of sent
+        messages.
+
+        :param room: FakeRoom class instance.
+        :param rate: messages per second.
+        :param duration: seconds to send messages for.
+        """
+
+        synthetic = [player.short_id for player in room.players.values() if player.sid is None]
+
+        if not synthetic:
+            return 0
+
+        start = time.monotonic()
+        sent = 0
+
+        while True:
+            delay = start + sent / rate - time.monotonic()
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if time.monotonic() - start >= duration:
+                return sent
+
+            await self.send_message(room, random.choice(synthetic), f"message {sent}")
+            sent += 1
+
+    def __create_room(
+        self,
+        name: str,
+        password: str,
+        max_players: int,
+        min_level: int,
+        max_level: int,
+        is_hidden: bool
+    ) -> FakeRoom:
+        room = FakeRoom(self.__next_room_id, name, password, max_players, min_level, max_level, is_hidden)
+        self.rooms[room.room_id] = room
+        self.__next_room_id += 1
+
+        return room
+
+    def __add_synthetic_player(self, room: FakeRoom) -> FakePlayer:
+        short_id = room.new_short_id()
+        player = FakePlayer(
+            short_id,
+            _random_peer_id(),
+            f"synthetic{room.room_id}_{short_id}",
+            True,
+            random.randint(0, 100),
+            DEFAULT_AVATAR.json_data
+        )
+        room.players[short_id] = player
+
+        return player
+
+    def __room_by_address(self, address: str) -> Union[FakeRoom, None]:
+        for room in self.rooms.values():
+            if room.address == address:
+                return room
+
+        return None
+
+    async def __remove_room(self, room: FakeRoom) -> None:
+        self.rooms.pop(room.room_id, None)
+
+        for player in list(room.players.values()):
+            if player.sid is not None:
+                await self.sio.disconnect(player.sid)
+
+    def __socket_events(self) -> None:
+        sio = self.sio
+
+        def host_only(handler):
+            async def handle(sid, *args) -> None:
+                room = self.__sessions.get(sid)
+
+                if room is not None and room.host == self.__players[sid].short_id:
+                    await handler(room, self.__players[sid], *args)
+
+            return handle
+
+        def player_only(handler):
+            async def handle(sid, *args) -> None:
+                room = self.__sessions.get(sid)
+
+                if room is not None:
+                    await handler(room, self.__players[sid], *args)
+
+            return handle
+
+        @sio.on(12)
+        async def on_create(sid, data: dict) -> None:
+            room = self.__create_room(
+                data["roomName"],
+                data["password"],
+                data["maxPlayers"],
+                data["minLevel"],
+                data["maxLevel"],
+                bool(data["hidden"])
+            )
+            player = self.__add_socket_player(room, sid, data)
+            room.host = player.short_id
+
+            await _maybe_await(self.sio.enter_room(sid, room.channel))
+            await self.sio.emit(2, (room.room_id, room.address), to=sid)
+
+        @sio.on(13)
+        async def on_join(sid, data: dict) -> None:
+            room = self.__room_by_address(data["joinID"])
+
+            if room is None:
+                await self.sio.emit(16, "room_not_found", to=sid)
+                return
+            if room.password and room.password != data["roomPassword"]:
+                await self.sio.emit(16, "password_wrong", to=sid)
+                return
+            if room.connected_players() >= room.max_players:
+                await self.sio.emit(16, "room_full", to=sid)
+                return
+            if data["peerID"] in room.bans or data.get("guestName") in room.bans:
+                await self.sio.emit(16, "banned", to=sid)
+                return
+
+            player = self.__add_socket_player(room, sid, data)
+            players = [None] * (max(room.players) + 1)
+
+            for other in room.players.values():
+                players[other.short_id] = other.to_json()
+
+            await self.sio.emit(
+                4,
+                (player.short_id, player.peer_id, player.username, player.is_guest, player.level, False, player.avatar),
+                to=room.channel
+            )
+            await _maybe_await(self.sio.enter_room(sid, room.channel))
+            await self.sio.emit(
+                3,
+                (player.short_id, room.host, players, int(time.time() * 1000), room.team_lock, room.room_id, "", None),
+                to=sid
+            )
+
+            host = room.players.get(room.host)
+
+            if host is None or host.sid is None:
+                await self.sio.emit(21, room.game_state(), to=sid)
+
+        @sio.on(11)
+        @host_only
+        async def on_game_state(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            target = room.players.get(data["sid"])
+
+            if target is not None and target.sid is not None:
+                await self.sio.emit(21, data["gs"], to=target.sid)
+
+        @sio.on(10)
+        @player_only
+        async def on_message(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            await self.sio.emit(20, (player.short_id, data["message"]), to=room.channel)
+
+        @sio.on(6)
+        @player_only
+        async def on_team_change(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            if room.team_lock and room.host != player.short_id:
+                return
+
+            player.team = data["targetTeam"]
+            await self.sio.emit(18, (player.short_id, player.team), to=room.channel)
+
+        @sio.on(7)
+        @host_only
+        async def on_team_lock(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            room.team_lock = data["teamLock"]
+            await self.sio.emit(19, room.team_lock, to=room.channel)
+
+        @sio.on(16)
+        @player_only
+        async def on_ready(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            player.is_ready = data["ready"]
+            await self.sio.emit(8, (player.short_id, player.is_ready), to=room.channel)
+
+        @sio.on(9)
+        @host_only
+        async def on_kick(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            target = room.players.get(data["banshortid"])
+
+            if target is None:
+                return
+
+            await self.sio.emit(24, (target.short_id, data["kickonly"]), to=room.channel)
+            del room.players[target.short_id]
+            await self.sio.emit(5, (target.short_id, 0), to=room.channel, skip_sid=target.sid)
+
+            if not data["kickonly"]:
+                room.bans.add(target.peer_id)
+                room.bans.add(target.username)
+
+            if target.sid is not None:
+                await _maybe_await(self.sio.leave_room(target.sid, room.channel))
+                self.__sessions.pop(target.sid, None)
+                self.__players.pop(target.sid, None)
+
+        @sio.on(20)
+        @host_only
+        async def on_mode_change(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            room.ga = data["ga"]
+            room.mode = data["mo"]
+            await self.sio.emit(26, (room.ga, room.mode), to=room.channel)
+
+        @sio.on(21)
+        @host_only
+        async def on_rounds_change(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            room.rounds = data["w"]
+
+        @sio.on(23)
+        @host_only
+        async def on_map_change(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            room.map_data = data["m"]
+            await self.sio.emit(29, room.map_data, to=room.channel, skip_sid=player.sid)
+
+        @sio.on(26)
+        @host_only
+        async def on_player_move(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            target = room.players.get(data["targetID"])
+
+            if target is not None:
+                target.team = data["targetTeam"]
+                await self.sio.emit(18, (target.short_id, target.team), to=room.channel)
+
+        @sio.on(29)
+        @host_only
+        async def on_player_balance(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            await self.sio.emit(36, (data["sid"], data["bal"]), to=room.channel)
+
+        @sio.on(32)
+        @host_only
+        async def on_teams_toggle(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            room.extended_teams = data["t"]
+            await self.sio.emit(39, room.extended_teams, to=room.channel)
+
+        @sio.on(34)
+        @host_only
+        async def on_host_change(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            if data["id"] in room.players:
+                room.host = data["id"]
+                await self.sio.emit(41, {"oldHost": player.short_id, "newHost": room.host}, to=room.channel)
+
+        @sio.on(50)
+        @host_only
+        async def on_close(room: FakeRoom, player: FakePlayer, data=None) -> None:
+            await self.__remove_room(room)
+
+        @sio.on(52)
+        @host_only
+        async def on_room_name_change(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            room.name = data["newName"]
+            await self.sio.emit(58, room.name, to=room.channel)
+
+        @sio.on(53)
+        @host_only
+        async def on_room_password_change(room: FakeRoom, player: FakePlayer, data: dict) -> None:
+            room.password = data["newPass"]
+            await self.sio.emit(59, int(bool(room.password)), to=room.channel)
+
+        @sio.event
+        async def disconnect(sid) -> None:
+            room = self.__sessions.pop(sid, None)
+            player = self.__players.pop(sid, None)
+
+            if room is None or room.players.pop(player.short_id, None) is None:
+                return
+
+            await self.sio.emit(5, (player.short_id, 0), to=room.channel)
+
+            if room.connected_players() == 0:
+                self.rooms.pop(room.room_id, None)
+            elif room.host == player.short_id:
+                room.host = next(other.short_id for other in room.players.values() if other.sid is not None)
+                await self.sio.emit(41, {"oldHost": player.short_id, "newHost": room.host}, to=room.channel)
+
+    def __add_socket_player(self, room: FakeRoom, sid: str, data: dict) -> FakePlayer:
+        if data["guest"]:
+            username = data["guestName"]
+            level = 0
+        else:
+            username, xp = self.__accounts.get(data["token"], (f"account{data['dbid']}", 0))
+            level = int((xp / 100) ** 0.5 + 1)
+
+        player = FakePlayer(room.new_short_id(), data["peerID"], username, data["guest"], level, data["avatar"], sid)
+        room.players[player.short_id] = player
+        self.__sessions[sid] = room
+        self.__players[sid] = player
+
+        return player
+
+    async def __login(self, request: web.Request) -> web.Response:
+        data = await request.post()
+        avatar = DEFAULT_AVATAR.encode()
+        user_id = self.__next_user_id
+        self.__next_user_id += 1
+        token = f"token{user_id}"
+        username = data.get("username", f"account{user_id}")
+        self.__accounts[token] = (username, 0)
+
+        return web.json_response({
+            "r": "success",
+            "token": token,
+            "id": user_id,
+            "username": username,
+            "xp": 0,
+            "avatar": avatar,
+            "avatar1": avatar,
+            "avatar2": avatar,
+            "avatar3": avatar,
+            "avatar4": avatar,
+            "avatar5": avatar,
+            "legacyFriends": ""
+        })
+
+    async def __friends(self, request: web.Request) -> web.Response:
+        data = await request.post()
+
+        if data.get("task") == "getfriends":
+            return web.json_response({"r": "success", "friends": [], "requests": []})
+
+        return web.json_response({"r": "success"})
+
+    async def __search_maps(self, request: web.Request) -> web.Response:
+        data = await request.post()
+        search = data.get("searchstring", "").lower()
+        starting_from = int(data.get("startingfrom", 0))
+        maps = [
+            bonk_map for bonk_map in self.maps
+            if search in bonk_map["name"].lower() or search in bonk_map["authorname"].lower()
+        ]
+        page = maps[starting_from:starting_from + MAPS_PAGE_SIZE]
+
+        return web.json_response({"r": "success", "maps": page, "more": starting_from + MAPS_PAGE_SIZE < len(maps)})
+
+    async def __success(self, request: web.Request) -> web.Response:
+        return web.json_response({"r": "success"})
+
+    async def __get_rooms(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "rooms": [room.to_json() for room in self.rooms.values() if not room.is_hidden]
+        })
+
+    async def __get_room_address(self, request: web.Request) -> web.Response:
+        data = await request.post()
+        room = self.rooms.get(int(data.get("id", 0)))
+
+        # Unknown room gets an address that doesn't exist, so join fails with room_not_found like on bonk.io
+        return web.json_response({
+            "r": "success",
+            "address": room.address if room is not None else "",
+            "server": "fake"
+        })
+
+
+async def _maybe_await(result) -> None:
+    # Room methods of socketio.AsyncServer are coroutines only in newer python-socketio versions
+    if asyncio.iscoroutine(result):
+        await result
+
+
+async def _cancel_tasks() -> None:
+    # Engine.io keeps ping tasks of closed sockets for a while, they are cancelled before the server loop is stopped
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    for task in tasks:
+        task.cancel()
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _random_peer_id() -> str:
+    return "".join(random.choice(ascii_lowercase + "0123456789") for _ in range(10)) + "000000"
@@ -1,3 +1,149 @@
+import base64
+import struct
+from typing import Set, Tuple, Union
+from urllib.parse import quote_plus
+from weakref import WeakValueDictionary
+
+# Avatar layer: id, scale, angle, x, y, flipX, flipY, padding byte and 3 byte color (high byte + low short)
+AVATAR_LAYER = struct.Struct(">B4fBBxBH")
+# Bytes between avatar layers
+AVATAR_LAYER_SEPARATOR_SIZE = 5
+# Framing bytes of avatar string, bonk.io writes the same bytes into every avatar. They are taken from avatars that are
+# decoded from the api (see remember_framing) and used to encode avatars that are built in code
+AVATAR_FRAMING = {
+    "header": bytes(7),
+    "after_empty_count": bytes(3),
+    "after_count": bytes(3),
+    "before_layers": bytes(6),
+    "separator": bytes(AVATAR_LAYER_SEPARATOR_SIZE),
+    "trailer": b""
+}
+_remembered_framing: Set[str] = set()
+
+
+def remember_framing(data: Union[bytes, memoryview], layers_count: int, bc_offset: int) -> None:
+    """
+    Remembers framing bytes of avatar that was decoded from the api, so avatars built in code are encoded with them.
+    You don't need to use it.
+
+    :param data: decoded avatar bytes.
+    :param layers_count: amount of layers in avatar.
+    :param bc_offset: offset of base color in data.
+    """
+
+    if len(_remembered_framing) == len(AVATAR_FRAMING) or bc_offset + 3 > len(data):
+        return
+
+    parts = {"header": (0, 7), "trailer": (bc_offset + 3, len(data))}
+
+    if layers_count == 0:
+        parts["after_empty_count"] = (8, 11)
+    else:
+        parts["after_count"] = (8, 11)
+        parts["before_layers"] = (11, 17)
+
+    if layers_count > 1:
+        separator_offset = 17 + AVATAR_LAYER.size
+        parts["separator"] = (separator_offset, separator_offset + AVATAR_LAYER_SEPARATOR_SIZE)
+
+    for name, (start, end) in parts.items():
+        if name not in _remembered_framing:
+            AVATAR_FRAMING[name] = bytes(data[start:end])
+            _remembered_framing.add(name)
+
+
 class Avatar:
-    def __init__(self, json_data: dict):
-        self.json_data: dict = json_data
+    """
+    Immutable bonk.io avatar. Avatars are interned by their content, so identical avatars (e.g. default guest avatar)
+    are one shared object while they are used somewhere.
+
+    json_data is shared between all users of the avatar, so it shouldn't be modified.
+
+    :param json_data: avatar dict with layers and bc (base color).
+    :param encoded: url-encoded base64 avatar string that avatar was decoded from. It is returned by encode() without
+            encoding.
+    """
+
+    __slots__ = ("json_data", "__encoded", "__weakref__")
+    __pool: "WeakValueDictionary[tuple, Avatar]" = WeakValueDictionary()
+
+    def __new__(cls, json_data: dict, encoded: Union[str, None] = None) -> "Avatar":
+        key = (json_data["bc"], tuple(tuple(sorted(layer.items())) for layer in json_data["layers"]))
+        avatar = cls.__pool.get(key)
+
+        if avatar is None:
+            avatar = super().__new__(cls)
+            object.__setattr__(avatar, "json_data", json_data)
+            object.__setattr__(avatar, "_Avatar__encoded", encoded)
+            cls.__pool[key] = avatar
+        elif encoded is not None and avatar.__encoded is None:
+            object.__setattr__(avatar, "_Avatar__encoded", encoded)
+
+        return avatar
+
+    @property
+    def layers(self) -> Tuple[dict, ...]:
+        """Avatar layers (id, scale, angle, x, y, flipX, flipY, color)."""
+
+        return tuple(self.json_data["layers"])
+
+    @property
+    def base_color(self) -> int:
+        """Avatar base color."""
+
+        return self.json_data["bc"]
+
+    def encode(self) -> str:
+        """Returns url-encoded base64 avatar string that is used by bonk.io api. Result is cached."""
+
+        if self.__encoded is None:
+            layers = self.json_data["layers"]
+            data = bytearray(AVATAR_FRAMING["header"])
+            data.append(len(layers) * 2 + 1)
+
+            if layers:
+                data += AVATAR_FRAMING["after_count"]
+                data += AVATAR_FRAMING["before_layers"]
+
+                for index, layer in enumerate(layers):
+                    if index != 0:
+                        data += AVATAR_FRAMING["separator"]
+
+                    data += AVATAR_LAYER.pack(
+                        layer["id"],
+                        layer["scale"],
+                        layer["angle"],
+                        layer["x"],
+                        layer["y"],
+                        layer["flipX"],
+                        layer["flipY"],
+                        layer["color"] >> 16,
+                        layer["color"] & 0xFFFF
+                    )
+
+            else:
+                data += AVATAR_FRAMING["after_empty_count"]
+
+            data += self.json_data["bc"].to_bytes(3, "big")
+            data += AVATAR_FRAMING["trailer"]
+            object.__setattr__(self, "_Avatar__encoded", quote_plus(base64.b64encode(bytes(data)).decode()))
+
+        return self.__encoded
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("Avatar is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Avatar is immutable")
+
+    def __reduce__(self) -> tuple:
+        return Avatar, (self.json_data, self.__encoded)
+
+    def __repr__(self) -> str:
+        return f"Avatar(layers={len(self.json_data['layers'])}, bc={self.json_data['bc']})"
+
+    @classmethod
+    def pool_size(cls) -> int:
+        """Returns the amount of distinct avatars that are currently in use."""
+
+        return len(cls.__pool)
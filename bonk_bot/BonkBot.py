@@ -1,11 +1,12 @@
 import datetime
-from typing import List, Union
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Pattern, Tuple, Union
 import requests
 import socketio
 import asyncio
 from pymitter import EventEmitter
 import nest_asyncio
 import aiohttp
+from aiohttp import web
 
 from .Settings import PROTOCOL_VERSION, links
 from .FriendList import FriendList
@@ -13,9 +14,18 @@ from .BonkMaps import OwnMap, Bonk2Map, Bonk1Map
 from .Room import Room
 from .Parsers import db_id_to_date
 from .Game import Game
-from .Types import Servers, Modes
+from .Types import Servers, Modes, SERVERS
 from .Avatar import Avatar
-from .Parsers import mode_from_short_name, parse_avatar
+from .Parsers import mode_from_short_name, parse_avatar, parse_avatars
+from .Scheduler import TimerWheel, ScheduledTask
+from .RoomPoller import RoomPoller
+from .RoomDirectory import RoomDirectory
+from .MapCache import MapCache
+from .EventRouter import EventRouter
+from .Commands import CommandRouter
+from .Executors import HandlerExecutor
+from .Metrics import MetricsRegistry, NullRegistry, HttpTracer, start_metrics_server
+from .Profiler import Profiler
 
 nest_asyncio.apply()
 
@@ -27,6 +37,9 @@ class BonkBot:
     :param username: bot username.
     :param is_guest: indicates whether the bot is a guest or not.
     :param xp: amount of xp on bot's account.
+
+    Maps' leveldata that bot loads, sets or sees in games goes through bot.map_cache, and game.set_map(map_id) reads
+    maps from it. Replace it with MapCache(path=...) to keep the cache on disk between runs.
     """
 
     def __init__(
@@ -45,12 +58,27 @@ class BonkBot:
         self.main_avatar: Union[Avatar, None] = main_avatar
         self.games: List[Game] = []
         self.event_emitter: EventEmitter = EventEmitter()
-        self.on: EventEmitter.on = self.event_emitter.on
+        self.metrics: Union[MetricsRegistry, NullRegistry] = NullRegistry()
+        self.profiler: Union[Profiler, None] = None
+        self.router: EventRouter = EventRouter(self)
+        self.commands: CommandRouter = CommandRouter(self)
+        self.executors: Dict[str, HandlerExecutor] = {
+            "thread": HandlerExecutor("thread"),
+            "process": HandlerExecutor("process")
+        }
         self.aiohttp_session: aiohttp.ClientSession = aiohttp_session
+        self.scheduler: TimerWheel = TimerWheel()
+        self.room_poller: RoomPoller = RoomPoller(self)
+        self.rooms: RoomDirectory = RoomDirectory(self)
+        self.map_cache: MapCache = MapCache()
+        # Executor wrappers of handlers by (event, handler, game), so handlers can be removed by the original function
+        self.__executor_handlers: Dict[Tuple[str, Callable, Union[Game, None]], Callable] = {}
+        self.__metrics_runner: Union[web.AppRunner, None] = None
 
     async def run(self) -> None:
         """Prevents room connections from stopping and "starts" the bot."""
 
+        self.scheduler.start()
         tasks = []
 
         for game in self.games:
@@ -61,9 +89,200 @@ class BonkBot:
     async def stop(self) -> None:
         """Stops the bot."""
 
-        for game in self.games:
+        # Leaving removes the game from games
+        for game in list(self.games):
             await game.leave()
 
+        self.room_poller.stop()
+        self.scheduler.stop()
+
+        for executor in self.executors.values():
+            executor.shutdown()
+
+        if self.__metrics_runner is not None:
+            await self.__metrics_runner.cleanup()
+            self.__metrics_runner = None
+
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def enable_profiling(
+        self,
+        sample_interval: Union[float, None] = None,
+        output_path: Union[str, None] = None
+    ) -> Profiler:
+        """
+        Starts timing socketio event handlers and bot event handlers. Call it from the thread that runs the event loop,
+        its stack is sampled when sample_interval is set. Report is available with bot.profiler.report() and is
+        written on bot.stop() when output_path is set.
+
+        :param sample_interval: seconds between stack samples. Default is None (no sampling).
+        :param output_path: path prefix of report (.txt) and collapsed stacks (.folded) files. Default is None.
+        """
+
+        if self.profiler is not None:
+            self.profiler.stop()
+
+        self.profiler = Profiler(sample_interval, output_path)
+        self.profiler.start()
+
+        return self.profiler
+
+    def enable_metrics(self, registry: Union[MetricsRegistry, None] = None) -> MetricsRegistry:
+        """
+        Starts collecting bot metrics: inbound and outbound socketio events, handler latency, bonk.io api call latency,
+        reconnects, active games, players and messages.
+
+        :param registry: metrics registry. Default is None (new MetricsRegistry).
+        """
+
+        self.metrics = registry or MetricsRegistry()
+        self.metrics.gauge("bonk_games", "Games that bot is connected to", lambda: len(self.games))
+        self.metrics.gauge(
+            "bonk_players",
+            "Players in games of the bot",
+            lambda: sum(len(game.players) for game in self.games)
+        )
+
+        return self.metrics
+
+    async def start_metrics_server(self, host: str = "127.0.0.1", port: int = 9464) -> None:
+        """
+        Starts local HTTP server that serves bot metrics in Prometheus text format on /metrics. Enables metrics if they
+        are disabled.
+
+        :param host: address to listen on.
+        :param port: port to listen on.
+        """
+
+        if not self.metrics.enabled:
+            self.enable_metrics()
+
+        if self.__metrics_runner is None:
+            self.__metrics_runner = await start_metrics_server(self.metrics, host, port)
+
+    def on(
+        self,
+        event: str,
+        handler: Union[Callable, None] = None,
+        game: Union[Game, None] = None,
+        room: Union[str, Pattern, None] = None,
+        executor: Union[str, None] = None,
+        on_result: Union[Callable, None] = None,
+        **kwargs
+    ) -> Callable:
+        """
+        Registers event handler. Can be used as a decorator. Handlers without game and room are called for all games.
+        Handlers are removed with bot.off().
+
+        :param event: event name.
+        :param handler: function or coroutine function that handles event.
+        :param game: Game class instance whose events are handled. Default is None (all games).
+        :param room: regular expression that room name has to fully match. Default is None (all rooms).
+        :param executor: "thread" or "process" to run sync handler in bot.executors pool with snapshots of event
+                arguments. Default is None (handler runs in the event loop).
+        :param on_result: function or coroutine function that is called in the event loop with event arguments and
+                the result of handler that runs in executor.
+        :param kwargs: other pymitter EventEmitter.on() params (e.g. ttl=1 to handle only one event). Only handlers for
+                all games support them.
+
+        Example usage::
+
+            @bot.on("player_join", room="Bot room #[0-9]+")
+            async def on_player_join(game: Game, player: Player):
+                await game.send_message(f"Hi, {player.username}")
+        """
+
+        def register(func: Callable) -> Callable:
+            if executor is not None:
+                wrapped = self.executors[executor].wrap(func, on_result)
+                self.__executor_handlers[(event, func, game)] = wrapped
+                self.router.on(event, wrapped, game, room, **kwargs)
+            else:
+                self.router.on(event, func, game, room, **kwargs)
+
+            return func
+
+        if handler is not None:
+            return register(handler)
+
+        return register
+
+    def off(self, event: str, handler: Callable, game: Union[Game, None] = None) -> None:
+        """
+        Removes event handler that was registered with bot.on().
+
+        :param event: event name.
+        :param handler: handler that was registered.
+        :param game: Game class instance that handler was registered for. Default is None (all games or room pattern).
+        """
+
+        self.router.off(event, self.__executor_handlers.pop((event, handler, game), handler), game)
+
+    def command(
+        self,
+        name: Union[str, None] = None,
+        aliases: Iterable[str] = (),
+        cooldown: float = 0,
+        user_limit: Union[int, None] = None,
+        user_window: float = 60,
+        description: str = ""
+    ) -> Callable:
+        """
+        Decorator that registers chat command. Command prefixes can be changed with bot.commands.prefixes.
+
+        :param name: command name without prefix. Default is None (name of decorated function).
+        :param aliases: other names of the command.
+        :param cooldown: seconds between two uses of the command by anyone.
+        :param user_limit: maximal amount of uses by one player in user_window seconds. Default is None (no limit).
+        :param user_window: seconds of the sliding window for user_limit.
+        :param description: command description.
+
+        Example usage::
+
+            @bot.command("ping", aliases=["p"], user_limit=3, user_window=10)
+            async def ping(game: Game, message: Message, args: List[str]):
+                return "Pong!"
+        """
+
+        return self.commands.command(name, aliases, cooldown, user_limit, user_window, description)
+
+    def schedule_every(
+        self,
+        interval: float,
+        callback: Callable,
+        *args,
+        delay: Union[float, None] = None
+    ) -> ScheduledTask:
+        """
+        Calls callback every interval seconds. All callbacks of the bot share one timer, so there is no need to
+        write your own sleep loops.
+
+        :param interval: seconds between calls.
+        :param callback: function or coroutine function that is called.
+        :param args: arguments that are passed to callback.
+        :param delay: seconds before the first call. Default is interval.
+
+        Example usage::
+
+            @bot.on("game_join")
+            async def on_join(game: Game):
+                bot.schedule_every(60, game.send_message, "Type !help to see commands")
+        """
+
+        return self.scheduler.schedule_every(interval, callback, *args, delay=delay)
+
+    def schedule_at(self, when: Union[float, datetime.datetime], callback: Callable, *args) -> ScheduledTask:
+        """
+        Calls callback once at the given time.
+
+        :param when: unix timestamp or datetime of the call.
+        :param callback: function or coroutine function that is called.
+        :param args: arguments that are passed to callback.
+        """
+
+        return self.scheduler.schedule_at(when, callback, *args)
+
     def set_main_avatar(self, avatar: Union[Avatar, None]) -> None:
         """
         Changes bot's account session avatar.
@@ -86,7 +305,8 @@ class BonkBot:
         password="",
         min_level=0,
         max_level=999,
-        server=Servers.Warsaw()
+        server=Servers.Warsaw(),
+        timeout=10
     ) -> Game:
         """
         Host a bonk.io game.
@@ -98,6 +318,7 @@ class BonkBot:
         :param min_level: The minimal level that is required from other players to join the game. Default is 0.
         :param max_level: The maximal level that is required from other players to join the game. Default is 999.
         :param server: The server to join the game. Default is Servers.Warsaw().
+        :param timeout: Seconds to wait for the server to create the room. GameConnectionError is raised after that.
 
         Example usage::
 
@@ -116,35 +337,20 @@ class BonkBot:
             raise TypeError("Minimal cannot be greater than the account level")
         if max_level < self.get_level():
             raise TypeError("Maximum level cannot be lower than the account level")
-        # kekw
-        if not (
-            isinstance(server, Servers.Stockholm) or
-            isinstance(server, Servers.Warsaw) or
-            isinstance(server, Servers.Brazil) or
-            isinstance(server, Servers.SanFrancisco) or
-            isinstance(server, Servers.Atlanta) or
-            isinstance(server, Servers.Mississippi) or
-            isinstance(server, Servers.Dallas) or
-            isinstance(server, Servers.Frankfurt) or
-            isinstance(server, Servers.London) or
-            isinstance(server, Servers.NewYork) or
-            isinstance(server, Servers.Seattle) or
-            isinstance(server, Servers.Seoul) or
-            isinstance(server, Servers.Sydney)
-        ):
+        if server not in SERVERS:
             raise TypeError("Server param is not a server")
 
         game = Game(
             self,
             name,
-            socketio.AsyncClient(ssl_verify=False),
+            socketio.AsyncClient(ssl_verify=False, reconnection=False),
             True,
             Modes.Classic(),
             True,
-            self.event_emitter,
+            self.router,
             game_create_params=[name, max_players, is_hidden, password, min_level, max_level, server]
         )
-        await game.connect()
+        await game.connect(timeout)
 
         return game
 
@@ -157,13 +363,80 @@ class BonkBot:
 
     async def get_b2_maps(self, request: str, by_name=True, by_author=True) -> List[Bonk2Map]:
         """
-        Returns list of bonk2 maps.
+        Returns list of bonk2 maps from the first page of search results.
+
+        :param request: Input string along which the search is performed.
+        :param by_name: True if you want to search map by its name. Default is True.
+        :param by_author: True if you want to search map by its author. Default is True.
+        """
+
+        maps, _ = await self.__get_b2_maps_page(request, by_name, by_author, 0)
+
+        return maps
+
+    async def iter_b2_maps(
+        self,
+        request: str,
+        by_name=True,
+        by_author=True,
+        limit: Union[int, None] = None
+    ) -> AsyncIterator[Bonk2Map]:
+        """
+        Yields bonk2 maps from all pages of search results. Next page is loaded while the current one is consumed.
 
         :param request: Input string along which the search is performed.
         :param by_name: True if you want to search map by its name. Default is True.
         :param by_author: True if you want to search map by its author. Default is True.
+        :param limit: maximal amount of maps to yield. Default is None (all maps).
+
+        Example usage::
+
+            async def main():
+                async for bonk_map in bot.iter_b2_maps("parkour", limit=100):
+                    print(bonk_map.name)
         """
 
+        if limit is not None and limit <= 0:
+            return
+
+        count = 0
+        starting_from = 0
+        next_page = asyncio.ensure_future(self.__get_b2_maps_page(request, by_name, by_author, starting_from))
+
+        try:
+            while next_page is not None:
+                maps, has_more = await next_page
+                next_page = None
+
+                if not maps:
+                    return
+
+                starting_from += len(maps)
+
+                if has_more and (limit is None or count + len(maps) < limit):
+                    next_page = asyncio.ensure_future(
+                        self.__get_b2_maps_page(request, by_name, by_author, starting_from)
+                    )
+
+                for bonk_map in maps:
+                    yield bonk_map
+                    count += 1
+
+                    if limit is not None and count >= limit:
+                        return
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def __get_b2_maps_page(
+        self,
+        request: str,
+        by_name: bool,
+        by_author: bool,
+        starting_from: int
+    ) -> Tuple[List[Bonk2Map], bool]:
+        """Returns one page of bonk2 maps search results and whether there are more pages or not."""
+
         async with self.aiohttp_session.post(
             url=links["map_get_b2"],
             data={
@@ -171,7 +444,7 @@ class BonkBot:
                 "searchmapname": str(by_name).lower(),
                 "searchsort": "best",
                 "searchstring": request,
-                "startingfrom": 0
+                "startingfrom": starting_from
             }
         ) as resp:
             data = await resp.json()
@@ -182,7 +455,7 @@ class BonkBot:
         return [
             Bonk2Map(
                 bonk_map["id"],
-                bonk_map["leveldata"],
+                self.map_cache.put(bonk_map["id"], bonk_map["leveldata"]),
                 bonk_map["name"],
                 bonk_map["authorname"],
                 bonk_map["publisheddate"],
@@ -190,15 +463,15 @@ class BonkBot:
                 bonk_map["vd"]
             )
             for bonk_map in data["maps"]
-        ]
+        ], data.get("more", len(data["maps"]) > 0)
 
     # why tf do you store bonk 1 maps data like that, chaz? mapid0=1597734&mapname0=hammer+vs+SUS+ptb+&creationdate...
     # @staticmethod
     # def get_b1_maps(request: str, by_name=True, by_author=True) -> List[Bonk1Map]:
     #     pass
 
-    async def get_rooms(self) -> List[Room]:
-        """Returns list of rooms in the bonk.io room list."""
+    async def get_raw_rooms(self) -> List[dict]:
+        """Returns raw json data of rooms in the bonk.io room list."""
 
         async with self.aiohttp_session.post(
             url=links["rooms"],
@@ -210,6 +483,11 @@ class BonkBot:
         ) as resp:
             data = await resp.json()
 
+        return data["rooms"]
+
+    async def get_rooms(self) -> List[Room]:
+        """Returns list of rooms in the bonk.io room list."""
+
         return [
             Room(
                 self,
@@ -221,9 +499,35 @@ class BonkBot:
                 mode_from_short_name(room["mode_mo"]),
                 room["minlevel"],
                 room["maxlevel"]
-            ) for room in data["rooms"]
+            ) for room in await self.get_raw_rooms()
         ]
 
+    def start_room_poller(self, min_interval: float = 2, max_interval: float = 30) -> RoomPoller:
+        """
+        Starts polling bonk.io room list in the background. Poller emits room_open, room_close and room_update events.
+
+        :param min_interval: minimal seconds between polls.
+        :param max_interval: maximal seconds between polls.
+
+        Example usage::
+
+            @bot.on("room_update")
+            async def on_room_update(room: Room, changes: dict):
+                if "players" in changes:
+                    print(f"{room.name}: {changes['players'][0]} -> {changes['players'][1]} players")
+
+            async def main():
+                bot.start_room_poller()
+                await bot.run()
+        """
+
+        self.room_poller.min_interval = min_interval
+        self.room_poller.max_interval = max_interval
+        self.room_poller.interval = min_interval
+        self.room_poller.start()
+
+        return self.room_poller
+
 
 class AccountBonkBot(BonkBot):
     """
@@ -275,7 +579,7 @@ class AccountBonkBot(BonkBot):
             OwnMap(
                 self,
                 bonk_map["id"],
-                bonk_map["leveldata"],
+                self.map_cache.put(bonk_map["id"], bonk_map["leveldata"]),
                 bonk_map["name"],
                 bonk_map["creationdate"],
                 bonk_map["published"] == 1,
@@ -347,6 +651,7 @@ def bonk_account_login(username: str, password: str) -> AccountBonkBot:
     elif data.get("e") == "password":
         raise BonkLoginError(f"Invalid password for account {username}")
 
+    http_tracer = HttpTracer()
     bot = AccountBonkBot(
         data["token"],
         data["id"],
@@ -356,16 +661,11 @@ def bonk_account_login(username: str, password: str) -> AccountBonkBot:
         None,
         None,
         data["legacyFriends"].split("#"),
-        aiohttp.ClientSession()
+        aiohttp.ClientSession(trace_configs=[http_tracer.trace_config])
     )
+    http_tracer.bot = bot
 
-    bot.avatars = [
-        parse_avatar(data["avatar1"]),
-        parse_avatar(data["avatar2"]),
-        parse_avatar(data["avatar3"]),
-        parse_avatar(data["avatar4"]),
-        parse_avatar(data["avatar5"])
-    ]
+    bot.avatars = parse_avatars([data["avatar1"], data["avatar2"], data["avatar3"], data["avatar4"], data["avatar5"]])
     bot.main_avatar = parse_avatar(data["avatar"])
 
     return bot
@@ -387,7 +687,9 @@ def bonk_guest_login(username: str) -> GuestBonkBot:
     if not (len(username) in range(2, 16)):
         raise BonkLoginError("Username must be between 2 and 16 characters")
 
-    bot = GuestBonkBot(username, True, 0, None, None, aiohttp.ClientSession())
+    http_tracer = HttpTracer()
+    bot = GuestBonkBot(username, True, 0, None, None, aiohttp.ClientSession(trace_configs=[http_tracer.trace_config]))
+    http_tracer.bot = bot
     dumb_avatar = Avatar({"layers": [], "bc": 4492031})
 
     bot.avatars = [dumb_avatar] * 5
@@ -0,0 +1,246 @@
+import asyncio
+import shlex
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+
+class Command:
+    """
+    Chat command that is handled by CommandRouter.
+
+    :param name: command name without prefix.
+    :param callback: coroutine function that gets game, message and list of command arguments. If it returns a
+            string, the string is sent to the game chat.
+    :param aliases: other names of the command.
+    :param cooldown: seconds between two uses of the command by anyone.
+    :param user_limit: maximal amount of uses by one player in user_window seconds. Default is None (no limit).
+    :param user_window: seconds of the sliding window for user_limit.
+    :param description: command description.
+
+    Uses of players that haven't used the command for user_window seconds are forgotten, so the amount of remembered
+    players doesn't grow with the amount of players that have ever used the command.
+    """
+
+    __slots__ = (
+        "name",
+        "callback",
+        "aliases",
+        "cooldown",
+        "user_limit",
+        "user_window",
+        "description",
+        "last_used",
+        "__user_uses",
+        "__pruned_at"
+    )
+
+    def __init__(
+        self,
+        name: str,
+        callback: Callable,
+        aliases: Iterable[str] = (),
+        cooldown: float = 0,
+        user_limit: Union[int, None] = None,
+        user_window: float = 60,
+        description: str = ""
+    ) -> None:
+        if not asyncio.iscoroutinefunction(callback):
+            raise TypeError(f"Can't register {name} command: callback is not a coroutine function")
+
+        self.name: str = name
+        self.callback: Callable = callback
+        self.aliases: Tuple[str, ...] = tuple(aliases)
+        self.cooldown: float = cooldown
+        self.user_limit: Union[int, None] = user_limit
+        self.user_window: float = user_window
+        self.description: str = description
+        self.last_used: float = float("-inf")
+        self.__user_uses: Dict[str, deque] = {}
+        self.__pruned_at: float = float("-inf")
+
+    def try_use(self, username: str, now: float) -> bool:
+        """
+        Marks command as used by the player if cooldowns allow it. Returns False if command is on cooldown.
+
+        :param username: username of the player that uses the command.
+        :param now: current monotonic time.
+        """
+
+        if now - self.last_used < self.cooldown:
+            return False
+
+        if self.user_limit is not None:
+            if now - self.__pruned_at >= self.user_window:
+                self.__prune(now)
+
+            uses = self.__user_uses.get(username)
+
+            if uses is None:
+                uses = self.__user_uses[username] = deque(maxlen=self.user_limit)
+            elif len(uses) == self.user_limit and now - uses[0] < self.user_window:
+                return False
+
+            uses.append(now)
+
+        self.last_used = now
+
+        return True
+
+    def __prune(self, now: float) -> None:
+        # Players whose newest use is out of the window can't be limited anymore
+        self.__user_uses = {
+            username: uses for username, uses in self.__user_uses.items() if now - uses[-1] < self.user_window
+        }
+        self.__pruned_at = now
+
+
+class CommandRouter:
+    """
+    Chat command framework on top of the message event. Command name is resolved with one dict lookup, so message
+    handling doesn't slow down with the amount of commands. Arguments are split like in a shell, so quoted arguments
+    can contain spaces.
+
+    :param bot: bot class whose messages are handled.
+    :param prefixes: command prefixes.
+    :param case_sensitive: indicates whether command names are case-sensitive or not.
+
+    Example usage::
+
+        @bot.command("ping", aliases=["p"], cooldown=1, user_limit=3, user_window=10)
+        async def ping(game: Game, message: Message, args: List[str]):
+            return "Pong!"
+    """
+
+    def __init__(self, bot, prefixes: Iterable[str] = ("!",), case_sensitive: bool = False) -> None:
+        self.bot = bot
+        self.prefixes: Tuple[str, ...] = tuple(sorted(prefixes, key=len, reverse=True))
+        self.case_sensitive: bool = case_sensitive
+        self.commands: Dict[str, Command] = {}
+        self.__names: Dict[str, Command] = {}
+        self.__is_listening: bool = False
+
+    def command(
+        self,
+        name: Union[str, None] = None,
+        aliases: Iterable[str] = (),
+        cooldown: float = 0,
+        user_limit: Union[int, None] = None,
+        user_window: float = 60,
+        description: str = ""
+    ) -> Callable:
+        """
+        Decorator that registers chat command.
+
+        :param name: command name without prefix. Default is None (name of decorated function).
+        :param aliases: other names of the command.
+        :param cooldown: seconds between two uses of the command by anyone.
+        :param user_limit: maximal amount of uses by one player in user_window seconds. Default is None (no limit).
+        :param user_window: seconds of the sliding window for user_limit.
+        :param description: command description.
+        """
+
+        def register(callback: Callable) -> Callable:
+            self.add_command(
+                Command(name or callback.__name__, callback, aliases, cooldown, user_limit, user_window, description)
+            )
+
+            return callback
+
+        return register
+
+    def add_command(self, command: Command) -> None:
+        """
+        Registers chat command.
+
+        :param command: Command class instance.
+        """
+
+        for name in (command.name,) + command.aliases:
+            key = self.__key(name)
+
+            if key in self.__names:
+                raise ValueError(f"Command name {name} is already used by {self.__names[key].name} command")
+
+        self.commands[command.name] = command
+
+        for name in (command.name,) + command.aliases:
+            self.__names[self.__key(name)] = command
+
+        if not self.__is_listening:
+            self.bot.router.on("message", self.handle)
+            self.__is_listening = True
+
+    def remove_command(self, name: str) -> None:
+        """
+        Removes chat command with all its aliases.
+
+        :param name: command name.
+        """
+
+        command = self.commands.pop(name)
+
+        for command_name in (command.name,) + command.aliases:
+            del self.__names[self.__key(command_name)]
+
+    def get_command(self, name: str) -> Union[Command, None]:
+        """
+        Returns command by its name or alias or None if there is no such command.
+
+        :param name: command name or alias without prefix.
+        """
+
+        return self.__names.get(self.__key(name))
+
+    def parse(self, content: str) -> Union[Tuple[Command, List[str]], None]:
+        """
+        Returns command and its arguments from message content or None if message is not a command.
+
+        :param content: message content.
+        """
+
+        for prefix in self.prefixes:
+            if content.startswith(prefix):
+                break
+        else:
+            return None
+
+        content = content[len(prefix):]
+        name, _, rest = content.partition(" ")
+        command = self.__names.get(self.__key(name))
+
+        if command is None:
+            return None
+
+        try:
+            args = shlex.split(rest)
+        except ValueError:
+            args = rest.split()
+
+        return command, args
+
+    async def handle(self, game, message) -> None:
+        """
+        Runs command from the message. You don't need to use it.
+
+        :param game: Game class instance where message was sent.
+        :param message: Message class instance.
+        """
+
+        parsed = self.parse(message.content)
+
+        if parsed is None:
+            return
+
+        command, args = parsed
+
+        if not command.try_use(message.author.username, time.monotonic()):
+            return
+
+        result = await command.callback(game, message, args)
+
+        if isinstance(result, str):
+            await game.send_message(result)
+
+    def __key(self, name: str) -> str:
+        return name if self.case_sensitive else name.lower()
@@ -0,0 +1,217 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Dict, Hashable, List, Union
+
+
+class Priority:
+    """Class for holding outbound emit priorities. Emits with lower value are sent first."""
+
+    MODERATION = 0
+    CONFIG = 1
+    CHAT = 2
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    :param rate: amount of tokens that are added every second.
+    :param burst: maximal amount of tokens in the bucket.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate: float = rate
+        self.burst: int = burst
+        self.__tokens: float = burst
+        self.__updated_at: float = time.monotonic()
+
+    def take(self) -> float:
+        """Takes one token. Returns how many seconds caller has to wait before the token is actually available."""
+
+        now = time.monotonic()
+        self.__tokens = min(self.burst, self.__tokens + (now - self.__updated_at) * self.rate)
+        self.__updated_at = now
+        self.__tokens -= 1
+
+        if self.__tokens >= 0:
+            return 0
+
+        return -self.__tokens / self.rate
+
+
+class _Emit:
+    __slots__ = ("event", "data", "priority", "coalesce_key", "futures")
+
+    def __init__(self, event: int, data: Union[dict, None], priority: int, coalesce_key: Union[Hashable, None]) -> None:
+        self.event: int = event
+        self.data: Union[dict, None] = data
+        self.priority: int = priority
+        self.coalesce_key: Union[Hashable, None] = coalesce_key
+        self.futures: List[asyncio.Future] = []
+
+
+class EmitQueue:
+    """
+    Per-game outbound queue that sends events with token bucket rate limiting and priorities.
+
+    Config emits with the same coalesce key that are waiting in the queue are merged into the latest one.
+
+    :param send: coroutine function that sends event and its data to the server.
+    :param rate: amount of emits that can be sent every second.
+    :param burst: amount of emits that can be sent at once.
+    :param max_chat_size: maximal amount of queued chat emits. The oldest ones are dropped when it is exceeded.
+    """
+
+    def __init__(self, send: Callable, rate: float = 10, burst: int = 10, max_chat_size: int = 50) -> None:
+        self.bucket: TokenBucket = TokenBucket(rate, burst)
+        self.max_chat_size: int = max_chat_size
+        self.sent: int = 0
+        self.dropped: int = 0
+        self.coalesced: int = 0
+        self.__send: Callable = send
+        self.__queues: List[deque] = [deque(), deque(), deque()]
+        self.__pending: Dict[Hashable, _Emit] = {}
+        self.__drain_task: Union[asyncio.Task, None] = None
+        self.__is_paused: bool = False
+
+    @property
+    def depth(self) -> int:
+        """Amount of emits waiting in the queue."""
+
+        return sum(len(queue) for queue in self.__queues)
+
+    def depths(self) -> Dict[int, int]:
+        """Returns amount of emits waiting in the queue by priority."""
+
+        return {priority: len(queue) for priority, queue in enumerate(self.__queues)}
+
+    def configure(self, rate: Union[float, None] = None, burst: Union[int, None] = None) -> None:
+        """
+        Changes rate limit of the queue.
+
+        :param rate: amount of emits that can be sent every second.
+        :param burst: amount of emits that can be sent at once.
+        """
+
+        if rate is not None:
+            self.bucket.rate = rate
+        if burst is not None:
+            self.bucket.burst = burst
+
+    def put(
+        self,
+        event: int,
+        data: Union[dict, None] = None,
+        priority: int = Priority.CONFIG,
+        coalesce_key: Union[Hashable, None] = None
+    ) -> asyncio.Future:
+        """
+        Queues event. Returns future that is resolved with True when event is sent or False when it is dropped.
+
+        :param event: socketio event id.
+        :param data: event data.
+        :param priority: one of the Priority values.
+        :param coalesce_key: emits with the same key that wait in the queue are merged into the latest one.
+        """
+
+        future = asyncio.get_event_loop().create_future()
+
+        if coalesce_key is not None and coalesce_key in self.__pending:
+            pending = self.__pending[coalesce_key]
+            pending.data = data
+            pending.futures.append(future)
+            self.coalesced += 1
+
+            return future
+
+        emit = _Emit(event, data, priority, coalesce_key)
+        emit.futures.append(future)
+        queue = self.__queues[priority]
+        queue.append(emit)
+
+        if coalesce_key is not None:
+            self.__pending[coalesce_key] = emit
+
+        if priority == Priority.CHAT and len(queue) > self.max_chat_size:
+            self.__resolve(queue.popleft(), False)
+            self.dropped += 1
+
+        if not self.__is_paused and (self.__drain_task is None or self.__drain_task.done()):
+            self.__drain_task = asyncio.ensure_future(self.__drain())
+
+        return future
+
+    def pause(self) -> None:
+        """Stops sending queued emits, for example while the game is reconnecting."""
+
+        self.__is_paused = True
+
+        if self.__drain_task is not None:
+            self.__drain_task.cancel()
+            self.__drain_task = None
+
+    def resume(self) -> None:
+        """Continues sending queued emits."""
+
+        self.__is_paused = False
+
+        if self.depth and (self.__drain_task is None or self.__drain_task.done()):
+            self.__drain_task = asyncio.ensure_future(self.__drain())
+
+    def clear(self) -> None:
+        """Drops all queued emits and stops sending."""
+
+        self.pause()
+
+        for queue in self.__queues:
+            while queue:
+                self.__resolve(queue.popleft(), False)
+
+        self.__is_paused = False
+
+    def __pop(self) -> Union[_Emit, None]:
+        for queue in self.__queues:
+            if queue:
+                return queue.popleft()
+
+        return None
+
+    def __resolve(self, emit: _Emit, result: bool) -> None:
+        if emit.coalesce_key is not None and self.__pending.get(emit.coalesce_key) is emit:
+            del self.__pending[emit.coalesce_key]
+
+        for future in emit.futures:
+            if not future.done():
+                future.set_result(result)
+
+    async def __drain(self) -> None:
+        while self.depth:
+            delay = self.bucket.take()
+
+            if delay:
+                await asyncio.sleep(delay)
+
+            emit = self.__pop()
+
+            if emit is None:
+                break
+
+            # Emit is not coalescable anymore once it is being sent
+            if emit.coalesce_key is not None and self.__pending.get(emit.coalesce_key) is emit:
+                del self.__pending[emit.coalesce_key]
+
+            try:
+                await self.__send(emit.event, emit.data)
+            except asyncio.CancelledError:
+                # Queue was paused while sending, emit is sent again on resume
+                self.__queues[emit.priority].appendleft(emit)
+                raise
+            except Exception as e:
+                for future in emit.futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.sent += 1
+            self.__resolve(emit, True)
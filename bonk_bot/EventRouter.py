@@ -0,0 +1,243 @@
+import asyncio
+import functools
+import re
+import time
+from typing import Callable, Dict, List, Pattern, Tuple, Union
+
+from pymitter import EventEmitter
+
+
+class EventRouter:
+    """
+    Dispatches game events to handlers that are registered for all games, for one game or for games whose room name
+    matches a pattern.
+
+    Handlers for all games stay in the pymitter event emitter. Handlers for games and room name patterns are resolved
+    once per (event, game) into a dispatch table, so emitting an event calls only handlers of that game and costs one
+    dict lookup when the game has no own handlers. The table is refreshed when handlers are added or removed and when
+    game changes its room name.
+
+    Coroutine handlers of all three kinds run together in one task per emitted event. Exceptions that they raise are
+    reported to the event loop exception handler.
+
+    Handler latency is measured per event name when bot.metrics or bot.profiler is enabled.
+
+    :param bot: bot class whose pymitter event emitter keeps handlers for all games.
+
+    Example usage::
+
+        @bot.on("message", room=r"\\[BOT\\] .*")
+        async def on_message(game: Game, message: Message):
+            ...
+    """
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+        self.event_emitter: EventEmitter = bot.event_emitter
+        self.__global_handlers: Dict[Tuple[str, Callable], Callable] = {}
+        self.__game_handlers: Dict[Tuple[str, object], List[Callable]] = {}
+        self.__pattern_handlers: Dict[str, List[Tuple[Pattern, Callable]]] = {}
+        self.__table: Dict[Tuple[str, object], Tuple[Callable, ...]] = {}
+        # Coroutines of handlers for all games that are collected while emit() runs the pymitter event emitter
+        self.__coroutines: Union[list, None] = None
+
+    def on(
+        self,
+        event: str,
+        handler: Union[Callable, None] = None,
+        game=None,
+        room: Union[str, Pattern, None] = None,
+        **kwargs
+    ) -> Callable:
+        """
+        Registers event handler. Can be used as a decorator.
+
+        :param event: event name.
+        :param handler: function or coroutine function that handles event.
+        :param game: Game class instance whose events are handled. Default is None (all games).
+        :param room: regular expression that room name has to fully match. Default is None (all rooms).
+        :param kwargs: other pymitter EventEmitter.on() params (e.g. ttl). Only handlers for all games support them.
+        """
+
+        if kwargs and (game is not None or room is not None):
+            raise TypeError(f"Can't register handler: {', '.join(kwargs)} is supported only for handlers of all games")
+
+        def register(func: Callable) -> Callable:
+            timed = self.__timed(event, func)
+
+            if game is not None:
+                self.__game_handlers.setdefault((event, game), []).append(timed)
+            elif room is not None:
+                self.__pattern_handlers.setdefault(event, []).append((re.compile(room), timed))
+            else:
+                collected = self.__global_handlers[(event, func)] = self.__collected(timed)
+                self.event_emitter.on(event, collected, **kwargs)
+
+            self.__invalidate_event(event)
+
+            return func
+
+        if handler is not None:
+            return register(handler)
+
+        return register
+
+    def off(self, event: str, handler: Callable, game=None) -> None:
+        """
+        Removes event handler.
+
+        :param event: event name.
+        :param handler: handler that was registered.
+        :param game: Game class instance that handler was registered for. Default is None (all games or room pattern).
+        """
+
+        pattern_handlers = self.__pattern_handlers.get(event, [])
+
+        if game is not None:
+            self.__game_handlers[(event, game)] = [
+                func for func in self.__game_handlers.get((event, game), []) if func.__wrapped__ is not handler
+            ]
+        elif any(func.__wrapped__ is handler for _, func in pattern_handlers):
+            self.__pattern_handlers[event] = [
+                (pattern, func) for pattern, func in pattern_handlers if func.__wrapped__ is not handler
+            ]
+        else:
+            self.event_emitter.off(event, self.__global_handlers.pop((event, handler), handler))
+
+        self.__invalidate_event(event)
+
+    def emit(self, event: str, game, *args) -> None:
+        """
+        Calls handlers of the event for all games and handlers of the game. You don't need to use it.
+
+        :param event: event name.
+        :param game: Game class instance where event happened.
+        :param args: other event arguments.
+        """
+
+        outer_coroutines = self.__coroutines
+        coroutines = self.__coroutines = []
+
+        try:
+            self.event_emitter.emit(event, game, *args)
+        finally:
+            self.__coroutines = outer_coroutines
+
+        handlers = self.__table.get((event, game))
+
+        if handlers is None:
+            handlers = self.__resolve(event, game)
+
+        for handler in handlers:
+            result = handler(game, *args)
+
+            if asyncio.iscoroutine(result):
+                coroutines.append(result)
+
+        if coroutines:
+            asyncio.ensure_future(self.__run_batch(coroutines))
+
+    def refresh(self, game) -> None:
+        """
+        Drops resolved handlers of the game, e.g. after its room name changed. You don't need to use it.
+
+        :param game: Game class instance.
+        """
+
+        for key in [key for key in self.__table if key[1] is game]:
+            del self.__table[key]
+
+    def forget(self, game) -> None:
+        """
+        Drops all handlers of the game after it was left. You don't need to use it.
+
+        :param game: Game class instance.
+        """
+
+        self.refresh(game)
+
+        for key in [key for key in self.__game_handlers if key[1] is game]:
+            del self.__game_handlers[key]
+
+    def __timed(self, event: str, handler: Callable) -> Callable:
+        """Wraps handler into function that measures its latency when metrics or profiler are enabled."""
+
+        name = f"{event} {getattr(handler, '__qualname__', repr(handler))}"
+
+        def record(seconds: float) -> None:
+            if self.bot.metrics.enabled:
+                self.bot.metrics.histogram(
+                    "bonk_handler_seconds", "Event handler latency", ("event",)
+                ).observe(seconds, event)
+            if self.bot.profiler is not None:
+                self.bot.profiler.record(name, seconds)
+
+        if asyncio.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def timed(*args):
+                if not self.bot.metrics.enabled and self.bot.profiler is None:
+                    return await handler(*args)
+
+                start = time.perf_counter()
+
+                try:
+                    return await handler(*args)
+                finally:
+                    record(time.perf_counter() - start)
+        else:
+            @functools.wraps(handler)
+            def timed(*args):
+                if not self.bot.metrics.enabled and self.bot.profiler is None:
+                    return handler(*args)
+
+                start = time.perf_counter()
+
+                try:
+                    return handler(*args)
+                finally:
+                    record(time.perf_counter() - start)
+
+        return timed
+
+    def __collected(self, handler: Callable) -> Callable:
+        """
+        Wraps handler for all games into function that passes its coroutine to emit(), so pymitter only calls it.
+        Coroutines of events that are emitted on the pymitter event emitter directly (e.g. room_open) run alone.
+        """
+
+        def collect(*args) -> None:
+            result = handler(*args)
+
+            if not asyncio.iscoroutine(result):
+                return
+
+            if self.__coroutines is None:
+                asyncio.ensure_future(self.__run_batch([result]))
+            else:
+                self.__coroutines.append(result)
+
+        return collect
+
+    async def __run_batch(self, coroutines: list) -> None:
+        for result in await asyncio.gather(*coroutines, return_exceptions=True):
+            if isinstance(result, Exception):
+                asyncio.get_event_loop().call_exception_handler({
+                    "message": "Exception in event handler",
+                    "exception": result
+                })
+
+    def __resolve(self, event: str, game) -> Tuple[Callable, ...]:
+        handlers = list(self.__game_handlers.get((event, game), []))
+
+        for pattern, handler in self.__pattern_handlers.get(event, []):
+            if pattern.fullmatch(game.room_name):
+                handlers.append(handler)
+
+        resolved = tuple(handlers)
+        self.__table[(event, game)] = resolved
+
+        return resolved
+
+    def __invalidate_event(self, event: str) -> None:
+        for key in [key for key in self.__table if key[0] == event]:
+            del self.__table[key]
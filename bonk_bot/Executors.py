@@ -0,0 +1,190 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, NamedTuple, Tuple, Union
+
+from .Avatar import Avatar
+from .Game import Game, Player, Message
+
+
+class PlayerSnapshot(NamedTuple):
+    """Picklable copy of Player that is passed to handlers in executors."""
+
+    short_id: int
+    username: str
+    is_guest: bool
+    level: int
+    is_ready: bool
+    is_bot: bool
+    team: int
+    avatar: Avatar
+
+
+class GameSnapshot(NamedTuple):
+    """Picklable copy of Game that is passed to handlers in executors."""
+
+    room_name: str
+    is_host: bool
+    mode: str
+    rounds: int
+    team_lock: bool
+    extended_teams: bool
+    players: Tuple[PlayerSnapshot, ...]
+
+
+class MessageSnapshot(NamedTuple):
+    """Picklable copy of Message that is passed to handlers in executors."""
+
+    content: str
+    author: PlayerSnapshot
+    timestamp: float
+
+
+def snapshot(value: Any) -> Any:
+    """
+    Returns picklable copy of Game, Player and Message. Other values are returned as they are.
+
+    :param value: event argument.
+    """
+
+    if isinstance(value, Game):
+        return GameSnapshot(
+            value.room_name,
+            value.is_host,
+            value.mode.short_name,
+            value.rounds,
+            value.team_lock,
+            value.extended_teams,
+            tuple(snapshot(player) for player in value.players)
+        )
+    if isinstance(value, Player):
+        return PlayerSnapshot(
+            value.short_id,
+            value.username,
+            value.is_guest,
+            value.level,
+            value.is_ready,
+            value.is_bot,
+            value.team.number,
+            value.avatar
+        )
+    if isinstance(value, Message):
+        return MessageSnapshot(value.content, snapshot(value.author), value.timestamp)
+
+    return value
+
+
+class HandlerExecutor:
+    """
+    Runs sync event handlers in a thread or process pool, so slow handlers don't stall the event loop.
+
+    Handlers get snapshots of event arguments (GameSnapshot, PlayerSnapshot, MessageSnapshot) instead of live objects.
+    Handlers for process pool have to be defined on module level, so they can be pickled. At most max_workers
+    handlers are submitted to the pool at once, others wait in the event loop. When max_queue handlers are waiting,
+    new calls are rejected.
+
+    :param kind: "thread" or "process".
+    :param max_workers: maximal amount of pool workers. Default is None (concurrent.futures default for the kind).
+    :param max_queue: maximal amount of handler calls that wait for a free worker.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: Union[int, None] = None, max_queue: int = 1000) -> None:
+        if kind not in ("thread", "process"):
+            raise ValueError("Executor kind must be thread or process")
+
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4) if kind == "thread" else os.cpu_count() or 1
+
+        self.kind: str = kind
+        self.max_workers: int = max_workers
+        self.max_queue: int = max_queue
+        self.queued: int = 0
+        self.running: int = 0
+        self.completed: int = 0
+        self.failed: int = 0
+        self.rejected: int = 0
+        self.__pool: Union[Executor, None] = None
+        self.__semaphore: Union[asyncio.Semaphore, None] = None
+
+    def wrap(self, handler: Callable, on_result: Union[Callable, None] = None) -> Callable:
+        """
+        Returns coroutine function that runs handler in the pool.
+
+        :param handler: sync function that handles event.
+        :param on_result: function or coroutine function that is called in the event loop with the original event
+                arguments and handler result. Default is None.
+        """
+
+        async def run(*args) -> None:
+            result = await self.submit(handler, *args)
+
+            if on_result is not None:
+                callback_result = on_result(*args, result)
+
+                if asyncio.iscoroutine(callback_result):
+                    await callback_result
+
+        run.__name__ = getattr(handler, "__name__", "run")
+
+        return run
+
+    async def submit(self, handler: Callable, *args) -> Any:
+        """
+        Runs handler with snapshots of args in the pool and returns its result.
+
+        :param handler: sync function.
+        :param args: handler arguments.
+        """
+
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise RuntimeError(f"{self.kind} executor queue is full")
+
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.max_workers)
+        if self.__pool is None:
+            if self.kind == "thread":
+                self.__pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="bonk_bot_handler")
+            else:
+                self.__pool = ProcessPoolExecutor(self.max_workers)
+
+        snapshots = [snapshot(arg) for arg in args]
+        self.queued += 1
+
+        try:
+            await self.__semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+
+        try:
+            result = await asyncio.get_event_loop().run_in_executor(self.__pool, handler, *snapshots)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self.__semaphore.release()
+
+        self.completed += 1
+
+        return result
+
+    def metrics(self) -> Dict[str, int]:
+        """Returns the amount of queued, running, completed, failed and rejected handler calls."""
+
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self) -> None:
+        """Stops pool workers. Pool is created again on the next call."""
+
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=False)
+            self.__pool = None
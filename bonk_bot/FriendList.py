@@ -42,10 +42,12 @@ class Friend:
 
         return db_id_to_date(self.user_id)
 
-    async def join_game(self) -> Game:
+    async def join_game(self, timeout=10) -> Game:
         """
         Establish connection with room where friend is playing.
 
+        :param timeout: seconds to wait for the server to confirm the room. GameConnectionError is raised after that.
+
         Example usage::
 
             bot = bonk_account_login("name", "pass")
@@ -54,7 +56,7 @@ class Friend:
             friend = [friend for friend in friend_list.get_friends() if friend.username == "test" and friend.room_id][0]
 
             async def main():
-                game = friend.join_game()
+                game = await friend.join_game()
                 await game.send_message("Hello!")
 
                 await bot.run()
@@ -62,11 +64,12 @@ class Friend:
             asyncio.run(main())
         """
 
-        room = [room for room in self.bot.get_rooms() if room.room_id == self.room_id][0]
-        game = room.join()
-        await game.connect()
+        room = await self.bot.rooms.get(self.room_id)
+
+        if room is None:
+            raise ValueError(f"Room of friend {self.username} is not in the room list")
 
-        return game
+        return await room.join(timeout=timeout)
 
 
 class FriendRequest:
@@ -1,16 +1,46 @@
 import asyncio
 import random
+import time
 from random import shuffle
 from string import ascii_lowercase
+import aiohttp
 import socketio
-from typing import List, Union
-from pymitter import EventEmitter
+from typing import Callable, Dict, Hashable, Union
 
 from .Avatar import Avatar
 from .BonkMaps import OwnMap, Bonk2Map, Bonk1Map
-from .Settings import PROTOCOL_VERSION, links
-from .Types import Servers, Modes, Teams
+from .Settings import PROTOCOL_VERSION, links, get_socket_address
+from .Types import Servers, Modes, Teams, MODES, TEAMS
 from .Parsers import team_from_number, mode_from_short_name
+from .PlayerRegistry import PlayerRegistry, PlayersView
+from .Scheduler import ScheduledTask
+from .EmitQueue import EmitQueue, Priority
+from .MapData import MapData, MapDecodeError, decode_map
+from .MessageHistory import MessageHistory
+from .EventRouter import EventRouter
+from .Recorder import PacketRecorder, INBOUND, OUTBOUND
+
+# Map that is sent to joining players while host hasn't set any map
+LOBBY_MAP = MapData(
+    13,
+    meta={
+        "a": "💀",
+        "n": "Test map",
+        "dbid": 1157352,
+        "date": "2024-06-04 06:03:34",
+        "cr": ["💀"],
+        "pub": True
+    }
+)
+
+# Errors of room address lookup and socket connection, they are raised as GameConnectionError and retried on reconnect
+CONNECTION_ERRORS = (
+    socketio.exceptions.ConnectionError,
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    ValueError,
+    KeyError
+)
 
 
 class Game:
@@ -24,10 +54,20 @@ class Game:
     :param mode: mode that is currently played.
     :param is_created_by_bot: indicates whether room is created by bot or not. Needed to define which method should be
             called in .connect() method.
-    :param event_emitter: pymitter event emitter for handling events in bot class.
+    :param router: event router that dispatches game events to bot's handlers.
     :param game_create_params: params that are needed for game creation.
     :param game_join_params: params that are needed to join the game.
     :param is_connected: indicates whether bot is connected or not.
+    :param auto_reconnect: indicates whether bot reconnects to the game when connection is lost.
+
+    Reconnection is retried up to reconnect_attempts times with jittered exponential backoff that starts from
+    reconnect_base_delay seconds and is capped by reconnect_max_delay seconds.
+
+    Events sent by game and its players go through outbound EmitQueue. Its rate limit can be changed with
+    game.outbound.configure(rate, burst).
+
+    Game messages are kept in bounded MessageHistory (last 500 messages by default). Replace game.messages with
+    your own MessageHistory to change its size or spill older messages to disk.
     """
 
     def __init__(
@@ -38,16 +78,17 @@ class Game:
         is_host: bool,
         mode: Union[Modes.Classic, Modes.Arrows, Modes.DeathArrows, Modes.Grapple, Modes.VTOL, Modes.Football],
         is_created_by_bot: bool,
-        event_emitter: EventEmitter,
+        router: EventRouter,
         game_create_params: Union[list, None] = None,
         game_join_params: Union[list, None] = None,
-        is_connected: bool = False
+        is_connected: bool = False,
+        auto_reconnect: bool = True
     ) -> None:
         self.bot = bot
         self.room_name: str = room_name
-        self.room_password: str = ""
-        self.players: List[Player] = []
-        self.messages: List[Message] = []
+        self.room_password: str = game_join_params[1] if game_join_params is not None else ""
+        self.__players: PlayerRegistry = PlayerRegistry()
+        self.messages: MessageHistory = MessageHistory()
         self.is_host: bool = is_host
         self.is_bot_ready: bool = False
         self.is_banned: bool = False
@@ -56,23 +97,268 @@ class Game:
         self.team_lock: bool = False
         self.rounds: int = 3
         self.bonk_map: Union[OwnMap, Bonk2Map, Bonk1Map, None] = None
+        self.map_data: Union[MapData, None] = None
         self.__initial_state: str = ""
         self.__socket_client: socketio.AsyncClient = socket_client
-        self.__event_emitter: EventEmitter = event_emitter
+        self.__router: EventRouter = router
         self.__is_created_by_bot: bool = is_created_by_bot
         self.__game_create_params: Union[list, None] = game_create_params
         self.__game_join_params: Union[list, None] = game_join_params
+        # Room list ID of the room, it is known for joined rooms and for created rooms once the server confirms them
+        self.__room_id: Union[int, None] = game_join_params[0] if game_join_params is not None else None
         self.__is_connected: bool = is_connected
+        self.__join_future: Union[asyncio.Future, None] = None
+        self.__keep_alive_task: Union[ScheduledTask, None] = None
+        self.auto_reconnect: bool = auto_reconnect
+        self.reconnect_attempts: int = 10
+        self.reconnect_base_delay: float = 1
+        self.reconnect_max_delay: float = 60
+        self.__connect_timeout: float = 10
+        self.__is_leaving: bool = False
+        self.__reconnect_task: Union[asyncio.Task, None] = None
+        self.__closed: asyncio.Event = asyncio.Event()
+        self.outbound: EmitQueue = EmitQueue(self.__send)
+        # Events are kept in the queue until the server confirms the room
+        self.outbound.pause()
+        self.recorder: Union[PacketRecorder, None] = None
+        self.__socket_handlers: Dict[int, Callable] = {}
+
+    @property
+    def players(self) -> PlayersView:
+        """Read-only view on players that are currently in the game."""
+
+        return self.__players.view
+
+    @property
+    def bot_player(self) -> Union["Player", None]:
+        """Bot's own Player in the game or None if bot isn't in the game yet."""
+
+        return self.__players.bot_player
+
+    def get_player(self, short_id: int) -> Union["Player", None]:
+        """
+        Returns player by its id in the game or None if there is no such player.
+
+        :param short_id: player's id in the game.
+        """
+
+        return self.__players.get(short_id)
+
+    def get_player_by_peer_id(self, peer_id: str) -> Union["Player", None]:
+        """
+        Returns player by its peer id or None if there is no such player.
+
+        :param peer_id: player's game peer id.
+        """
+
+        return self.__players.get_by_peer_id(peer_id)
+
+    def get_player_by_username(self, username: str) -> Union["Player", None]:
+        """
+        Returns player by its username or None if there is no such player. If several players have the username,
+        the one that joined first is returned.
+
+        :param username: player's username.
+        """
+
+        return self.__players.get_by_username(username)
+
+    def on(self, event: str, handler: Union[Callable, None] = None) -> Callable:
+        """
+        Registers event handler that is called only for events of this game. Can be used as a decorator.
+
+        :param event: event name.
+        :param handler: function or coroutine function that handles event.
+
+        Example usage::
+
+            @game.on("message")
+            async def on_message(game: Game, message: Message):
+                ...
+        """
 
-    async def connect(self) -> None:
-        """Method that establishes connection with game. You don't need to use it."""
+        return self.__router.on(event, handler, game=self)
 
-        self.bot.games.append(self)
+    async def emit(
+        self,
+        event: int,
+        data: Union[dict, None] = None,
+        priority: int = Priority.CONFIG,
+        coalesce_key: Union[Hashable, None] = None
+    ) -> asyncio.Future:
+        """
+        Queues event to be sent to the server through outbound queue. You don't need to use it.
+
+        Returns as soon as the event is queued, so callers don't wait while the game is connecting or reconnecting.
+        Returned future is resolved with True when the event is sent or False when it is dropped, await it to wait
+        for delivery.
+
+        :param event: socketio event id.
+        :param data: event data.
+        :param priority: one of the Priority values. Moderation events are sent first and chat is sent last.
+        :param coalesce_key: queued events with the same key are merged into the latest one.
+        """
+
+        delivery = self.outbound.put(event, data, priority, coalesce_key)
+        delivery.add_done_callback(self.__retrieve_delivery_error)
+
+        return delivery
+
+    @staticmethod
+    def __retrieve_delivery_error(delivery: asyncio.Future) -> None:
+        # Nobody awaits most deliveries, send errors are kept only in the future instead of being logged by asyncio
+        if not delivery.cancelled():
+            delivery.exception()
+
+    async def __send(self, event: int, data: Union[dict, None]) -> None:
+        await self.__socket_client.emit(event, data)
+
+        if self.recorder is not None:
+            self.recorder.record(OUTBOUND, event, [data])
+
+        metrics = self.bot.metrics
 
-        if self.__is_created_by_bot:
-            await self.__create(*self.__game_create_params)
+        if metrics.enabled:
+            metrics.counter("bonk_outbound_events_total", "Outbound socketio events", ("event",)).inc(event)
+
+    async def connect(self, timeout: float = 10) -> None:
+        """
+        Method that establishes connection with game. You don't need to use it.
+
+        Returns as soon as the server confirms the room, keep-alive is sent in the background.
+
+        :param timeout: seconds to wait for the server to confirm the room. GameConnectionError is raised after that.
+        """
+
+        if self not in self.bot.games:
+            self.bot.games.append(self)
+
+        self.__connect_timeout = timeout
+        self.__is_leaving = False
+        self.__closed.clear()
+
+        try:
+            await self.__establish(timeout, self.__is_created_by_bot)
+        except GameConnectionError:
+            await self.leave()
+            raise
+
+    async def __establish(self, timeout: float, create: bool) -> None:
+        """
+        Opens socket connection and waits until the server confirms the room. Http, socket and response errors are
+        raised as GameConnectionError.
+        """
+
+        self.__join_future = asyncio.get_event_loop().create_future()
+        # Queued events are sent only after the server confirms the room, otherwise they could overtake create or join
+        self.outbound.pause()
+
+        try:
+            if create:
+                await self.__create(*self.__game_create_params)
+            else:
+                await self.__join(self.__room_id, self.room_password)
+        except CONNECTION_ERRORS as e:
+            raise GameConnectionError(f"Cannot connect to server: {e!r}", self)
+
+        self.__is_connected = True
+
+        try:
+            await asyncio.wait_for(asyncio.shield(self.__join_future), timeout)
+        except asyncio.TimeoutError:
+            raise GameConnectionError(f"Server didn't confirm the room in {timeout} seconds", self)
+        except asyncio.CancelledError:
+            if not self.__join_future.cancelled():
+                raise
+
+            raise GameConnectionError("Disconnected before the server confirmed the room", self)
+
+        self.outbound.resume()
+        # Random first delay spreads keep-alives of different games over the whole interval
+        self.__keep_alive_task = self.bot.schedule_every(5, self.__keep_alive, delay=random.uniform(0, 5))
+
+    def __on_connection_lost(self) -> None:
+        """Stops keep-alive and starts reconnection when socket connection is lost not by leave()."""
+
+        self.__is_connected = False
+        self.outbound.pause()
+
+        if self.__keep_alive_task is not None:
+            self.__keep_alive_task.cancel()
+            self.__keep_alive_task = None
+
+        if self.__is_leaving or (self.__reconnect_task is not None and not self.__reconnect_task.done()):
+            return
+
+        if self.auto_reconnect:
+            self.__reconnect_task = asyncio.ensure_future(self.__reconnect())
         else:
-            await self.__join(*self.__game_join_params)
+            asyncio.ensure_future(self.leave())
+
+    async def __reconnect(self) -> None:
+        """Reconnects to the game with jittered exponential backoff and rebuilds its state."""
+
+        lost_at = time.monotonic()
+        self.__players.clear()
+
+        for attempt in range(self.reconnect_attempts):
+            await asyncio.sleep(random.uniform(0, min(self.reconnect_max_delay, self.reconnect_base_delay * 2 ** attempt)))
+
+            if self.__is_leaving:
+                return
+
+            self.__socket_client = socketio.AsyncClient(ssl_verify=False, reconnection=False)
+            # Room is recreated only if bot hosted it, otherwise bot rejoins the room it was in
+            recreate = self.__game_create_params is not None and (self.is_host or self.__room_id is None)
+
+            if recreate:
+                self.__game_create_params[0] = self.room_name
+                self.__game_create_params[3] = self.room_password
+
+            try:
+                await self.__establish(self.__connect_timeout, recreate)
+            except GameConnectionError:
+                self.__is_connected = False
+                self.outbound.pause()
+
+                if self.__keep_alive_task is not None:
+                    self.__keep_alive_task.cancel()
+                    self.__keep_alive_task = None
+
+                await self.__socket_client.disconnect()
+                continue
+
+            if recreate:
+                await self.__restore_host_state()
+
+            metrics = self.bot.metrics
+
+            if metrics.enabled:
+                metrics.counter("bonk_reconnects_total", "Successful game reconnects").inc()
+
+            self.__router.emit("game_reconnect", self, time.monotonic() - lost_at)
+            return
+
+        await self.leave()
+
+    async def __restore_host_state(self) -> None:
+        """Applies settings of the lost room to the recreated one."""
+
+        await self.set_mode(self.mode)
+        await self.set_rounds(self.rounds)
+        await self.toggle_teams(self.extended_teams)
+        await self.toggle_team_lock(self.team_lock)
+
+        if self.bonk_map is not None:
+            await self.set_map(self.bonk_map)
+        elif self.map_data is not None:
+            await self.set_map(self.map_data)
+
+    def __resolve_join(self) -> None:
+        """Marks the connection as confirmed by the server."""
+
+        if self.__join_future is not None and not self.__join_future.done():
+            self.__join_future.set_result(None)
 
     @staticmethod
     def __get_peer_id() -> str:
@@ -103,21 +389,16 @@ class Game:
         :param team: target team that is bot moving in.
         """
 
-        if not (
-            isinstance(team, Teams.Spectator) or
-            isinstance(team, Teams.FFA) or
-            isinstance(team, Teams.Red) or
-            isinstance(team, Teams.Blue) or
-            isinstance(team, Teams.Green) or
-            isinstance(team, Teams.Yellow)
-        ):
+        if team not in TEAMS:
             raise TypeError("Can't move player: team param is not a valid team")
 
-        await self.__socket_client.emit(
+        await self.emit(
             6,
             {
                 "targetTeam": team.number
-            }
+            },
+            Priority.CONFIG,
+            6
         )
 
     async def toggle_team_lock(self, flag: bool) -> None:
@@ -127,13 +408,15 @@ class Game:
         :param flag: on -> True (locked teams) | off -> False (free team switching).
         """
 
-        await self.__socket_client.emit(
+        await self.emit(
             7,
             {
                 "teamLock": flag
-            }
+            },
+            Priority.CONFIG,
+            7
         )
-        self.team_lock = True
+        self.team_lock = flag
 
     async def send_message(self, message: str) -> None:
         """
@@ -142,11 +425,12 @@ class Game:
         :param message: message content.
         """
 
-        await self.__socket_client.emit(
+        await self.emit(
             10,
             {
                 "message": message
-            }
+            },
+            Priority.CHAT
         )
 
     async def toggle_bot_ready(self, flag: bool) -> None:
@@ -156,11 +440,13 @@ class Game:
         :param flag: on -> True (bot is ready) | off -> False (bot is not ready).
         """
 
-        await self.__socket_client.emit(
+        await self.emit(
             16,
             {
                 "ready": flag
-            }
+            },
+            Priority.CONFIG,
+            16
         )
         self.is_bot_ready = flag
 
@@ -174,22 +460,17 @@ class Game:
         :param mode: one of the Modes class types.
         """
 
-        if not (
-            isinstance(mode, Modes.Classic) or
-            isinstance(mode, Modes.Arrows) or
-            isinstance(mode, Modes.DeathArrows) or
-            isinstance(mode, Modes.Grapple) or
-            isinstance(mode, Modes.VTOL) or
-            isinstance(mode, Modes.Football)
-        ):
-            raise TypeError("Can't move player: team param is not a valid team")
+        if mode not in MODES:
+            raise TypeError("Can't set mode: mode param is not a valid mode")
 
-        await self.__socket_client.emit(
+        await self.emit(
             20,
             {
                 "ga": mode.ga,
                 "mo": mode.short_name
-            }
+            },
+            Priority.CONFIG,
+            20
         )
         self.mode = mode
 
@@ -200,35 +481,66 @@ class Game:
         :param rounds: rounds that player has to reach to win the game.
         """
 
-        await self.__socket_client.emit(
+        await self.emit(
             21,
             {
                 "w": rounds
-            }
+            },
+            Priority.CONFIG,
+            21
         )
         self.rounds = rounds
 
-    async def set_map(self, bonk_map: Union[OwnMap, Bonk2Map, Bonk1Map]) -> None:
+    async def set_map(self, bonk_map: Union[OwnMap, Bonk2Map, Bonk1Map, MapData, int]) -> None:
         """
         Change game map.
 
-        :param bonk_map: the map that is wanted to be played in the game.
+        :param bonk_map: the map that is wanted to be played in the game. MapData is encoded once and the encoded map
+                is reused when the same map is set again. Map database ID (int) is read from bot.map_cache, so maps
+                that bot has loaded or seen in games can be set without searching them again.
         """
 
-        if not (
+        if isinstance(bonk_map, int):
+            encoded = await self.bot.map_cache.load(bonk_map)
+
+            if encoded is None:
+                raise ValueError(f"Can't set map: map {bonk_map} is not in bot.map_cache")
+
+            try:
+                map_data = decode_map(encoded)
+            except MapDecodeError:
+                map_data = None
+
+            bonk_map = None
+        elif isinstance(bonk_map, MapData):
+            encoded = bonk_map.encode()
+            map_data = bonk_map
+            bonk_map = None
+        elif (
             isinstance(bonk_map, OwnMap) or
             isinstance(bonk_map, Bonk2Map) or
             isinstance(bonk_map, Bonk1Map)
         ):
+            bonk_map.map_data = self.bot.map_cache.put(bonk_map.map_id, bonk_map.map_data)
+            encoded = bonk_map.map_data
+
+            try:
+                map_data = decode_map(encoded)
+            except MapDecodeError:
+                map_data = None
+        else:
             raise TypeError("Input param is not a map")
 
-        await self.__socket_client.emit(
+        await self.emit(
             23,
             {
-                "m": bonk_map.map_data
-            }
+                "m": encoded
+            },
+            Priority.CONFIG,
+            23
         )
         self.bonk_map = bonk_map
+        self.map_data = map_data
 
     async def toggle_teams(self, flag: bool) -> None:
         """
@@ -237,18 +549,40 @@ class Game:
         :param flag: on -> True (extended teams) | off -> False (only FFA).
         """
 
-        await self.__socket_client.emit(
+        await self.emit(
             32,
             {
                 "t": flag
-            }
+            },
+            Priority.CONFIG,
+            32
         )
         self.extended_teams = flag
 
     async def record(self) -> None:
         """Record the last 15 seconds of round."""
 
-        await self.__socket_client.emit(33)
+        await self.emit(33)
+
+    def start_recording(self, path: str) -> PacketRecorder:
+        """
+        Starts writing inbound and outbound socketio packets of the game to the binary log. Log can be replayed with
+        PacketReplayer.
+
+        :param path: path of the log file. New packets are appended to an existing log.
+        """
+
+        self.stop_recording()
+        self.recorder = PacketRecorder(path)
+
+        return self.recorder
+
+    def stop_recording(self) -> None:
+        """Stops writing socketio packets and closes the log file."""
+
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
 
     async def change_room_name(self, new_room_name: str) -> None:
         """
@@ -257,13 +591,16 @@ class Game:
         :param new_room_name: new room name.
         """
 
-        await self.__socket_client.emit(
+        await self.emit(
             52,
             {
                 "newName": new_room_name
-            }
+            },
+            Priority.CONFIG,
+            52
         )
         self.room_name = new_room_name
+        self.__router.refresh(self)
 
     async def change_room_password(self, new_password: str) -> None:
         """
@@ -272,35 +609,85 @@ class Game:
         :param new_password: new room password.
         """
 
-        await self.__socket_client.emit(
+        await self.emit(
             53,
             {
                 "newPass": new_password
-            }
+            },
+            Priority.CONFIG,
+            53
         )
         self.room_password = new_password
 
     async def leave(self) -> None:
-        """Disconnect from the game."""
+        """Disconnect from the game. Does nothing if bot is already leaving or has left the game."""
+
+        if self.__is_leaving:
+            return
 
+        self.__is_leaving = True
+
+        if self.__reconnect_task is not None and self.__reconnect_task is not asyncio.current_task():
+            self.__reconnect_task.cancel()
+
+        self.outbound.clear()
         await self.__socket_client.disconnect()
         self.__is_connected = False
-        self.players = []
-        self.messages = []
+        self.__closed.set()
+
+        if self.__keep_alive_task is not None:
+            self.__keep_alive_task.cancel()
+            self.__keep_alive_task = None
+        if self.__join_future is not None and not self.__join_future.done():
+            self.__join_future.cancel()
 
-        self.__event_emitter.emit("game_disconnect", self)
+        self.__players.clear()
+        self.messages.clear()
+        self.stop_recording()
+
+        if self in self.bot.games:
+            self.bot.games.remove(self)
+
+        self.__router.emit("game_disconnect", self)
+        self.__router.forget(self)
 
     async def close(self) -> None:
         """Close the game."""
 
-        await self.__socket_client.emit(50)
+        delivery = await self.emit(50, priority=Priority.MODERATION)
+        # Leaving drops queued events, so the close event has to be sent first
+        await asyncio.wait([delivery], timeout=self.__connect_timeout)
         await self.leave()
 
-        self.__event_emitter.emit("game_disconnect", self)
-
     async def wait(self) -> None:
-        """Prevents socketio session from stopping. You don't need to use it."""
-        await self.__socket_client.wait()
+        """Prevents game from stopping until bot leaves it, reconnections included. You don't need to use it."""
+        await self.__closed.wait()
+
+    async def start_offline(self) -> None:
+        """
+        Registers socketio event handlers on the socket client without connecting to the server, so recorded events
+        can be fed with feed(). You don't need to use it.
+        """
+
+        self.__is_leaving = False
+        self.__closed.clear()
+        await self.__socket_events()
+        self.__is_connected = True
+        self.outbound.resume()
+
+    async def feed(self, event: int, *args) -> None:
+        """
+        Runs socketio event handler as if the event came from the server. Unknown events are ignored. You don't need
+        to use it.
+
+        :param event: socketio event id.
+        :param args: event arguments.
+        """
+
+        handler = self.__socket_handlers.get(event)
+
+        if handler is not None:
+            await handler(*args)
 
     async def __create(
         self,
@@ -312,7 +699,8 @@ class Game:
         max_level=999,
         server=Servers.Warsaw()
     ) -> None:
-        socket_address = f"https://{server}.bonk.io/socket.io"
+        socket_address = get_socket_address(str(server))
+        self.room_password = password
 
         @self.__socket_client.event
         async def connect():
@@ -367,11 +755,10 @@ class Game:
                 )
             self.__is_connected = True
 
-            self.players.append(
+            self.__players.add(
                 Player(
                     self.bot,
                     self,
-                    self.__socket_client,
                     True,
                     new_peer_id,
                     self.bot.username,
@@ -385,14 +772,10 @@ class Game:
                 )
             )
 
-        self.__event_emitter.emit("game_connect", self)
+        self.__router.emit("game_connect", self)
         await self.__socket_events()
 
         await self.__socket_client.connect(socket_address)
-        await self.__keep_alive()
-
-        while not self.__is_connected:
-            await asyncio.sleep(0.5)
 
     async def __join(self, room_id: int, password="") -> None:
         async with self.bot.aiohttp_session.post(
@@ -441,36 +824,85 @@ class Game:
 
             self.__is_connected = True
 
-        self.__event_emitter.emit("game_connect", self)
+        self.__router.emit("game_connect", self)
         await self.__socket_events()
 
-        await self.__socket_client.connect(f"https://{room_data['server']}.bonk.io/socket.io")
-        await self.__keep_alive()
-
-        while not self.__is_connected:
-            await asyncio.sleep(0.5)
+        await self.__socket_client.connect(get_socket_address(room_data["server"]))
 
     async def __keep_alive(self) -> None:
-        while self.__is_connected:
-            await self.__socket_client.emit(
-                18,
-                {
-                    "jsonrpc": "2.0",
-                    "id": "9",
-                    "method": "timesync",
-                }
-            )
-            await asyncio.sleep(5)
+        if not self.__is_connected:
+            return
+
+        data = {
+            "jsonrpc": "2.0",
+            "id": "9",
+            "method": "timesync",
+        }
+        await self.__socket_client.emit(18, data)
+
+        if self.recorder is not None:
+            self.recorder.record(OUTBOUND, 18, [data])
+
+    def __socket_handler(self, event: int) -> Callable:
+        """Registers handler of the inbound socketio event on the current socket client."""
+
+        def register(handler: Callable) -> Callable:
+            name = f"socket {event} {handler.__name__}"
+
+            async def handle(*args) -> None:
+                metrics = self.bot.metrics
+                profiler = self.bot.profiler
+
+                if self.recorder is not None:
+                    self.recorder.record(INBOUND, event, args)
+
+                if metrics.enabled:
+                    metrics.counter("bonk_inbound_events_total", "Inbound socketio events", ("event",)).inc(event)
+
+                if profiler is None:
+                    await handler(*args)
+                    return
+
+                start = time.perf_counter()
+
+                try:
+                    await handler(*args)
+                finally:
+                    profiler.record(name, time.perf_counter() - start)
+
+            self.__socket_client.on(event, handle)
+            self.__socket_handlers[event] = handle
+
+            return handler
+
+        return register
 
     async def __socket_events(self) -> None:
-        @self.__socket_client.on(3)
+        socket_client = self.__socket_client
+
+        @self.__socket_client.event
+        async def disconnect() -> None:
+            if socket_client is self.__socket_client:
+                self.__on_connection_lost()
+
+        @self.__socket_handler(2)
+        async def on_room_create(*args) -> None:
+            # Server sends room list ID of the created room first, it is needed to rejoin the room without hosting it
+            if args and isinstance(args[0], int):
+                self.__room_id = args[0]
+
+            self.__resolve_join()
+
+        @self.__socket_handler(3)
         async def players_on_bot_join(w1, w2, players: list, w3, w4, w5, w6, w7):
-            [
-                self.players.append(
+            for short_id, player in enumerate(players):
+                if player is None:
+                    continue
+
+                self.__players.add(
                     Player(
                         self.bot,
                         self,
-                        self.__socket_client,
                         False,
                         player["peerID"],
                         player["userName"],
@@ -479,22 +911,26 @@ class Game:
                         player["ready"],
                         player["tabbed"],
                         team_from_number(player["team"]),
-                        players.index(player),
+                        short_id,
                         Avatar(player["avatar"])
                     )
-                ) for player in players if player is not None
-            ]
-
-            bot = [player for player in self.players if player.username == self.bot.username and player.level == self.bot.get_level()][0]
-            self.players[self.players.index(bot)].is_bot = True
+                )
 
-            for x in self.players:
-                if x.team.number > 1:
+                if player["team"] > 1:
                     self.extended_teams = True
 
-            self.__event_emitter.emit("game_join", self)
+            # Guests can have the same username, the bot joins last, so the newest namesake with its level is the bot
+            namesakes = self.__players.get_all_by_username(self.bot.username)
+            bot_level = self.bot.get_level()
+            bot = next((player for player in reversed(namesakes) if player.level == bot_level), None)
+
+            if bot is not None:
+                self.__players.set_bot_player(bot)
+
+            self.__resolve_join()
+            self.__router.emit("game_join", self)
 
-        @self.__socket_client.on(4)
+        @self.__socket_handler(4)
         async def on_player_join(
             short_id: int,
             peer_id: str,
@@ -507,7 +943,6 @@ class Game:
             joined_player = Player(
                 self.bot,
                 self,
-                self.__socket_client,
                 False,
                 peer_id,
                 username,
@@ -520,53 +955,15 @@ class Game:
                 Avatar(avatar)
             )
 
-            self.players.append(joined_player)
+            self.__players.add(joined_player)
 
             if self.is_host:
-                await self.__socket_client.emit(
+                await self.emit(
                     11,
                     {
                         "sid": short_id,
                         "gs": {
-                            "map": {
-                                "v": 13,
-                                "s": {
-                                    "re": False,
-                                    "nc": False,
-                                    "pq": 1,
-                                    "gd": 25,
-                                    "fl": False
-                                },
-                                "physics": {
-                                    "shapes": [],
-                                    "fixtures": [],
-                                    "bodies": [],
-                                    "bro": [],
-                                    "joints": [],
-                                    "ppm": 12
-                                },
-                                "spawns": [],
-                                "capZones": [],
-                                "m": {
-                                    "a": "💀",
-                                    "n": "Test map",
-                                    "dbv": 2,
-                                    "dbid": 1157352,
-                                    "authid": -1,
-                                    "date": "2024-06-04 06:03:34",
-                                    "rxid": 0,
-                                    "rxn": "",
-                                    "rxa": "",
-                                    "rxdb": 1,
-                                    "cr": [
-                                        "💀"
-                                    ],
-                                    "pub": True,
-                                    "mo": "",
-                                    "vu": 0,
-                                    "vd": 0
-                                }
-                            },
+                            "map": (self.map_data or LOBBY_MAP).to_game_state(),
                             "gt": 2,
                             "wl": "pog",
                             "q": False,
@@ -577,26 +974,35 @@ class Game:
                             "bal": [],
                             "GMMode": ""
                         }
-                    }
+                    },
+                    Priority.CONFIG
                 )
-            self.__event_emitter.emit("player_join", self, joined_player)
+            self.__router.emit("player_join", self, joined_player)
 
-        @self.__socket_client.on(5)
+        @self.__socket_handler(5)
         async def on_player_left(short_id: int, w) -> None:
-            left_player = [player for player in self.players if player.short_id == short_id][0]
-            self.players.remove(left_player)
+            left_player = self.__players.get(short_id)
+
+            if left_player is None:
+                return
 
-            self.__event_emitter.emit("player_left", self, left_player)
+            self.__players.remove(left_player)
 
-        @self.__socket_client.on(8)
+            self.__router.emit("player_left", self, left_player)
+
+        @self.__socket_handler(8)
         async def on_player_ready(short_id: int, flag: bool) -> None:
-            player = [player for player in self.players if player.short_id == short_id][0]
+            player = self.__players.get(short_id)
+
+            if player is None:
+                return
+
             player.is_ready = flag
 
             if flag:
-                self.__event_emitter.emit("player_ready", self, player)
+                self.__router.emit("player_ready", self, player)
 
-        @self.__socket_client.on(16)
+        @self.__socket_handler(16)
         async def on_error(error) -> None:
             exception = GameConnectionError(error, self)
 
@@ -607,7 +1013,11 @@ class Game:
                     self
                 )
 
-            self.__event_emitter.emit("error", self, error)
+            self.__router.emit("error", self, error)
+
+            # Connecting coroutine raises the error, so it isn't raised here again
+            if self.__join_future is not None and not self.__join_future.done():
+                self.__join_future.set_exception(exception)
 
             if error in [
                 "invalid_params",
@@ -621,109 +1031,142 @@ class Game:
             ]:
                 await self.leave()
 
-            raise exception
-
-        @self.__socket_client.on(18)
+        @self.__socket_handler(18)
         async def on_player_team_change(short_id: int, team_number: int) -> None:
-            player = [player for player in self.players if player.short_id == short_id][0]
+            player = self.__players.get(short_id)
+
+            if player is None:
+                return
+
             team = team_from_number(team_number)
             player.team = team
 
-            self.__event_emitter.emit("player_team_change", self, player, team)
+            self.__router.emit("player_team_change", self, player, team)
 
-        @self.__socket_client.on(19)
+        @self.__socket_handler(19)
         async def on_team_lock(flag: bool) -> None:
             self.team_lock = flag
 
             if flag:
-                self.__event_emitter.emit("team_lock", self)
+                self.__router.emit("team_lock", self)
             else:
-                self.__event_emitter.emit("team_unlock", self)
+                self.__router.emit("team_unlock", self)
 
-        @self.__socket_client.on(20)
+        @self.__socket_handler(20)
         async def on_message(short_id: int, message: str) -> None:
-            author = [player for player in self.players if player.short_id == short_id][0]
+            author = self.__players.get(short_id)
+
+            if author is None:
+                return
+
             _message = Message(message, author, self)
 
-            self.messages.append(Message(message, author, self))
+            self.messages.append(_message)
+
+            metrics = self.bot.metrics
+
+            if metrics.enabled:
+                metrics.counter("bonk_messages_total", "Received chat messages").inc()
 
             if not author.is_bot:
-                self.__event_emitter.emit("message", self, _message)
+                self.__router.emit("message", self, _message)
 
-        @self.__socket_client.on(21)
+        @self.__socket_handler(21)
         async def on_lobby_load(data: dict) -> None:
             self.mode = mode_from_short_name(data["mo"])
             self.team_lock = data["tl"]
             self.rounds = data["wl"]
 
-        @self.__socket_client.on(24)
+        @self.__socket_handler(24)
         async def on_player_kick(short_id: int, kick_only: bool) -> None:
-            player = [player for player in self.players if player.short_id == short_id][0]
+            player = self.__players.get(short_id)
+
+            if player is None:
+                return
 
             if kick_only:
                 if player.is_bot:
-                    self.__event_emitter.emit("bot_kick", self)
+                    self.__router.emit("bot_kick", self)
                     await self.leave()
                 else:
-                    self.__event_emitter.emit("player_kick", self, player)
+                    self.__router.emit("player_kick", self, player)
             else:
                 if player.is_bot:
-                    self.__event_emitter.emit("bot_ban", self)
+                    self.__router.emit("bot_ban", self)
                     await self.leave()
                     self.is_banned = True
                 else:
-                    self.__event_emitter.emit("player_ban", self, player)
+                    self.__router.emit("player_ban", self, player)
 
-        @self.__socket_client.on(26)
+        @self.__socket_handler(26)
         async def on_mode_change(ga, mode_short_name: str) -> None:
             self.mode = mode_from_short_name(mode_short_name)
 
-            self.__event_emitter.emit("mode_change", self, self.mode)
+            self.__router.emit("mode_change", self, self.mode)
 
-        @self.__socket_client.on(29)
+        @self.__socket_handler(29)
         async def on_map_change(map_data: str) -> None:
-            pass
+            try:
+                self.map_data = decode_map(map_data)
+            except MapDecodeError:
+                self.map_data = None
+
+            # Maps that hosts set are cached, so bot can set them later by database ID
+            if self.map_data is not None and self.map_data.db_id > 0:
+                self.bot.map_cache.put(self.map_data.db_id, map_data)
+
+            self.bonk_map = None
 
-        @self.__socket_client.on(36)
+            self.__router.emit("map_change", self, self.map_data)
+
+        @self.__socket_handler(36)
         async def on_player_balance(short_id: int, percents: int) -> None:
-            player = [player for player in self.players if player.short_id == short_id][0]
+            player = self.__players.get(short_id)
+
+            if player is None:
+                return
+
             player.balanced_by = percents
 
-            self.__event_emitter.emit("player_balance", self, player, percents)
+            self.__router.emit("player_balance", self, player, percents)
 
-        @self.__socket_client.on(39)
+        @self.__socket_handler(39)
         async def on_teams_toggle(flag: bool) -> None:
             self.extended_teams = flag
 
             if flag:
-                self.__event_emitter.emit("teams_turn_on", self)
+                self.__router.emit("teams_turn_on", self)
             else:
-                self.__event_emitter.emit("teams_turn_off", self)
+                self.__router.emit("teams_turn_off", self)
 
-        @self.__socket_client.on(41)
+        @self.__socket_handler(41)
         async def on_host_change(data: dict) -> None:
-            old_host = [player for player in self.players if player.short_id == data["oldHost"]][0]
-            new_host = [player for player in self.players if player.short_id == data["newHost"]][0]
+            old_host = self.__players.get(data["oldHost"])
+            new_host = self.__players.get(data["newHost"])
+
+            if old_host is None or new_host is None:
+                return
 
             if old_host.is_bot and not new_host.is_bot:
                 self.is_host = False
             elif not old_host.is_bot and new_host.is_bot:
                 self.is_host = True
 
-            self.__event_emitter.emit("host_change", self, old_host, new_host)
+            self.__router.emit("host_change", self, old_host, new_host)
 
-        @self.__socket_client.on(58)
+        @self.__socket_handler(58)
         async def on_new_room_name(new_room_name: str) -> None:
             self.room_name = new_room_name
+            self.__router.refresh(self)
 
-            self.__event_emitter.emit("new_room_name", self, new_room_name)
+            self.__router.emit("new_room_name", self, new_room_name)
 
-        @self.__socket_client.on(59)
+        @self.__socket_handler(59)
         async def on_room_password_change(flag: int) -> None:
             if bool(flag):
-                self.__event_emitter.emit("new_room_password", self)
+                self.__router.emit("new_room_password", self)
             else:
-                self.__event_emitter.emit("room_password_clear", self)
+                self.__router.emit("room_password_clear", self)
 
 
 class Player:
@@ -732,7 +1175,6 @@ class Player:
 
     :param bot: bot class that uses in the same game with player.
     :param game: the game which player is playing in.
-    :param socket_client: socketio client for emitting events.
     :param is_bot: indicates whether player is bot or not.
     :param peer_id: player's game peer id.
     :param username: player's username.
@@ -749,7 +1191,6 @@ class Player:
         self,
         bot,
         game: Game,
-        socket_client: socketio.AsyncClient,
         is_bot: bool,
         peer_id: str,
         username: str,
@@ -773,50 +1214,59 @@ class Player:
         self.balanced_by: int = 0
         self.short_id: int = short_id
         self.avatar: Avatar = avatar
-        self.__socket_client: socketio.AsyncClient = socket_client
         self.__peer_id: str = peer_id
 
+    @property
+    def peer_id(self) -> str:
+        """Player's game peer id."""
+
+        return self.__peer_id
+
     async def send_friend_request(self) -> None:
         """Send friend request to the player."""
 
-        await self.__socket_client.emit(
+        await self.game.emit(
             35,
             {
                 "id": self.short_id
-            }
+            },
+            Priority.CHAT
         )
 
     async def give_host(self) -> None:
         """Give the host permissions to player."""
 
-        await self.__socket_client.emit(
+        await self.game.emit(
             34,
             {
                 "id": self.short_id
-            }
+            },
+            Priority.MODERATION
         )
         self.game.is_host = False
 
     async def kick(self) -> None:
         """Kick player from game."""
 
-        await self.__socket_client.emit(
+        await self.game.emit(
             9,
             {
                 "banshortid": self.short_id,
                 "kickonly": True
-            }
+            },
+            Priority.MODERATION
         )
 
     async def ban(self) -> None:
         """Ban player from game."""
 
-        await self.__socket_client.emit(
+        await self.game.emit(
             9,
             {
                 "banshortid": self.short_id,
                 "kickonly": False
-            }
+            },
+            Priority.MODERATION
         )
 
     async def move_to_team(
@@ -829,22 +1279,17 @@ class Player:
         :param team: Teams class that indicates player's team.
         """
 
-        if not (
-            isinstance(team, Teams.Spectator) or
-            isinstance(team, Teams.FFA) or
-            isinstance(team, Teams.Red) or
-            isinstance(team, Teams.Blue) or
-            isinstance(team, Teams.Green) or
-            isinstance(team, Teams.Yellow)
-        ):
+        if team not in TEAMS:
             raise TypeError("Can't move player: team param is not a valid team")
 
-        await self.__socket_client.emit(
+        await self.game.emit(
             26,
             {
                 "targetID": self.short_id,
                 "targetTeam": team.number
-            }
+            },
+            Priority.MODERATION,
+            (26, self.short_id)
         )
         self.team = team
 
@@ -858,12 +1303,14 @@ class Player:
         if not (percents in range(-100, 101)):
             raise ValueError("Can't balance player: percents param is not in range [-100, 100]")
 
-        await self.__socket_client.emit(
+        await self.game.emit(
             29,
             {
                 "sid": self.short_id,
                 "bal": percents
-            }
+            },
+            Priority.CONFIG,
+            (29, self.short_id)
         )
         self.balanced_by = percents
 
@@ -875,12 +1322,16 @@ class Message:
     :param content: message content.
     :param author: Player class that indicates the author of message.
     :param game: Game class that indicates the game where message was sent.
+    :param timestamp: unix timestamp when message was received. Default is None (now).
     """
 
-    def __init__(self, content: str, author: Player, game: Game) -> None:
+    __slots__ = ("content", "author", "game", "timestamp")
+
+    def __init__(self, content: str, author: Player, game: Game, timestamp: Union[float, None] = None) -> None:
         self.content: str = content
         self.author: Player = author
         self.game: Game = game
+        self.timestamp: float = time.time() if timestamp is None else timestamp
 
 
 class GameConnectionError(Exception):
@@ -0,0 +1,187 @@
+from typing import Dict, List
+
+# Port of lz-string's compressToEncodedURIComponent/decompressFromEncodedURIComponent that bonk.io uses for map data
+KEY_STR_URI_SAFE = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+-$"
+_BASE_VALUES: Dict[str, int] = {char: index for index, char in enumerate(KEY_STR_URI_SAFE)}
+
+
+def compress_to_encoded_uri_component(uncompressed: str) -> str:
+    """
+    Compresses string with lz-string into url-safe string.
+
+    :param uncompressed: string to compress.
+    """
+
+    dictionary: Dict[str, int] = {}
+    dictionary_to_create: Dict[str, bool] = {}
+    w = ""
+    enlarge_in = 2
+    dict_size = 3
+    num_bits = 2
+    data: List[str] = []
+    data_val = 0
+    data_position = 0
+
+    def write_bits(value: int, count: int) -> None:
+        nonlocal data_val, data_position
+
+        for _ in range(count):
+            data_val = (data_val << 1) | (value & 1)
+            value >>= 1
+
+            if data_position == 5:
+                data_position = 0
+                data.append(KEY_STR_URI_SAFE[data_val])
+                data_val = 0
+            else:
+                data_position += 1
+
+    def write_w() -> None:
+        nonlocal enlarge_in, num_bits
+
+        if w in dictionary_to_create:
+            char_code = ord(w[0])
+
+            if char_code < 256:
+                write_bits(0, num_bits)
+                write_bits(char_code, 8)
+            else:
+                write_bits(1, num_bits)
+                write_bits(char_code, 16)
+
+            enlarge_in -= 1
+
+            if enlarge_in == 0:
+                enlarge_in = 2 ** num_bits
+                num_bits += 1
+
+            del dictionary_to_create[w]
+        else:
+            write_bits(dictionary[w], num_bits)
+
+        enlarge_in -= 1
+
+        if enlarge_in == 0:
+            enlarge_in = 2 ** num_bits
+            num_bits += 1
+
+    for c in uncompressed:
+        if c not in dictionary:
+            dictionary[c] = dict_size
+            dict_size += 1
+            dictionary_to_create[c] = True
+
+        wc = w + c
+
+        if wc in dictionary:
+            w = wc
+        else:
+            write_w()
+            dictionary[wc] = dict_size
+            dict_size += 1
+            w = c
+
+    if w:
+        write_w()
+
+    write_bits(2, num_bits)
+
+    while True:
+        data_val <<= 1
+
+        if data_position == 5:
+            data.append(KEY_STR_URI_SAFE[data_val])
+            break
+
+        data_position += 1
+
+    return "".join(data)
+
+
+def decompress_from_encoded_uri_component(compressed: str) -> str:
+    """
+    Decompresses url-safe string that was compressed with lz-string.
+
+    :param compressed: string to decompress.
+    """
+
+    if not compressed:
+        return ""
+
+    compressed = compressed.replace(" ", "+")
+    length = len(compressed)
+    values = [_BASE_VALUES[char] for char in compressed]
+    values.append(0)
+
+    val = values[0]
+    position = 32
+    index = 1
+
+    def read_bits(count: int) -> int:
+        nonlocal val, position, index
+
+        bits = 0
+
+        for power in range(count):
+            resb = val & position
+            position >>= 1
+
+            if position == 0:
+                position = 32
+                val = values[index] if index < len(values) else 0
+                index += 1
+
+            if resb:
+                bits |= 1 << power
+
+        return bits
+
+    dictionary: List[str] = ["", "", ""]
+    enlarge_in = 4
+    num_bits = 3
+
+    first = read_bits(2)
+
+    if first == 0:
+        c = chr(read_bits(8))
+    elif first == 1:
+        c = chr(read_bits(16))
+    else:
+        return ""
+
+    dictionary.append(c)
+    w = c
+    result = [c]
+
+    while True:
+        if index > length:
+            return ""
+
+        code = read_bits(num_bits)
+
+        if code == 0 or code == 1:
+            dictionary.append(chr(read_bits(8 if code == 0 else 16)))
+            code = len(dictionary) - 1
+            enlarge_in -= 1
+        elif code == 2:
+            return "".join(result)
+
+        if enlarge_in == 0:
+            enlarge_in = 2 ** num_bits
+            num_bits += 1
+
+        if code < len(dictionary) and dictionary[code]:
+            entry = dictionary[code]
+        elif code == len(dictionary):
+            entry = w + w[0]
+        else:
+            raise ValueError("Invalid lz-string data")
+
+        result.append(entry)
+        dictionary.append(w + entry[0])
+        enlarge_in -= 1
+        w = entry
+
+        if enlarge_in == 0:
+            enlarge_in = 2 ** num_bits
+            num_bits += 1
@@ -0,0 +1,248 @@
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Union
+
+
+class MapCache:
+    """
+    Two-tier cache of maps' leveldata by map database ID: in-memory LRU that is bounded by the size of leveldata and
+    optional sqlite store on disk that persists between bot runs.
+
+    Maps that are put in the cache share one leveldata string, so the same map loaded several times is stored once.
+    Disk writes are batched and done in the default executor when there is a running event loop, so putting maps
+    doesn't block the loop.
+
+    :param max_bytes: maximal size of leveldata that is kept in memory. Default is 32 MiB.
+    :param path: path to sqlite database file. Default is None (cache is kept only in memory).
+
+    Example usage::
+
+        bot = bonk_guest_login("name")
+        bot.map_cache = MapCache(path="maps.sqlite")
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, path: Union[str, None] = None) -> None:
+        self.max_bytes: int = max_bytes
+        self.memory_bytes: int = 0
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.__memory: OrderedDict = OrderedDict()
+        self.__db: Union[sqlite3.Connection, None] = None
+        self.__db_lock: threading.Lock = threading.Lock()
+        # Maps that are put in the cache but aren't written to disk yet
+        self.__unsaved: Dict[int, str] = {}
+        self.__write_future: Union[asyncio.Future, None] = None
+        self.__is_write_scheduled: bool = False
+
+        if path is not None:
+            self.__db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            self.__db.execute("PRAGMA journal_mode=WAL")
+            self.__db.execute("CREATE TABLE IF NOT EXISTS maps (map_id INTEGER PRIMARY KEY, map_data TEXT NOT NULL)")
+
+    def get(self, map_id: int) -> Union[str, None]:
+        """
+        Returns leveldata of the map or None if map is not cached. Reads from disk synchronously, use load() in
+        coroutines.
+
+        :param map_id: map database ID.
+        """
+
+        map_data = self.__get_from_memory(map_id)
+
+        if map_data is not None:
+            return map_data
+
+        return self.__loaded(map_id, self.__read(map_id))
+
+    async def load(self, map_id: int) -> Union[str, None]:
+        """
+        Returns leveldata of the map or None if map is not cached. Disk is read in the default executor.
+
+        :param map_id: map database ID.
+        """
+
+        map_data = self.__get_from_memory(map_id)
+
+        if map_data is not None:
+            return map_data
+
+        if self.__db is None:
+            return self.__loaded(map_id, None)
+
+        map_data = await asyncio.get_event_loop().run_in_executor(None, self.__read, map_id)
+
+        return self.__loaded(map_id, map_data)
+
+    def put(self, map_id: int, map_data: str) -> str:
+        """
+        Caches leveldata of the map. Returns cached leveldata string that should be used instead of map_data.
+
+        :param map_id: map database ID.
+        :param map_data: encoded info about map.
+        """
+
+        cached = self.__memory.get(map_id)
+
+        if cached == map_data:
+            self.__memory.move_to_end(map_id)
+            return cached
+
+        self.__remember(map_id, map_data)
+
+        if self.__db is not None:
+            self.__unsaved[map_id] = map_data
+            self.__schedule_flush()
+
+        return map_data
+
+    def flush(self) -> None:
+        """Writes maps that aren't saved yet to disk in one transaction."""
+
+        if self.__db is None or not self.__unsaved:
+            return
+
+        batch = dict(self.__unsaved)
+        self.__write(batch)
+        self.__forget_saved(batch)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns cache hit/miss statistics. Every lookup (get(), load() and "in") is counted as a hit or a miss, hits
+        include disk_hits of maps that were read from the sqlite store.
+        """
+
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "memory_maps": len(self.__memory),
+            "memory_bytes": self.memory_bytes
+        }
+
+    def close(self) -> None:
+        """Writes unsaved maps and closes on-disk store."""
+
+        if self.__db is not None:
+            self.flush()
+
+            with self.__db_lock:
+                self.__db.close()
+
+            self.__db = None
+
+    def __contains__(self, map_id: int) -> bool:
+        if map_id in self.__memory:
+            self.hits += 1
+            return True
+
+        if map_id in self.__unsaved:
+            is_stored = True
+        elif self.__db is None:
+            is_stored = False
+        else:
+            with self.__db_lock:
+                is_stored = self.__db.execute("SELECT 1 FROM maps WHERE map_id = ?", (map_id,)).fetchone() is not None
+
+        self.__count_store_lookup(is_stored)
+
+        return is_stored
+
+    def __get_from_memory(self, map_id: int) -> Union[str, None]:
+        map_data = self.__memory.get(map_id)
+
+        if map_data is not None:
+            self.__memory.move_to_end(map_id)
+            self.hits += 1
+
+        return map_data
+
+    def __read(self, map_id: int) -> Union[str, None]:
+        map_data = self.__unsaved.get(map_id)
+
+        if map_data is not None or self.__db is None:
+            return map_data
+
+        with self.__db_lock:
+            row = self.__db.execute("SELECT map_data FROM maps WHERE map_id = ?", (map_id,)).fetchone()
+
+        return None if row is None else row[0]
+
+    def __loaded(self, map_id: int, map_data: Union[str, None]) -> Union[str, None]:
+        self.__count_store_lookup(map_data is not None)
+
+        if map_data is not None:
+            self.__remember(map_id, map_data)
+
+        return map_data
+
+    def __count_store_lookup(self, is_found: bool) -> None:
+        if is_found:
+            self.hits += 1
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+
+    def __write(self, batch: Dict[int, str]) -> None:
+        with self.__db_lock:
+            self.__db.execute("BEGIN")
+            self.__db.executemany("INSERT OR REPLACE INTO maps (map_id, map_data) VALUES (?, ?)", batch.items())
+            self.__db.execute("COMMIT")
+
+    def __forget_saved(self, batch: Dict[int, str]) -> None:
+        for map_id, map_data in batch.items():
+            # Map could be put again while the batch was being written
+            if self.__unsaved.get(map_id) is map_data:
+                del self.__unsaved[map_id]
+
+    def __schedule_flush(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+
+        # Maps that are put in the same loop iteration or while another batch is written are written in one batch
+        if not self.__is_write_scheduled and (self.__write_future is None or self.__write_future.done()):
+            self.__is_write_scheduled = True
+            loop.call_soon(self.__start_write)
+
+    def __start_write(self) -> None:
+        self.__is_write_scheduled = False
+
+        if self.__db is None or not self.__unsaved:
+            return
+
+        batch = dict(self.__unsaved)
+        self.__write_future = asyncio.get_event_loop().run_in_executor(None, self.__write, batch)
+        self.__write_future.add_done_callback(lambda future: self.__written(future, batch))
+
+    def __written(self, future: asyncio.Future, batch: Dict[int, str]) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        self.__forget_saved(batch)
+
+        if self.__unsaved:
+            self.__schedule_flush()
+
+    def __remember(self, map_id: int, map_data: str) -> None:
+        old_map_data = self.__memory.pop(map_id, None)
+
+        if old_map_data is not None:
+            self.memory_bytes -= len(old_map_data)
+
+        if len(map_data) > self.max_bytes:
+            return
+
+        self.__memory[map_id] = map_data
+        self.memory_bytes += len(map_data)
+
+        while self.memory_bytes > self.max_bytes:
+            _, evicted = self.__memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+            self.evictions += 1
@@ -0,0 +1,882 @@
+import base64
+import hashlib
+import math
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Union
+
+from .LZString import compress_to_encoded_uri_component, decompress_from_encoded_uri_component
+
+_NULL_DOUBLE = sys.float_info.max
+_UTF_LENGTH = struct.Struct(">H")
+_JOINT_TYPES: Dict[str, int] = {"rv": 1, "d": 2, "lpj": 3, "lsj": 4, "g": 5}
+_STRUCTS: Dict[str, struct.Struct] = {
+    "bool": struct.Struct(">?"),
+    "short": struct.Struct(">h"),
+    "uint": struct.Struct(">I"),
+    "int": struct.Struct(">i"),
+    "float": struct.Struct(">f"),
+    "double": struct.Struct(">d"),
+    "ndouble": struct.Struct(">d"),
+    "tri": struct.Struct(">h")
+}
+# Array typecodes of table columns. "ndouble" is a double that can be null (NaN), "tri" is null/false/true (-1/0/1)
+_TYPECODES: Dict[str, str] = {
+    "bool": "B",
+    "ubyte": "B",
+    "short": "h",
+    "ushort": "H",
+    "uint": "I",
+    "int": "i",
+    "float": "d",
+    "double": "d",
+    "ndouble": "d",
+    "tri": "b"
+}
+
+# (field, kind, min map version, max map version)
+SETTINGS_FIELDS = [
+    ("re", "bool", 0, 99),
+    ("nc", "bool", 0, 99),
+    ("pq", "short", 3, 99),
+    ("gd", "short", 4, 12),
+    ("gd", "float", 13, 99),
+    ("fl", "bool", 9, 99)
+]
+META_FIELDS = [
+    ("rxn", "utf", 0, 99),
+    ("rxa", "utf", 0, 99),
+    ("rxid", "uint", 0, 99),
+    ("rxdb", "short", 0, 99),
+    ("n", "utf", 0, 99),
+    ("a", "utf", 0, 99),
+    ("vu", "uint", 10, 99),
+    ("vd", "uint", 10, 99),
+    ("cr", "utf_list", 4, 99),
+    ("mo", "utf", 5, 99),
+    ("dbid", "int", 5, 99),
+    ("pub", "bool", 7, 99),
+    ("dbv", "int", 8, 99)
+]
+FIXTURE_FIELDS = [
+    ("sh", "short", 0, 99),
+    ("n", "utf", 0, 99),
+    ("fr", "ndouble", 0, 99),
+    ("fp", "tri", 0, 99),
+    ("re", "ndouble", 0, 99),
+    ("de", "ndouble", 0, 99),
+    ("f", "uint", 0, 99),
+    ("d", "bool", 0, 99),
+    ("np", "bool", 0, 99),
+    ("ng", "bool", 11, 99),
+    ("ig", "bool", 12, 99)
+]
+BODY_FIELDS = [
+    ("type", "utf", 0, 99),
+    ("n", "utf", 0, 99),
+    ("px", "double", 0, 99),
+    ("py", "double", 0, 99),
+    ("a", "double", 0, 99),
+    ("fric", "double", 0, 99),
+    ("fricp", "bool", 0, 99),
+    ("re", "double", 0, 99),
+    ("de", "double", 0, 99),
+    ("lvx", "double", 0, 99),
+    ("lvy", "double", 0, 99),
+    ("av", "double", 0, 99),
+    ("ld", "double", 0, 99),
+    ("ad", "double", 0, 99),
+    ("fr", "bool", 0, 99),
+    ("bu", "bool", 0, 99),
+    ("cf_x", "double", 0, 99),
+    ("cf_y", "double", 0, 99),
+    ("cf_ct", "double", 0, 99),
+    ("cf_w", "bool", 0, 99),
+    ("f_c", "short", 0, 99),
+    ("f_1", "bool", 0, 99),
+    ("f_2", "bool", 0, 99),
+    ("f_3", "bool", 0, 99),
+    ("f_4", "bool", 0, 99),
+    ("f_p", "bool", 2, 99),
+    ("fz_on", "bool", 14, 99)
+]
+# Force zone fields are written only when fz_on is set
+BODY_FORCE_ZONE_FIELDS = [
+    ("fz_x", "double", 14, 99),
+    ("fz_y", "double", 14, 99),
+    ("fz_d", "bool", 14, 99),
+    ("fz_p", "bool", 14, 99),
+    ("fz_a", "bool", 14, 99),
+    ("fz_t", "short", 15, 99),
+    ("fz_cf", "double", 15, 99)
+]
+SPAWN_FIELDS = [
+    ("x", "double", 0, 99),
+    ("y", "double", 0, 99),
+    ("xv", "double", 0, 99),
+    ("yv", "double", 0, 99),
+    ("priority", "short", 0, 99),
+    ("r", "bool", 0, 99),
+    ("f", "bool", 0, 99),
+    ("b", "bool", 0, 99),
+    ("gr", "bool", 0, 99),
+    ("ye", "bool", 0, 99),
+    ("n", "utf", 0, 99)
+]
+CAP_ZONE_FIELDS = [
+    ("n", "utf", 0, 99),
+    ("l", "double", 0, 99),
+    ("i", "short", 0, 99),
+    ("ty", "short", 6, 99)
+]
+# Shape type 1 is box, 2 is circle, 3 is polygon. Polygon vertices are kept in MapData.shape_vertices
+SHAPE_FIELDS = [
+    ("type", "ubyte"),
+    ("x", "double"),
+    ("y", "double"),
+    ("a", "double"),
+    ("w", "double"),
+    ("h", "double"),
+    ("r", "double"),
+    ("s", "double"),
+    ("sk", "bool"),
+    ("vertex_start", "uint"),
+    ("vertex_count", "ushort")
+]
+DEFAULTS: Dict[str, Union[int, float, str]] = {"pq": 1, "gd": 25, "f_p": 1, "ty": 1, "n": "", "type": "s"}
+MAX_MAP_VERSION = 15
+
+
+class MapTable:
+    """
+    Columnar table of map objects. Numeric fields are kept in typed arrays, text fields in lists.
+
+    Columns can be accessed as attributes (e.g. map_data.spawns.x) and rows as dicts with table.row(index).
+
+    :param fields: list of (name, kind) pairs of table columns.
+    """
+
+    def __init__(self, fields: List[tuple]) -> None:
+        self.kinds: Dict[str, str] = {field[0]: field[1] for field in fields}
+        self.columns: Dict[str, Union[array, list]] = {
+            name: [] if kind == "utf" else array(_TYPECODES[kind]) for name, kind in self.kinds.items()
+        }
+        self.size: int = 0
+
+    def append(self, row: dict) -> None:
+        """
+        Adds row to the table. Missing fields get their default values.
+
+        :param row: dict of field values.
+        """
+
+        for name, column in self.columns.items():
+            column.append(_to_column(self.kinds[name], row.get(name, DEFAULTS.get(name, 0))))
+
+        self.size += 1
+
+    def row(self, index: int) -> dict:
+        """
+        Returns row as dict of field values.
+
+        :param index: index of the row.
+        """
+
+        return {name: _from_column(self.kinds[name], column[index]) for name, column in self.columns.items()}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self.row(index) for index in range(self.size))
+
+    def __getattr__(self, name: str) -> Union[array, list]:
+        columns = self.__dict__.get("columns")
+
+        if columns is None or name not in columns:
+            raise AttributeError(name)
+
+        return columns[name]
+
+
+class MapData:
+    """
+    Structured bonk2 map.
+
+    Decoded maps are shared between games through cache, so they shouldn't be modified.
+    Metadata (m) and settings (s) are decoded right away. Physics (shapes, fixtures, bodies, joints), spawns and
+    cap zones are decoded on the first access.
+
+    Encoded map data and game state map dict are cached on the map. Call invalidate() after changing map you built.
+
+    :param version: map format version.
+    :param settings: map settings (re, nc, pq, gd, fl).
+    :param meta: map metadata (n - name, a - author, dbid - map database ID etc.).
+    :param encoded: map data string that map was decoded from. It is returned by encode() without encoding.
+    """
+
+    def __init__(
+        self,
+        version: int = MAX_MAP_VERSION,
+        settings: Union[dict, None] = None,
+        meta: Union[dict, None] = None,
+        encoded: Union[str, None] = None
+    ) -> None:
+        self.version: int = version
+        self.settings: dict = {"re": False, "nc": False, "pq": 1, "gd": 25, "fl": False}
+        self.meta: dict = {
+            "a": "",
+            "n": "",
+            "dbv": 2,
+            "dbid": -1,
+            "authid": -1,
+            "date": "",
+            "rxid": 0,
+            "rxn": "",
+            "rxa": "",
+            "rxdb": 1,
+            "cr": [],
+            "pub": False,
+            "mo": "",
+            "vu": 0,
+            "vd": 0
+        }
+        self.settings.update(settings or {})
+        self.meta.update(meta or {})
+        self.__raw: Union[bytes, None] = None
+        self.__physics_offset: int = 0
+        self.__ppm: int = 12
+        self.__bro: Union[array, None] = None
+        self.__shapes: Union[MapTable, None] = None
+        self.__shape_vertices: Union[array, None] = None
+        self.__fixtures: Union[MapTable, None] = None
+        self.__bodies: Union[MapTable, None] = None
+        self.__body_fixtures: Union[array, None] = None
+        self.__joints: Union[List[dict], None] = None
+        self.__spawns: Union[MapTable, None] = None
+        self.__cap_zones: Union[MapTable, None] = None
+        self.__encoded: Union[str, None] = encoded
+        self.__game_state_map: Union[dict, None] = None
+
+    def encode(self) -> str:
+        """Returns map data string (bonk.io database format) that is used in set_map. Result is cached."""
+
+        if self.__encoded is None:
+            self.__encoded = compress_to_encoded_uri_component(base64.b64encode(self.__encode_binary()).decode())
+
+        return self.__encoded
+
+    def to_game_state(self) -> dict:
+        """Returns map as dict that is used in the game state (gs.map) sent to joining players. Result is cached."""
+
+        if self.__game_state_map is None:
+            self.__game_state_map = self.__build_game_state()
+
+        return self.__game_state_map
+
+    def invalidate(self) -> None:
+        """Drops cached encode() and to_game_state() results. Call it after changing the map."""
+
+        self.__encoded = None
+        self.__game_state_map = None
+
+    @property
+    def name(self) -> str:
+        """Name of the map."""
+
+        return self.meta["n"]
+
+    @property
+    def author(self) -> str:
+        """Username of map creator."""
+
+        return self.meta["a"]
+
+    @property
+    def db_id(self) -> int:
+        """Map database ID."""
+
+        return self.meta["dbid"]
+
+    @property
+    def is_physics_decoded(self) -> bool:
+        """Indicates whether physics is already decoded or not."""
+
+        return self.__raw is None
+
+    @property
+    def ppm(self) -> int:
+        """Pixels per meter."""
+
+        self.__decode_physics()
+        return self.__ppm
+
+    @ppm.setter
+    def ppm(self, value: int) -> None:
+        self.__decode_physics()
+        self.__ppm = value
+
+    @property
+    def bro(self) -> array:
+        """Body render order (indexes of bodies)."""
+
+        self.__decode_physics()
+        return self.__bro
+
+    @property
+    def shapes(self) -> MapTable:
+        """Shapes of the map."""
+
+        self.__decode_physics()
+        return self.__shapes
+
+    @property
+    def shape_vertices(self) -> array:
+        """Flat x, y pairs of polygon vertices. Shape's vertices start at its vertex_start pair."""
+
+        self.__decode_physics()
+        return self.__shape_vertices
+
+    @property
+    def fixtures(self) -> MapTable:
+        """Fixtures of the map."""
+
+        self.__decode_physics()
+        return self.__fixtures
+
+    @property
+    def bodies(self) -> MapTable:
+        """Bodies of the map."""
+
+        self.__decode_physics()
+        return self.__bodies
+
+    @property
+    def body_fixtures(self) -> array:
+        """Flat fixture indexes of bodies. Body's fixtures start at its fixture_start index."""
+
+        self.__decode_physics()
+        return self.__body_fixtures
+
+    @property
+    def joints(self) -> List[dict]:
+        """Joints of the map. Joints have different fields depending on their type, so they are kept as dicts."""
+
+        self.__decode_physics()
+        return self.__joints
+
+    @property
+    def spawns(self) -> MapTable:
+        """Spawns of the map."""
+
+        self.__decode_physics()
+        return self.__spawns
+
+    @property
+    def cap_zones(self) -> MapTable:
+        """Capture zones of the map."""
+
+        self.__decode_physics()
+        return self.__cap_zones
+
+    def set_raw_physics(self, raw: Union[bytes, None], offset: int = 0) -> None:
+        """
+        Sets encoded physics that is decoded on the first access. None creates empty physics. You don't need to use it.
+
+        :param raw: decoded from base64 map bytes.
+        :param offset: offset where physics starts.
+        """
+
+        self.__raw = raw
+        self.__physics_offset = offset
+        self.__shapes = None
+
+        if raw is None:
+            self.__bro = array("h")
+            self.__shapes = MapTable(SHAPE_FIELDS)
+            self.__shape_vertices = array("d")
+            self.__fixtures = MapTable(FIXTURE_FIELDS)
+            self.__bodies = MapTable(BODY_FIELDS + BODY_FORCE_ZONE_FIELDS + [
+                ("fixture_start", "uint"),
+                ("fixture_count", "ushort")
+            ])
+            self.__body_fixtures = array("h")
+            self.__joints = []
+            self.__spawns = MapTable(SPAWN_FIELDS)
+            self.__cap_zones = MapTable(CAP_ZONE_FIELDS)
+
+    def __decode_physics(self) -> None:
+        if self.__raw is None:
+            if self.__shapes is None:
+                self.set_raw_physics(None)
+            return
+
+        raw, offset = self.__raw, self.__physics_offset
+        reader = _Reader(raw, offset)
+        version = self.version
+        self.set_raw_physics(None)
+
+        try:
+            self.__ppm = reader.read("short")
+
+            for _ in range(reader.read("short")):
+                self.__bro.append(reader.read("short"))
+
+            for _ in range(reader.read("short")):
+                self.__read_shape(reader)
+
+            _read_rows(reader, self.__fixtures, FIXTURE_FIELDS, version)
+
+            for _ in range(reader.read("short")):
+                self.__read_body(reader, version)
+
+            _read_rows(reader, self.__spawns, SPAWN_FIELDS, version)
+            _read_rows(reader, self.__cap_zones, CAP_ZONE_FIELDS, version)
+
+            for _ in range(reader.read("short")):
+                self.__joints.append(_read_joint(reader))
+        except (struct.error, UnicodeDecodeError, ValueError) as e:
+            # Partially decoded tables are dropped, so every next access raises the error again
+            self.set_raw_physics(raw, offset)
+            raise MapDecodeError(f"Invalid map physics data: {e}")
+
+    def __read_shape(self, reader: "_Reader") -> None:
+        shape_type = reader.read("short")
+        shape = {"type": shape_type}
+
+        if shape_type == 1:
+            shape["w"] = reader.read("double")
+            shape["h"] = reader.read("double")
+            shape["x"] = reader.read("double")
+            shape["y"] = reader.read("double")
+            shape["a"] = reader.read("double")
+            shape["sk"] = reader.read("bool")
+        elif shape_type == 2:
+            shape["r"] = reader.read("double")
+            shape["x"] = reader.read("double")
+            shape["y"] = reader.read("double")
+            shape["sk"] = reader.read("bool")
+        elif shape_type == 3:
+            shape["s"] = reader.read("double")
+            shape["a"] = reader.read("double")
+            shape["x"] = reader.read("double")
+            shape["y"] = reader.read("double")
+            shape["vertex_start"] = len(self.__shape_vertices) // 2
+            shape["vertex_count"] = reader.read("short")
+
+            for _ in range(shape["vertex_count"] * 2):
+                self.__shape_vertices.append(reader.read("double"))
+        else:
+            raise ValueError(f"unknown shape type {shape_type}")
+
+        self.__shapes.append(shape)
+
+    def __read_body(self, reader: "_Reader", version: int) -> None:
+        body = _read_fields(reader, BODY_FIELDS, version)
+
+        if body.get("fz_on"):
+            body.update(_read_fields(reader, BODY_FORCE_ZONE_FIELDS, version))
+
+        body["fixture_start"] = len(self.__body_fixtures)
+        body["fixture_count"] = reader.read("short")
+
+        for _ in range(body["fixture_count"]):
+            self.__body_fixtures.append(reader.read("short"))
+
+        self.__bodies.append(body)
+
+    def __encode_binary(self) -> bytes:
+        version = self.version
+        writer = _Writer()
+        writer.write("short", version)
+        _write_fields(writer, SETTINGS_FIELDS, self.settings, version)
+        _write_fields(writer, META_FIELDS, self.meta, version)
+
+        writer.write("short", self.ppm)
+        writer.write("short", len(self.bro))
+
+        for body_index in self.bro:
+            writer.write("short", body_index)
+
+        shapes = self.shapes.columns
+        writer.write("short", len(self.shapes))
+
+        for index in range(len(self.shapes)):
+            shape_type = shapes["type"][index]
+            writer.write("short", shape_type)
+
+            if shape_type == 1:
+                for name in ("w", "h", "x", "y", "a"):
+                    writer.write("double", shapes[name][index])
+                writer.write("bool", shapes["sk"][index])
+            elif shape_type == 2:
+                for name in ("r", "x", "y"):
+                    writer.write("double", shapes[name][index])
+                writer.write("bool", shapes["sk"][index])
+            else:
+                for name in ("s", "a", "x", "y"):
+                    writer.write("double", shapes[name][index])
+
+                start = shapes["vertex_start"][index] * 2
+                writer.write("short", shapes["vertex_count"][index])
+
+                for value in self.shape_vertices[start:start + shapes["vertex_count"][index] * 2]:
+                    writer.write("double", value)
+
+        _write_rows(writer, self.fixtures, FIXTURE_FIELDS, version)
+
+        writer.write("short", len(self.bodies))
+
+        for index in range(len(self.bodies)):
+            body = self.bodies.row(index)
+            _write_fields(writer, BODY_FIELDS, body, version)
+
+            if body["fz_on"] and version >= 14:
+                _write_fields(writer, BODY_FORCE_ZONE_FIELDS, body, version)
+
+            start = body["fixture_start"]
+            writer.write("short", body["fixture_count"])
+
+            for fixture_index in self.body_fixtures[start:start + body["fixture_count"]]:
+                writer.write("short", fixture_index)
+
+        _write_rows(writer, self.spawns, SPAWN_FIELDS, version)
+        _write_rows(writer, self.cap_zones, CAP_ZONE_FIELDS, version)
+
+        writer.write("short", len(self.joints))
+
+        for joint in self.joints:
+            _write_joint(writer, joint)
+
+        return bytes(writer.buffer)
+
+    def __build_game_state(self) -> dict:
+        shapes = []
+
+        for shape in self.shapes:
+            if shape["type"] == 1:
+                shapes.append({
+                    "type": "bx",
+                    "w": shape["w"],
+                    "h": shape["h"],
+                    "c": [shape["x"], shape["y"]],
+                    "a": shape["a"],
+                    "sk": shape["sk"]
+                })
+            elif shape["type"] == 2:
+                shapes.append({"type": "ci", "r": shape["r"], "c": [shape["x"], shape["y"]], "sk": shape["sk"]})
+            else:
+                start = shape["vertex_start"] * 2
+                vertices = self.shape_vertices[start:start + shape["vertex_count"] * 2]
+                shapes.append({
+                    "type": "po",
+                    "s": shape["s"],
+                    "a": shape["a"],
+                    "c": [shape["x"], shape["y"]],
+                    "v": [[vertices[i], vertices[i + 1]] for i in range(0, len(vertices), 2)]
+                })
+
+        bodies = []
+
+        for body in self.bodies:
+            start = body["fixture_start"]
+            bodies.append({
+                "a": body["a"],
+                "av": body["av"],
+                "cf": {"x": body["cf_x"], "y": body["cf_y"], "w": body["cf_w"], "ct": body["cf_ct"]},
+                "fx": list(self.body_fixtures[start:start + body["fixture_count"]]),
+                "fz": {
+                    "on": body["fz_on"],
+                    "x": body["fz_x"],
+                    "y": body["fz_y"],
+                    "d": body["fz_d"],
+                    "p": body["fz_p"],
+                    "a": body["fz_a"],
+                    "t": body["fz_t"],
+                    "cf": body["fz_cf"]
+                },
+                "lv": [body["lvx"], body["lvy"]],
+                "p": [body["px"], body["py"]],
+                "s": {
+                    name: body[name] for name in (
+                        "type", "n", "fric", "fricp", "re", "de", "ld", "ad", "fr", "bu",
+                        "f_c", "f_p", "f_1", "f_2", "f_3", "f_4"
+                    )
+                }
+            })
+
+        return {
+            "v": self.version,
+            "s": dict(self.settings),
+            "physics": {
+                "shapes": shapes,
+                "fixtures": list(self.fixtures),
+                "bodies": bodies,
+                "bro": list(self.bro),
+                "joints": [dict(joint) for joint in self.joints],
+                "ppm": self.ppm
+            },
+            "spawns": list(self.spawns),
+            "capZones": list(self.cap_zones),
+            "m": dict(self.meta)
+        }
+
+
+class _Writer:
+    """Big-endian writer, the inverse of _Reader."""
+
+    __slots__ = ("buffer",)
+
+    def __init__(self) -> None:
+        self.buffer: bytearray = bytearray()
+
+    def write(self, kind: str, value) -> None:
+        if kind == "utf":
+            encoded = value.encode("utf-8")
+            self.buffer += _UTF_LENGTH.pack(len(encoded))
+            self.buffer += encoded
+        elif kind == "utf_list":
+            self.write("short", len(value))
+
+            for item in value:
+                self.write("utf", item)
+        elif kind == "ndouble":
+            self.buffer += _STRUCTS["double"].pack(_NULL_DOUBLE if value is None else value)
+        elif kind == "tri":
+            self.buffer += _STRUCTS["tri"].pack(0 if value is None else 1 + bool(value))
+        else:
+            self.buffer += _STRUCTS[kind].pack(value)
+
+
+class _Reader:
+    """Big-endian reader over memoryview with a cursor, so fields are read without copying the buffer."""
+
+    __slots__ = ("buffer", "offset")
+
+    def __init__(self, data: bytes, offset: int = 0) -> None:
+        self.buffer: memoryview = memoryview(data)
+        self.offset: int = offset
+
+    def read(self, kind: str):
+        if kind == "utf":
+            length = _UTF_LENGTH.unpack_from(self.buffer, self.offset)[0]
+            start = self.offset + _UTF_LENGTH.size
+            self.offset = start + length
+
+            if self.offset > len(self.buffer):
+                raise ValueError("string is out of data")
+
+            return str(self.buffer[start:self.offset], "utf-8")
+        if kind == "utf_list":
+            return [self.read("utf") for _ in range(self.read("short"))]
+
+        unpacker = _STRUCTS[kind]
+        value = unpacker.unpack_from(self.buffer, self.offset)[0]
+        self.offset += unpacker.size
+
+        if kind == "ndouble" and value == _NULL_DOUBLE:
+            return None
+        if kind == "tri":
+            return None if value == 0 else value == 2
+
+        return value
+
+
+def _to_column(kind: str, value):
+    if kind == "ndouble":
+        return math.nan if value is None else value
+    if kind == "tri":
+        return -1 if value is None else int(value)
+    if kind in ("bool", "ubyte"):
+        return int(value)
+
+    return value
+
+
+def _from_column(kind: str, value):
+    if kind == "ndouble":
+        return None if math.isnan(value) else value
+    if kind == "tri":
+        return None if value == -1 else bool(value)
+    if kind == "bool":
+        return bool(value)
+
+    return value
+
+
+def _read_fields(reader: _Reader, fields: list, version: int) -> dict:
+    return {
+        name: reader.read(kind)
+        for name, kind, min_version, max_version in fields
+        if min_version <= version <= max_version
+    }
+
+
+def _write_fields(writer: _Writer, fields: list, values: dict, version: int) -> None:
+    for name, kind, min_version, max_version in fields:
+        if min_version <= version <= max_version:
+            writer.write(kind, values.get(name, DEFAULTS.get(name, 0)))
+
+
+def _write_rows(writer: _Writer, table: MapTable, fields: list, version: int) -> None:
+    writer.write("short", len(table))
+
+    for row in table:
+        _write_fields(writer, fields, row, version)
+
+
+def _read_rows(reader: _Reader, table: MapTable, fields: list, version: int) -> None:
+    for _ in range(reader.read("short")):
+        table.append(_read_fields(reader, fields, version))
+
+
+def _read_joint(reader: _Reader) -> dict:
+    joint_type = reader.read("short")
+    joint = {"d": {}}
+
+    if joint_type == 1:
+        joint["type"] = "rv"
+        for name in ("la", "ua", "mmt", "ms"):
+            joint["d"][name] = reader.read("double")
+        joint["d"]["el"] = reader.read("bool")
+        joint["d"]["em"] = reader.read("bool")
+        joint["aa"] = [reader.read("double"), reader.read("double")]
+    elif joint_type == 2:
+        joint["type"] = "d"
+        joint["d"]["fh"] = reader.read("double")
+        joint["d"]["dr"] = reader.read("double")
+        joint["aa"] = [reader.read("double"), reader.read("double")]
+        joint["ab"] = [reader.read("double"), reader.read("double")]
+    elif joint_type == 3:
+        joint["type"] = "lpj"
+        for name in ("pax", "pay", "pa", "pf"):
+            joint[name] = reader.read("double")
+        joint["pl"] = reader.read("bool")
+        for name in ("pu", "plen", "pms"):
+            joint[name] = reader.read("double")
+    elif joint_type == 4:
+        joint["type"] = "lsj"
+        for name in ("sax", "say", "sf", "slen"):
+            joint[name] = reader.read("double")
+    elif joint_type == 5:
+        joint["type"] = "g"
+        joint["n"] = reader.read("utf")
+        joint["ja"] = reader.read("short")
+        joint["jb"] = reader.read("short")
+        joint["r"] = reader.read("double")
+        del joint["d"]
+    else:
+        raise ValueError(f"unknown joint type {joint_type}")
+
+    if joint_type != 5:
+        joint["ba"] = reader.read("short")
+        joint["bb"] = reader.read("short")
+        joint["d"]["cc"] = reader.read("bool")
+        joint["d"]["bf"] = reader.read("double")
+        joint["d"]["dl"] = reader.read("bool")
+
+    return joint
+
+
+def _write_joint(writer: _Writer, joint: dict) -> None:
+    joint_type = _JOINT_TYPES[joint["type"]]
+    writer.write("short", joint_type)
+
+    if joint_type == 1:
+        for name in ("la", "ua", "mmt", "ms"):
+            writer.write("double", joint["d"][name])
+        writer.write("bool", joint["d"]["el"])
+        writer.write("bool", joint["d"]["em"])
+        writer.write("double", joint["aa"][0])
+        writer.write("double", joint["aa"][1])
+    elif joint_type == 2:
+        writer.write("double", joint["d"]["fh"])
+        writer.write("double", joint["d"]["dr"])
+        for value in joint["aa"] + joint["ab"]:
+            writer.write("double", value)
+    elif joint_type == 3:
+        for name in ("pax", "pay", "pa", "pf"):
+            writer.write("double", joint[name])
+        writer.write("bool", joint["pl"])
+        for name in ("pu", "plen", "pms"):
+            writer.write("double", joint[name])
+    elif joint_type == 4:
+        for name in ("sax", "say", "sf", "slen"):
+            writer.write("double", joint[name])
+    else:
+        writer.write("utf", joint["n"])
+        writer.write("short", joint["ja"])
+        writer.write("short", joint["jb"])
+        writer.write("double", joint["r"])
+
+    if joint_type != 5:
+        writer.write("short", joint["ba"])
+        writer.write("short", joint["bb"])
+        writer.write("bool", joint["d"]["cc"])
+        writer.write("double", joint["d"]["bf"])
+        writer.write("bool", joint["d"]["dl"])
+
+
+_decoded_maps: OrderedDict = OrderedDict()
+DECODED_MAPS_CACHE_SIZE = 64
+
+
+def decode_map(map_data: str) -> MapData:
+    """
+    Decodes map data string (bonk.io database format) into MapData. Only metadata and settings are decoded here,
+    the rest is decoded on access. Decoded maps are cached by content hash, so decoding the same map again is free.
+
+    :param map_data: encoded info about map.
+    """
+
+    key = hashlib.sha1(map_data.encode()).digest()
+    decoded = _decoded_maps.get(key)
+
+    if decoded is not None:
+        _decoded_maps.move_to_end(key)
+        return decoded
+
+    try:
+        raw = base64.b64decode(decompress_from_encoded_uri_component(map_data))
+        reader = _Reader(raw)
+        version = reader.read("short")
+
+        if version > MAX_MAP_VERSION:
+            raise MapDecodeError(f"Unsupported map version {version}")
+
+        decoded = MapData(
+            version,
+            _read_fields(reader, SETTINGS_FIELDS, version),
+            _read_fields(reader, META_FIELDS, version),
+            map_data
+        )
+    except (struct.error, UnicodeDecodeError, ValueError, KeyError) as e:
+        raise MapDecodeError(f"Invalid map data: {e}")
+
+    decoded.set_raw_physics(raw, reader.offset)
+    _decoded_maps[key] = decoded
+
+    if len(_decoded_maps) > DECODED_MAPS_CACHE_SIZE:
+        _decoded_maps.popitem(last=False)
+
+    return decoded
+
+
+def encode_map(map_data: MapData) -> str:
+    """
+    Encodes MapData into map data string (bonk.io database format), the inverse of decode_map. Result is cached on
+    the map, so encoding the same map again is free.
+
+    :param map_data: structured map.
+    """
+
+    return map_data.encode()
+
+
+class MapDecodeError(Exception):
+    """Raised when map data can't be decoded."""
+
+    def __init__(self, message: str) -> None:
+        self.message = message
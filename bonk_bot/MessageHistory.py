@@ -0,0 +1,202 @@
+import datetime
+import json
+import os
+from collections import deque
+from itertools import islice
+from typing import Iterator, TextIO, Union
+
+
+class MessageHistory:
+    """
+    Bounded history of game messages. Keeps the last max_size messages in memory, older messages are dropped or,
+    if spill_path is set, appended to JSON lines segment files on disk (spill_path.0, spill_path.1 etc.).
+
+    Queries walk the history from the newest message and stop as soon as they have enough results, so the history
+    is never copied as a whole.
+
+    :param max_size: maximal amount of messages that are kept in memory.
+    :param spill_path: path prefix of segment files for messages that don't fit in memory. Default is None (older
+            messages are dropped).
+    :param segment_size: maximal amount of messages in one segment file.
+    :param max_segments: maximal amount of segment files, the oldest segment is deleted when a new one is started.
+            Default is None (segments are never deleted).
+
+    Example usage::
+
+        game.messages = MessageHistory(1000, spill_path="logs/my_room")
+        last_messages = game.messages.recent(10)
+    """
+
+    def __init__(
+        self,
+        max_size: int = 500,
+        spill_path: Union[str, None] = None,
+        segment_size: int = 10000,
+        max_segments: Union[int, None] = None
+    ) -> None:
+        self.max_size: int = max_size
+        self.spill_path: Union[str, None] = spill_path
+        self.segment_size: int = segment_size
+        self.max_segments: Union[int, None] = max_segments
+        self.spilled: int = 0
+        self.__messages: deque = deque()
+        self.__segment: Union[TextIO, None] = None
+        self.__segment_index: int = 0
+        self.__segment_lines: int = 0
+
+    def append(self, message) -> None:
+        """
+        Adds message to the history.
+
+        :param message: Message class instance.
+        """
+
+        if len(self.__messages) >= self.max_size:
+            oldest = self.__messages.popleft()
+
+            if self.spill_path is not None:
+                self.__spill(oldest)
+
+        self.__messages.append(message)
+
+    def recent(self, count: int) -> list:
+        """
+        Returns the last messages, from the oldest to the newest.
+
+        :param count: amount of messages.
+        """
+
+        messages = list(islice(reversed(self.__messages), count))
+        messages.reverse()
+
+        return messages
+
+    def by_author(self, author, limit: Union[int, None] = None) -> list:
+        """
+        Returns messages of the author that are kept in memory, from the oldest to the newest.
+
+        :param author: Player class instance or username.
+        :param limit: maximal amount of the latest messages to return. Default is None (all messages).
+        """
+
+        if isinstance(author, str):
+            matches = (message for message in reversed(self.__messages) if message.author.username == author)
+        else:
+            matches = (message for message in reversed(self.__messages) if message.author is author)
+
+        messages = list(islice(matches, limit))
+        messages.reverse()
+
+        return messages
+
+    def between(
+        self,
+        start: Union[float, datetime.datetime],
+        end: Union[float, datetime.datetime, None] = None
+    ) -> list:
+        """
+        Returns messages that are kept in memory and were sent in the time window, from the oldest to the newest.
+
+        :param start: unix timestamp or datetime of the window start.
+        :param end: unix timestamp or datetime of the window end. Default is None (until now).
+        """
+
+        if isinstance(start, datetime.datetime):
+            start = start.timestamp()
+        if isinstance(end, datetime.datetime):
+            end = end.timestamp()
+
+        messages = []
+
+        for message in reversed(self.__messages):
+            if message.timestamp < start:
+                break
+            if end is None or message.timestamp <= end:
+                messages.append(message)
+
+        messages.reverse()
+
+        return messages
+
+    def iter_spilled(self) -> Iterator[dict]:
+        """
+        Yields messages that were spilled to disk as dicts (t - timestamp, s - author short id, a - author username,
+        c - content), from the oldest to the newest.
+        """
+
+        if self.spill_path is None:
+            return
+
+        if self.__segment is not None:
+            self.__segment.flush()
+
+        first_segment = 0
+
+        if self.max_segments is not None:
+            first_segment = max(0, self.__segment_index - self.max_segments + 1)
+
+        for index in range(first_segment, self.__segment_index + 1):
+            path = f"{self.spill_path}.{index}"
+
+            if not os.path.exists(path):
+                continue
+
+            with open(path, encoding="utf-8") as file:
+                for line in file:
+                    yield json.loads(line)
+
+    def clear(self) -> None:
+        """Drops messages that are kept in memory and closes current segment file."""
+
+        self.__messages.clear()
+
+        if self.__segment is not None:
+            self.__segment.close()
+            self.__segment = None
+
+    def __spill(self, message) -> None:
+        if self.__segment_lines >= self.segment_size:
+            if self.__segment is not None:
+                self.__segment.close()
+                self.__segment = None
+
+            self.__segment_index += 1
+            self.__segment_lines = 0
+
+            if self.max_segments is not None:
+                old_path = f"{self.spill_path}.{self.__segment_index - self.max_segments}"
+
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+
+        if self.__segment is None:
+            self.__segment = open(f"{self.spill_path}.{self.__segment_index}", "a", encoding="utf-8")
+
+        self.__segment.write(json.dumps({
+            "t": message.timestamp,
+            "s": message.author.short_id,
+            "a": message.author.username,
+            "c": message.content
+        }) + "\n")
+        self.__segment_lines += 1
+        self.spilled += 1
+
+    def __len__(self) -> int:
+        return len(self.__messages)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.__messages)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self.__messages))
+
+            if step > 0:
+                return list(islice(self.__messages, start, max(start, stop), step))
+
+            return list(self.__messages)[index]
+
+        return self.__messages[index]
+
+    def __bool__(self) -> bool:
+        return len(self.__messages) > 0
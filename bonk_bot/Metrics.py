@@ -0,0 +1,345 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple, Union
+
+import aiohttp
+from aiohttp import web
+
+from .Settings import links
+
+# Default histogram buckets in seconds
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Counter:
+    """
+    Monotonically growing metric with optional labels.
+
+    :param name: metric name.
+    :param description: metric description.
+    :param labels: label names.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Tuple[str, ...] = ()) -> None:
+        self.name: str = name
+        self.description: str = description
+        self.labels: Tuple[str, ...] = labels
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        """
+        Increases counter.
+
+        :param label_values: values of counter labels.
+        :param amount: amount to add.
+        """
+
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self) -> List[Tuple[str, tuple, float]]:
+        """Returns (name suffix, (label, value) pairs, value) samples. You don't need to use it."""
+
+        return [("", tuple(zip(self.labels, label_values)), value) for label_values, value in self.values.items()]
+
+
+class Gauge:
+    """
+    Metric that can go up and down. Value can be read from function when metrics are collected.
+
+    :param name: metric name.
+    :param description: metric description.
+    :param function: function that returns current value. Default is None (value is set with set()).
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, function: Union[Callable[[], float], None] = None) -> None:
+        self.name: str = name
+        self.description: str = description
+        self.labels: Tuple[str, ...] = ()
+        self.function: Union[Callable[[], float], None] = function
+        self.value: float = 0
+
+    def set(self, value: float) -> None:
+        """
+        Sets gauge value.
+
+        :param value: new value.
+        """
+
+        self.value = value
+
+    def samples(self) -> List[Tuple[str, tuple, float]]:
+        """Returns (name suffix, (label, value) pairs, value) samples. You don't need to use it."""
+
+        return [("", (), self.function() if self.function is not None else self.value)]
+
+
+class Histogram:
+    """
+    Distribution of observed values (e.g. latencies in seconds) in cumulative buckets.
+
+    :param name: metric name.
+    :param description: metric description.
+    :param labels: label names.
+    :param buckets: upper bounds of buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name: str = name
+        self.description: str = description
+        self.labels: Tuple[str, ...] = labels
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        # label values -> [bucket counts..., +Inf count, sum]
+        self.values: Dict[tuple, List[float]] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        """
+        Adds observed value.
+
+        :param value: observed value.
+        :param label_values: values of histogram labels.
+        """
+
+        counts = self.values.get(label_values)
+
+        if counts is None:
+            counts = self.values[label_values] = [0] * (len(self.buckets) + 2)
+
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> List[Tuple[str, tuple, float]]:
+        """Returns (name suffix, (label, value) pairs, value) samples. You don't need to use it."""
+
+        samples = []
+
+        for label_values, counts in self.values.items():
+            labels = tuple(zip(self.labels, label_values))
+            total = 0
+
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                total += count
+                samples.append(("_bucket", labels + (("le", _format_value(bound)),), total))
+
+            samples.append(("_sum", labels, counts[-1]))
+            samples.append(("_count", labels, total))
+
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Registry of bot metrics. Metrics are created on the first use and can be rendered in Prometheus text format.
+    Replace bot.metrics with your own registry subclass to send metrics somewhere else.
+
+    Example usage::
+
+        bot.metrics = MetricsRegistry()
+        print(bot.metrics.render())
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Union[Counter, Gauge, Histogram]] = {}
+
+    def counter(self, name: str, description: str = "", labels: Tuple[str, ...] = ()) -> Counter:
+        """
+        Returns counter by its name, creates it if it doesn't exist.
+
+        :param name: metric name.
+        :param description: metric description.
+        :param labels: label names.
+        """
+
+        metric = self.metrics.get(name)
+
+        if metric is None:
+            metric = self.metrics[name] = Counter(name, description, labels)
+
+        return metric
+
+    def gauge(
+        self,
+        name: str,
+        description: str = "",
+        function: Union[Callable[[], float], None] = None
+    ) -> Gauge:
+        """
+        Returns gauge by its name, creates it if it doesn't exist.
+
+        :param name: metric name.
+        :param description: metric description.
+        :param function: function that returns current value.
+        """
+
+        metric = self.metrics.get(name)
+
+        if metric is None:
+            metric = self.metrics[name] = Gauge(name, description, function)
+
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        description: str = "",
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """
+        Returns histogram by its name, creates it if it doesn't exist.
+
+        :param name: metric name.
+        :param description: metric description.
+        :param labels: label names.
+        :param buckets: upper bounds of buckets.
+        """
+
+        metric = self.metrics.get(name)
+
+        if metric is None:
+            metric = self.metrics[name] = Histogram(name, description, labels, buckets)
+
+        return metric
+
+    def render(self) -> str:
+        """Returns all metrics in Prometheus text format."""
+
+        lines = []
+
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+            for suffix, labels, value in metric.samples():
+                if labels:
+                    label_text = ",".join(f'{name}="{_escape(str(label))}"' for name, label in labels)
+                    lines.append(f"{metric.name}{suffix}{{{label_text}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{metric.name}{suffix} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+class _NullMetric:
+    def inc(self, *label_values, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def observe(self, value: float, *label_values) -> None:
+        pass
+
+
+class NullRegistry:
+    """
+    Registry that drops all metrics. It is the default bot.metrics, instrumented code checks registry.enabled before
+    measuring anything, so disabled metrics cost one attribute lookup.
+    """
+
+    enabled = False
+
+    def __init__(self) -> None:
+        self.__metric: _NullMetric = _NullMetric()
+
+    def counter(self, name: str, description: str = "", labels: Tuple[str, ...] = ()) -> _NullMetric:
+        return self.__metric
+
+    def gauge(self, name: str, description: str = "", function: Union[Callable[[], float], None] = None) -> _NullMetric:
+        return self.__metric
+
+    def histogram(
+        self,
+        name: str,
+        description: str = "",
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> _NullMetric:
+        return self.__metric
+
+    def render(self) -> str:
+        return ""
+
+
+class HttpTracer:
+    """
+    aiohttp trace config that measures bonk.io api call latency per endpoint name from Settings.links. You don't need
+    to use it.
+
+    :param bot: bot class whose metrics registry is used. Can be set after the session is created.
+    """
+
+    def __init__(self, bot=None) -> None:
+        self.bot = bot
+        self.trace_config: aiohttp.TraceConfig = aiohttp.TraceConfig()
+        self.trace_config.on_request_start.append(self.__on_request_start)
+        self.trace_config.on_request_end.append(self.__on_request_end)
+        self.trace_config.on_request_exception.append(self.__on_request_exception)
+        self.__endpoints: Dict[str, str] = {url: name for name, url in links.items()}
+
+    async def __on_request_start(self, session, context, params) -> None:
+        context.start = time.perf_counter()
+
+    async def __on_request_end(self, session, context, params) -> None:
+        self.__observe(context, params, str(params.response.status))
+
+    async def __on_request_exception(self, session, context, params) -> None:
+        self.__observe(context, params, "error")
+
+    def __observe(self, context, params, status: str) -> None:
+        if self.bot is None or not self.bot.metrics.enabled:
+            return
+
+        endpoint = self.__endpoints.get(str(params.url.with_query(None)), "other")
+        self.bot.metrics.histogram(
+            "bonk_http_request_seconds",
+            "bonk.io api call latency",
+            ("endpoint", "status")
+        ).observe(time.perf_counter() - context.start, endpoint, status)
+
+
+async def start_metrics_server(registry, host: str = "127.0.0.1", port: int = 9464) -> web.AppRunner:
+    """
+    Starts HTTP server that serves registry metrics in Prometheus text format on /metrics.
+
+    :param registry: metrics registry.
+    :param host: address to listen on.
+    :param port: port to listen on.
+    """
+
+    async def handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+
+    return runner
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
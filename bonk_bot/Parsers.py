@@ -1,12 +1,19 @@
 import base64
 import datetime
 import json
-import struct
-from typing import Union
+import os
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Tuple, Union
 from urllib.parse import unquote_plus
 
-from .Types import Teams, Modes
-from .Avatar import Avatar
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .Types import Teams, Modes, MODES_BY_SHORT_NAME, TEAMS_BY_NUMBER
+from .Avatar import Avatar, AVATAR_LAYER, AVATAR_LAYER_SEPARATOR_SIZE, remember_framing
 
 
 # <3 Fotis
@@ -17,46 +24,74 @@ def parse_avatar(avatar: str) -> Avatar:
     :param avatar: base64 encoded avatar string that is decoded in this function.
     """
 
-    avatar = unquote_plus(avatar)
-    avatar = base64.b64decode(avatar + "==")
-
-    def peek(count, offset: int = 0):
-        nonlocal avatar
-        data = avatar[offset:count + offset]
-        avatar = avatar[offset + count:]
-        return data
+    data = memoryview(base64.b64decode(unquote_plus(avatar) + "=="))
+    offset = 7
 
-    _ = peek(7)
-
-    shapes_count = (int.from_bytes(peek(1), "big") - 1) // 2
+    shapes_count = (data[offset] - 1) // 2 if offset < len(data) else 0
     shapes = []
-    _ = peek(3)
+    offset += 4
+
     if shapes_count > 0:
-        _ = peek(6)
-        for i in range(shapes_count):
-            shape = dict()
+        offset += 6
+
+        for _ in range(shapes_count):
+            shape_id, scale, angle, x, y, flip_x, flip_y, color_high, color_low = AVATAR_LAYER.unpack_from(data, offset)
+            shapes.append({
+                "id": shape_id,
+                "scale": scale,
+                "angle": angle,
+                "x": x,
+                "y": y,
+                "flipX": flip_x == 1,
+                "flipY": flip_y == 1,
+                "color": color_high << 16 | color_low
+            })
+            offset += AVATAR_LAYER.size + AVATAR_LAYER_SEPARATOR_SIZE
+
+        offset -= AVATAR_LAYER_SEPARATOR_SIZE
+
+    remember_framing(data, shapes_count, offset)
+
+    return Avatar(
+        {
+            "layers": shapes,
+            "bc": int.from_bytes(data[offset:offset + 3], "big")
+        },
+        avatar
+    )
+
+
+def parse_avatars(avatars: List[str]) -> List[Avatar]:
+    """
+    Used to decode several avatars from base64 strings.
+
+    :param avatars: list of base64 encoded avatar strings.
+    """
 
-            shape["id"] = int.from_bytes(peek(1), "big")
-            shape["scale"] = struct.unpack(">f", peek(4))[0]
-            shape["angle"] = struct.unpack(">f", peek(4))[0]
-            shape["x"] = struct.unpack(">f", peek(4))[0]
-            shape["y"] = struct.unpack(">f", peek(4))[0]
-            shape["flipX"] = int.from_bytes(peek(1), "big") == 1
-            shape["flipY"] = int.from_bytes(peek(1), "big") == 1
-            shape["color"] = int.from_bytes(peek(3, 1), "big")
+    return [parse_avatar(avatar) for avatar in avatars]
 
-            shapes.append(shape)
 
-            if i != shapes_count - 1:
-                peek(5)
+# Account database ID -> date table that is loaded once on the first db_id_to_date call
+_DB_IDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dbids.json")
+_db_ids: Union[Tuple[array, array, List[str]], None] = None
 
-    base_color = int.from_bytes(peek(3), "big")
-    avatar = dict()
 
-    avatar["layers"] = shapes
-    avatar["bc"] = base_color
+def _load_db_ids() -> Tuple[array, array, List[str]]:
+    """Returns sorted database IDs, their epoch seconds and raw dates. You don't need to use it."""
 
-    return Avatar(avatar)
+    global _db_ids
+
+    if _db_ids is None:
+        with open(_DB_IDS_PATH) as file:
+            db_ids = sorted(json.load(file), key=lambda db_id: db_id["number"])
+
+        _db_ids = (
+            array("q", [db_id["number"] for db_id in db_ids]),
+            array("d", [datetime.datetime.strptime(db_id["date"], "%Y-%m-%d").timestamp() for db_id in db_ids]),
+            [db_id["date"] for db_id in db_ids]
+        )
+
+    return _db_ids
 
 
 # Credits to https://shaunx777.github.io/dbid2date/
@@ -67,69 +102,77 @@ def db_id_to_date(db_id: int) -> Union[datetime.datetime, str]:
     :param db_id: account database ID.
     """
 
-    with open("bonk_bot/dbids.json") as file:
-        db_ids = json.load(file)
-        index = 0
-
-    while index < len(db_ids) and db_ids[index]["number"] < db_id:
-        index += 1
+    numbers, timestamps, dates = _load_db_ids()
+    index = bisect_left(numbers, db_id)
 
     if index == 0:
-        return f"Before {db_ids[0]['date']}"
-    elif index == len(db_ids):
-        return f"After {db_ids[-1]['date']}"
+        return f"Before {dates[0]}"
+    elif index == len(numbers):
+        return f"After {dates[-1]}"
 
-    first_number = db_ids[index - 1]["number"]
-    second_number = db_ids[index]["number"]
+    diff = (db_id - numbers[index - 1]) / (numbers[index] - numbers[index - 1])
+    time = timestamps[index - 1] + diff * (timestamps[index] - timestamps[index - 1])
 
-    first_date = db_ids[index - 1]["date"]
-    second_date = db_ids[index]["date"]
-    first_timestamp = datetime.datetime.strptime(first_date, "%Y-%m-%d").timestamp()
-    second_timestamp = datetime.datetime.strptime(second_date, "%Y-%m-%d").timestamp()
+    return datetime.datetime.fromtimestamp(time).strftime("%Y-%m-%d %H:%M:%S")
 
-    diff = (db_id - first_number) / (second_number - first_number)
-    time = first_timestamp + diff * (second_timestamp - first_timestamp)
 
-    return datetime.datetime.fromtimestamp(time).strftime("%Y-%m-%d %H:%M:%S")
+def db_ids_to_dates(db_ids: Iterable[int]) -> List[str]:
+    """
+    Returns approximate account dates creating from account database IDs. Uses one vectorized NumPy pass when NumPy
+    is installed, otherwise calls db_id_to_date for every ID.
+
+    :param db_ids: account database IDs.
+    """
+
+    db_ids = list(db_ids)
+
+    if np is None:
+        return [db_id_to_date(db_id) for db_id in db_ids]
+
+    numbers, timestamps, dates = _load_db_ids()
+    known_numbers = np.frombuffer(numbers, dtype=np.int64)
+    known_timestamps = np.frombuffer(timestamps, dtype=np.float64)
+    ids = np.asarray(db_ids, dtype=np.int64)
+
+    indexes = np.searchsorted(known_numbers, ids, side="left")
+    inner = np.clip(indexes, 1, len(known_numbers) - 1)
+    first_numbers = known_numbers[inner - 1]
+    first_timestamps = known_timestamps[inner - 1]
+    diffs = (ids - first_numbers) / (known_numbers[inner] - first_numbers)
+    times = first_timestamps + diffs * (known_timestamps[inner] - first_timestamps)
+
+    result = []
+
+    for index, time in zip(indexes.tolist(), times.tolist()):
+        if index == 0:
+            result.append(f"Before {dates[0]}")
+        elif index == len(dates):
+            result.append(f"After {dates[-1]}")
+        else:
+            result.append(datetime.datetime.fromtimestamp(time).strftime("%Y-%m-%d %H:%M:%S"))
+
+    return result
 
 
 def team_from_number(
     number: int
 ) -> Union[Teams.Spectator, Teams.FFA, Teams.Red, Teams.Blue, Teams.Green, Teams.Yellow]:
     """
-    Returns mode class from its number according to bonk.io api.
+    Returns team from its number according to bonk.io api. Teams are singletons, so no objects are created.
 
     :param number: the number of team in bonk.io api.
     """
 
-    teams = {
-        0: Teams.Spectator(),
-        1: Teams.FFA(),
-        2: Teams.Red(),
-        3: Teams.Blue(),
-        4: Teams.Green(),
-        5: Teams.Yellow(),
-    }
-
-    return teams[number]
+    return TEAMS_BY_NUMBER[number]
 
 
 def mode_from_short_name(
     short_name: str
 ) -> Union[Modes.Classic, Modes.Arrows, Modes.DeathArrows, Modes.Grapple, Modes.VTOL, Modes.Football]:
     """
-    Returns mode class from its short name according to bonk.io api.
+    Returns mode from its short name according to bonk.io api. Modes are singletons, so no objects are created.
 
     :param short_name: mode short name in bonk.io api.
     """
 
-    modes = {
-        "b": Modes.Classic(),
-        "ar": Modes.Arrows(),
-        "ard": Modes.DeathArrows(),
-        "sp": Modes.Grapple(),
-        "v": Modes.VTOL(),
-        "f": Modes.Football(),
-    }
-
-    return modes[short_name]
+    return MODES_BY_SHORT_NAME[short_name]
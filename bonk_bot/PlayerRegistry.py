@@ -0,0 +1,191 @@
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Tuple, Union
+
+
+class PlayerRegistry:
+    """
+    Class for holding game players indexed by short id, peer id and username. Lookup, insert and removal are O(1).
+
+    Players are kept in insertion order, so iterating the registry gives the same order as the old players list.
+    Iteration and indexing use a tuple snapshot that is rebuilt only after a join or leave, so players can join or
+    leave while a handler iterates over them.
+    """
+
+    def __init__(self) -> None:
+        self.__by_short_id: Dict[int, object] = {}
+        self.__by_peer_id: Dict[str, object] = {}
+        # Several guests can have the same username, so every username maps to its players by short id
+        self.__by_username: Dict[str, Dict[int, object]] = {}
+        self.__snapshot: Union[Tuple[object, ...], None] = None
+        self.__bot_player = None
+        self.view: PlayersView = PlayersView(self)
+
+    def add(self, player) -> None:
+        """
+        Register player in the game. Player with the same short id is replaced.
+
+        :param player: Player class instance.
+        """
+
+        old_player = self.__by_short_id.get(player.short_id)
+
+        if old_player is not None:
+            self.remove(old_player)
+
+        self.__by_short_id[player.short_id] = player
+        self.__by_peer_id[player.peer_id] = player
+        self.__by_username.setdefault(player.username, {})[player.short_id] = player
+        self.__snapshot = None
+
+        if player.is_bot:
+            self.__bot_player = player
+
+    def remove(self, player) -> None:
+        """
+        Remove player from the game.
+
+        :param player: Player class instance.
+        """
+
+        if self.__by_short_id.get(player.short_id) is player:
+            del self.__by_short_id[player.short_id]
+            self.__snapshot = None
+        if self.__by_peer_id.get(player.peer_id) is player:
+            del self.__by_peer_id[player.peer_id]
+
+        namesakes = self.__by_username.get(player.username)
+
+        if namesakes is not None and namesakes.get(player.short_id) is player:
+            del namesakes[player.short_id]
+
+            if not namesakes:
+                del self.__by_username[player.username]
+
+        if self.__bot_player is player:
+            self.__bot_player = None
+
+    def clear(self) -> None:
+        """Remove all players from the game."""
+
+        self.__by_short_id.clear()
+        self.__by_peer_id.clear()
+        self.__by_username.clear()
+        self.__snapshot = None
+        self.__bot_player = None
+
+    def get(self, short_id: int):
+        """
+        Returns player by its short id or None if there is no such player.
+
+        :param short_id: player's id in the game.
+        """
+
+        return self.__by_short_id.get(short_id)
+
+    def get_by_peer_id(self, peer_id: str):
+        """
+        Returns player by its peer id or None if there is no such player.
+
+        :param peer_id: player's game peer id.
+        """
+
+        return self.__by_peer_id.get(peer_id)
+
+    def get_by_username(self, username: str):
+        """
+        Returns player by its username or None if there is no such player. If several players have the username,
+        the one that joined first is returned.
+
+        :param username: player's username.
+        """
+
+        namesakes = self.__by_username.get(username)
+
+        return next(iter(namesakes.values())) if namesakes else None
+
+    def get_all_by_username(self, username: str) -> List[object]:
+        """
+        Returns all players with the username in join order.
+
+        :param username: player's username.
+        """
+
+        return list(self.__by_username.get(username, {}).values())
+
+    def set_bot_player(self, player) -> None:
+        """
+        Marks player as the bot itself and caches it.
+
+        :param player: Player class instance.
+        """
+
+        player.is_bot = True
+        self.__bot_player = player
+
+    @property
+    def bot_player(self):
+        """Cached bot's own Player or None if bot is not in the game yet."""
+
+        return self.__bot_player
+
+    def snapshot(self) -> Tuple[object, ...]:
+        """Returns tuple of players in join order. It is rebuilt only after players join or leave."""
+
+        if self.__snapshot is None:
+            self.__snapshot = tuple(self.__by_short_id.values())
+
+        return self.__snapshot
+
+    def contains(self, player) -> bool:
+        """
+        Returns whether player is in the game.
+
+        :param player: Player class instance.
+        """
+
+        return self.__by_short_id.get(getattr(player, "short_id", None)) is player
+
+    def __len__(self) -> int:
+        return len(self.__by_short_id)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.snapshot())
+
+
+class PlayersView(Sequence):
+    """
+    Read-only list-like view on game players. Iteration and indexing go over a snapshot of players that is taken
+    when players join or leave, so iteration isn't broken by joins and leaves during awaits.
+
+    :param registry: PlayerRegistry class instance.
+    """
+
+    __slots__ = ("__registry",)
+
+    def __init__(self, registry: PlayerRegistry) -> None:
+        self.__registry: PlayerRegistry = registry
+
+    def __getitem__(self, index: Union[int, slice]):
+        players = self.__registry.snapshot()
+
+        return list(players[index]) if isinstance(index, slice) else players[index]
+
+    def __len__(self) -> int:
+        return len(self.__registry)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.__registry.snapshot())
+
+    def __contains__(self, player) -> bool:
+        return self.__registry.contains(player)
+
+    def index(self, player, start: int = 0, stop: Union[int, None] = None) -> int:
+        players = self.__registry.snapshot()
+
+        return players.index(player, start, len(players) if stop is None else stop)
+
+    def count(self, player) -> int:
+        return self.__registry.snapshot().count(player)
+
+    def __repr__(self) -> str:
+        return f"PlayersView({list(self.__registry.snapshot())!r})"
@@ -0,0 +1,144 @@
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple, Union
+
+
+class HandlerStats:
+    """Timings of one handler."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+
+
+class Profiler:
+    """
+    Opt-in profiler of socketio event handlers and bot event handlers. Every handler call is timed (wall time from
+    the start to the end of the handler, including awaits). Optionally a background thread samples the stack of the
+    event loop thread every sample_interval seconds, samples are written in collapsed-stack format that flamegraph
+    tools read.
+
+    :param sample_interval: seconds between stack samples. Default is None (no sampling).
+    :param output_path: path prefix of files that are written on bot.stop(): output_path.txt with the slowest handlers
+            report and output_path.folded with collapsed stacks. Default is None (nothing is written).
+
+    Example usage::
+
+        bot.enable_profiling(sample_interval=0.005, output_path="profile")
+    """
+
+    def __init__(self, sample_interval: Union[float, None] = None, output_path: Union[str, None] = None) -> None:
+        self.sample_interval: Union[float, None] = sample_interval
+        self.output_path: Union[str, None] = output_path
+        self.stats: Dict[str, HandlerStats] = {}
+        self.stacks: Dict[Tuple[str, ...], int] = {}
+        # Sampler thread adds stacks while the event loop thread reads them
+        self.__stacks_lock: threading.Lock = threading.Lock()
+        self.__thread_id: Union[int, None] = None
+        self.__sampler: Union[threading.Thread, None] = None
+        self.__stop_sampling: threading.Event = threading.Event()
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Adds handler call timing. You don't need to use it.
+
+        :param name: handler name.
+        :param seconds: duration of the call.
+        """
+
+        stats = self.stats.get(name)
+
+        if stats is None:
+            stats = self.stats[name] = HandlerStats()
+
+        stats.count += 1
+        stats.total += seconds
+
+        if seconds > stats.max:
+            stats.max = seconds
+
+    def start(self) -> None:
+        """Starts sampling stacks of the current thread if sample_interval is set."""
+
+        if self.sample_interval is None or self.__sampler is not None:
+            return
+
+        self.__thread_id = threading.get_ident()
+        self.__stop_sampling.clear()
+        self.__sampler = threading.Thread(target=self.__sample, name="bonk_bot_profiler", daemon=True)
+        self.__sampler.start()
+
+    def stop(self) -> None:
+        """Stops sampling stacks and writes output files if output_path is set."""
+
+        if self.__sampler is not None:
+            self.__stop_sampling.set()
+            self.__sampler.join()
+            self.__sampler = None
+
+        if self.output_path is not None:
+            self.write(self.output_path)
+
+    def report(self, top: int = 20) -> str:
+        """
+        Returns table of the handlers with the biggest total time.
+
+        :param top: amount of handlers in the table.
+        """
+
+        lines = [f"{'handler':<60} {'calls':>8} {'total s':>10} {'avg ms':>10} {'max ms':>10}"]
+        slowest = sorted(self.stats.items(), key=lambda item: item[1].total, reverse=True)[:top]
+
+        for name, stats in slowest:
+            lines.append(
+                f"{name:<60} {stats.count:>8} {stats.total:>10.3f} "
+                f"{stats.total / stats.count * 1000:>10.3f} {stats.max * 1000:>10.3f}"
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def collapsed_stacks(self) -> str:
+        """Returns stack samples in collapsed-stack format (frames from the root separated by ; and sample count)."""
+
+        with self.__stacks_lock:
+            stacks = dict(self.stacks)
+
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in stacks.items())
+
+    def write(self, path: str) -> None:
+        """
+        Writes report to path.txt and collapsed stacks to path.folded.
+
+        :param path: path prefix of output files.
+        """
+
+        with open(f"{path}.txt", "w", encoding="utf-8") as file:
+            file.write(self.report())
+
+        collapsed_stacks = self.collapsed_stacks()
+
+        if collapsed_stacks:
+            with open(f"{path}.folded", "w", encoding="utf-8") as file:
+                file.write(collapsed_stacks)
+
+    def __sample(self) -> None:
+        while not self.__stop_sampling.wait(self.sample_interval):
+            frame = sys._current_frames().get(self.__thread_id)
+            stack: List[str] = []
+
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+
+            if stack:
+                stack.reverse()
+                key = tuple(stack)
+
+                with self.__stacks_lock:
+                    self.stacks[key] = self.stacks.get(key, 0) + 1
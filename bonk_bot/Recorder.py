@@ -0,0 +1,95 @@
+import json
+import struct
+import time
+from typing import BinaryIO, Iterator, NamedTuple, Union
+
+# File starts with magic, then records follow: header (direction, monotonic time, event id, payload length) and
+# JSON payload with the list of event arguments
+RECORDING_MAGIC = b"BONKREC1"
+RECORD_HEADER = struct.Struct(">BdHI")
+INBOUND = 0
+OUTBOUND = 1
+
+
+class Packet(NamedTuple):
+    """Recorded socketio packet."""
+
+    direction: int
+    timestamp: float
+    event: int
+    args: list
+
+
+class PacketRecorder:
+    """
+    Append-only binary log of game socketio packets. Recording is started with game.start_recording(path).
+
+    Inbound packets are recorded with all their arguments before handlers run, outbound packets are recorded when they
+    are sent. Join handshakes are not recorded because they contain the account token.
+
+    :param path: path of the log file. New records are appended to an existing log.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.packets: int = 0
+        self.__file: Union[BinaryIO, None] = open(path, "ab")
+
+        if self.__file.tell() == 0:
+            self.__file.write(RECORDING_MAGIC)
+
+    def record(self, direction: int, event: int, args: Union[list, tuple]) -> None:
+        """
+        Appends packet to the log. You don't need to use it.
+
+        :param direction: INBOUND or OUTBOUND.
+        :param event: socketio event id.
+        :param args: event arguments.
+        """
+
+        if self.__file is None:
+            return
+
+        payload = json.dumps(args, separators=(",", ":")).encode()
+        self.__file.write(RECORD_HEADER.pack(direction, time.monotonic(), event, len(payload)))
+        self.__file.write(payload)
+        self.packets += 1
+
+    def flush(self) -> None:
+        """Writes buffered records to disk."""
+
+        if self.__file is not None:
+            self.__file.flush()
+
+    def close(self) -> None:
+        """Closes the log file."""
+
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+
+def read_packets(path: str) -> Iterator[Packet]:
+    """
+    Yields packets from recorded log.
+
+    :param path: path of the log file.
+    """
+
+    with open(path, "rb") as file:
+        if file.read(len(RECORDING_MAGIC)) != RECORDING_MAGIC:
+            raise ValueError(f"{path} is not a bonk_bot recording")
+
+        while True:
+            header = file.read(RECORD_HEADER.size)
+
+            if len(header) < RECORD_HEADER.size:
+                return
+
+            direction, timestamp, event, length = RECORD_HEADER.unpack(header)
+            payload = file.read(length)
+
+            if len(payload) < length:
+                return
+
+            yield Packet(direction, timestamp, event, json.loads(payload))
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Dict, Union
+
+from .Game import Game
+from .Recorder import INBOUND, read_packets
+from .Types import Modes
+
+
+class OfflineSocketClient:
+    """
+    Stand-in for socketio.AsyncClient that keeps registered handlers and emitted events without a network. You don't
+    need to use it.
+
+    :param max_emitted: amount of the latest emitted events that are kept.
+    """
+
+    def __init__(self, max_emitted: int = 1000) -> None:
+        self.handlers: Dict[Union[int, str], Callable] = {}
+        self.emitted: deque = deque(maxlen=max_emitted)
+
+    def on(self, event: Union[int, str], handler: Union[Callable, None] = None) -> Callable:
+        def register(handler: Callable) -> Callable:
+            self.handlers[event] = handler
+
+            return handler
+
+        if handler is None:
+            return register
+
+        return register(handler)
+
+    def event(self, handler: Callable) -> Callable:
+        return self.on(handler.__name__, handler)
+
+    async def emit(self, event: int, data: Union[dict, None] = None) -> None:
+        self.emitted.append((event, data))
+
+    async def connect(self, *args, **kwargs) -> None:
+        pass
+
+    async def disconnect(self) -> None:
+        pass
+
+
+class PacketReplayer:
+    """
+    Feeds inbound packets from the PacketRecorder log through the game socketio handlers and bot event handlers
+    without a network. Events that the game sends back are kept in game socket client emitted deque instead of being
+    sent, outbound packets from the log are skipped.
+
+    :param bot: bot class whose event handlers are called.
+    :param path: path of the log file.
+    :param speed: replay speed relative to the recorded timing. Default is 1 (recorded speed). None replays packets
+            as fast as possible.
+    :param room_name: name of the replayed room.
+    :param is_host: indicates whether bot is host in the replayed game or not.
+
+    Example usage::
+
+        replayer = PacketReplayer(bot, "game.rec", speed=None)
+        game = await replayer.run()
+        print(f"{replayer.packets_per_second:.0f} packets/s")
+    """
+
+    def __init__(
+        self,
+        bot,
+        path: str,
+        speed: Union[float, None] = 1,
+        room_name: str = "replay",
+        is_host: bool = False
+    ) -> None:
+        self.bot = bot
+        self.path: str = path
+        self.speed: Union[float, None] = speed
+        self.room_name: str = room_name
+        self.is_host: bool = is_host
+        self.packets: int = 0
+        self.seconds: float = 0
+
+    @property
+    def packets_per_second(self) -> float:
+        """Amount of packets that were replayed every second during the last run."""
+
+        return self.packets / self.seconds if self.seconds else 0
+
+    async def run(self) -> Game:
+        """Replays the log in a new offline game and returns the game. Call game.leave() when it isn't needed."""
+
+        game = Game(
+            self.bot,
+            self.room_name,
+            OfflineSocketClient(),
+            self.is_host,
+            Modes.Classic(),
+            False,
+            self.bot.router
+        )
+        # Nothing is sent to the server, so outbound rate limit would only slow the replay down
+        game.outbound.configure(rate=1e9, burst=1_000_000_000)
+        await game.start_offline()
+
+        self.packets = 0
+        first_timestamp = None
+        start = time.monotonic()
+
+        for packet in read_packets(self.path):
+            if packet.direction != INBOUND:
+                continue
+
+            if self.speed is not None:
+                if first_timestamp is None:
+                    first_timestamp = packet.timestamp
+
+                delay = (packet.timestamp - first_timestamp) / self.speed - (time.monotonic() - start)
+
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            await game.feed(packet.event, *packet.args)
+            self.packets += 1
+
+        # Lets bot event handlers that were scheduled by the last packets start
+        await asyncio.sleep(0)
+        self.seconds = time.monotonic() - start
+
+        return game
@@ -42,18 +42,19 @@ class Room:
         self.min_level: int = min_level
         self.max_level: int = max_level
 
-    async def join(self, password="") -> Game:
+    async def join(self, password="", timeout=10) -> Game:
         """
         Joins game from room list.
 
         :param password: password to join room.
+        :param timeout: seconds to wait for the server to confirm the room. GameConnectionError is raised after that.
 
         Example usage::
 
             bot = bonk_account_login("name", "pass")
 
             async def main():
-                room = [room for room in bot.get_rooms() if room.name == "test room"][0]
+                room = (await bot.rooms.find(name_prefix="test room"))[0]
                 game = await room.join()
 
                 await bot.run()
@@ -64,13 +65,13 @@ class Room:
         game = Game(
             self.bot,
             self.name,
-            socketio.AsyncClient(ssl_verify=False),
+            socketio.AsyncClient(ssl_verify=False, reconnection=False),
             False,
             self.mode,
             False,
-            self.bot.event_emitter,
+            self.bot.router,
             game_join_params=[self.room_id, password]
         )
-        await game.connect()
+        await game.connect(timeout)
 
         return game
@@ -0,0 +1,151 @@
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+from .Room import Room
+from .Types import Modes
+
+
+class RoomDirectory:
+    """
+    Cached bonk.io room list with indexes by room id, mode, level range, free slots and name prefix.
+
+    Room list is loaded with bot.get_rooms() only when the cache is older than ttl seconds, other queries are answered
+    from the indexes. Level range is indexed by rooms sorted by min level and by max level, a level query bisects both
+    and scans only the smaller side.
+
+    :param bot: bot class that loads rooms.
+    :param ttl: seconds while loaded room list is considered fresh.
+
+    Example usage::
+
+        async def main():
+            rooms = await bot.rooms.find(mode=Modes.Grapple(), min_free=2, level=bot.get_level())
+            game = await rooms[0].join()
+    """
+
+    def __init__(self, bot, ttl: float = 5) -> None:
+        self.bot = bot
+        self.ttl: float = ttl
+        self.loaded_at: float = 0
+        self.__by_id: Dict[int, Room] = {}
+        self.__by_mode: Dict[str, Set[int]] = {}
+        self.__by_free_slots: Dict[int, Set[int]] = {}
+        self.__by_min_level: List[Tuple[int, int]] = []
+        self.__by_max_level: List[Tuple[int, int]] = []
+        self.__by_name: List[Tuple[str, int]] = []
+
+    @property
+    def is_fresh(self) -> bool:
+        """Indicates whether cached room list is younger than ttl or not."""
+
+        return time.monotonic() - self.loaded_at < self.ttl
+
+    def load(self, rooms: Iterable[Room]) -> None:
+        """
+        Rebuilds indexes from rooms and marks cache as fresh.
+
+        :param rooms: rooms from the bonk.io room list.
+        """
+
+        self.__by_id = {room.room_id: room for room in rooms}
+        self.__by_mode = {}
+        self.__by_free_slots = {}
+
+        for room in self.__by_id.values():
+            self.__by_mode.setdefault(room.mode.short_name, set()).add(room.room_id)
+            self.__by_free_slots.setdefault(room.max_players - room.players, set()).add(room.room_id)
+
+        self.__by_min_level = sorted((room.min_level, room.room_id) for room in self.__by_id.values())
+        self.__by_max_level = sorted((room.max_level, room.room_id) for room in self.__by_id.values())
+        self.__by_name = sorted((room.name.lower(), room.room_id) for room in self.__by_id.values())
+        self.loaded_at = time.monotonic()
+
+    async def refresh(self) -> None:
+        """Loads room list from bonk.io ignoring the cache."""
+
+        self.load(await self.bot.get_rooms())
+
+    async def all(self) -> List[Room]:
+        """Returns all rooms from the room list."""
+
+        if not self.is_fresh:
+            await self.refresh()
+
+        return list(self.__by_id.values())
+
+    async def get(self, room_id: int) -> Union[Room, None]:
+        """
+        Returns room by its database ID or None if there is no such room in the room list.
+
+        :param room_id: database ID of room.
+        """
+
+        if not self.is_fresh:
+            await self.refresh()
+
+        return self.__by_id.get(room_id)
+
+    async def find(
+        self,
+        mode: Union[Modes.Classic, Modes.Arrows, Modes.DeathArrows, Modes.Grapple, Modes.VTOL, Modes.Football, str, None] = None,
+        min_free: Union[int, None] = None,
+        level: Union[int, None] = None,
+        name_prefix: Union[str, None] = None,
+        has_password: Union[bool, None] = None
+    ) -> List[Room]:
+        """
+        Returns rooms that match all given filters.
+
+        :param mode: mode that is played in the room (Modes class instance or mode short name).
+        :param min_free: minimal amount of free slots in the room.
+        :param level: level that has to be allowed to join the room.
+        :param name_prefix: case-insensitive beginning of the room name.
+        :param has_password: whether room has password or not.
+        """
+
+        if not self.is_fresh:
+            await self.refresh()
+
+        candidates: List[Set[int]] = []
+
+        if mode is not None:
+            candidates.append(self.__by_mode.get(mode if isinstance(mode, str) else mode.short_name, set()))
+        if min_free is not None:
+            candidates.append(set().union(*[ids for free, ids in self.__by_free_slots.items() if free >= min_free]))
+        if level is not None:
+            candidates.append(self.__allowing_level(level))
+        if name_prefix is not None:
+            name_prefix = name_prefix.lower()
+            ids = set()
+
+            for name, room_id in self.__by_name[bisect_left(self.__by_name, (name_prefix, -1)):]:
+                if not name.startswith(name_prefix):
+                    break
+                ids.add(room_id)
+
+            candidates.append(ids)
+
+        if candidates:
+            candidates.sort(key=len)
+            room_ids = candidates[0].intersection(*candidates[1:])
+            rooms = [self.__by_id[room_id] for room_id in room_ids]
+        else:
+            rooms = list(self.__by_id.values())
+
+        if has_password is not None:
+            rooms = [room for room in rooms if room.has_password == has_password]
+
+        return rooms
+
+    def __allowing_level(self, level: int) -> Set[int]:
+        """Returns ids of rooms whose level range contains level."""
+
+        # Rooms with min level <= level are a prefix of one index, rooms with max level >= level are a suffix of other
+        min_end = bisect_right(self.__by_min_level, (level, float("inf")))
+        max_start = bisect_left(self.__by_max_level, (level, float("-inf")))
+
+        if min_end <= len(self.__by_max_level) - max_start:
+            return {room_id for _, room_id in self.__by_min_level[:min_end] if self.__by_id[room_id].max_level >= level}
+
+        return {room_id for _, room_id in self.__by_max_level[max_start:] if self.__by_id[room_id].min_level <= level}
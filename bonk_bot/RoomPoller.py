@@ -0,0 +1,138 @@
+from typing import Dict, Union
+
+from .Room import Room
+from .Parsers import mode_from_short_name
+from .Scheduler import ScheduledTask
+
+
+class RoomPoller:
+    """
+    Background bonk.io room list poller. Keeps the previous room list snapshot and emits only the differences:
+
+    - room_open(room) when new room appears in the room list
+    - room_close(room) when room disappears from the room list
+    - room_update(room, changes) when room changes. Changes is a dict of changed Room fields with (old, new) values
+
+    Unchanged Room objects are reused between polls and every poll refreshes bot.rooms directory. Poll interval
+    shrinks when room list changes a lot and grows when it is quiet.
+
+    :param bot: bot class that polls rooms.
+    :param min_interval: minimal seconds between polls.
+    :param max_interval: maximal seconds between polls.
+    """
+
+    def __init__(self, bot, min_interval: float = 2, max_interval: float = 30) -> None:
+        self.bot = bot
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.interval: float = min_interval
+        self.rooms: Dict[int, Room] = {}
+        self.__task: Union[ScheduledTask, None] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Indicates whether poller is running or not."""
+
+        return self.__task is not None
+
+    def start(self) -> None:
+        """Starts polling room list in the background."""
+
+        if self.__task is None:
+            self.__task = self.bot.scheduler.schedule_after(0, self.__run)
+
+    def stop(self) -> None:
+        """Stops polling room list."""
+
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+    async def poll(self) -> int:
+        """Loads room list once, updates the snapshot and emits diff events. Returns the amount of changed rooms."""
+
+        data = await self.bot.get_raw_rooms()
+        emitter = self.bot.event_emitter
+        rooms: Dict[int, Room] = {}
+        changed = 0
+
+        for raw_room in data:
+            room = self.rooms.pop(raw_room["id"], None)
+
+            if room is None:
+                room = Room(
+                    self.bot,
+                    raw_room["id"],
+                    raw_room["roomname"],
+                    raw_room["players"],
+                    raw_room["maxplayers"],
+                    raw_room["password"] == 1,
+                    mode_from_short_name(raw_room["mode_mo"]),
+                    raw_room["minlevel"],
+                    raw_room["maxlevel"]
+                )
+                rooms[room.room_id] = room
+                changed += 1
+
+                emitter.emit("room_open", room)
+                continue
+
+            rooms[room.room_id] = room
+            changes = self.__update(room, raw_room)
+
+            if changes:
+                changed += 1
+                emitter.emit("room_update", room, changes)
+
+        for room in self.rooms.values():
+            changed += 1
+            emitter.emit("room_close", room)
+
+        self.rooms = rooms
+        self.bot.rooms.load(rooms.values())
+
+        return changed
+
+    @staticmethod
+    def __update(room: Room, raw_room: dict) -> dict:
+        """Applies raw room data to room and returns changed fields."""
+
+        changes = {}
+
+        if room.name != raw_room["roomname"]:
+            changes["name"] = (room.name, raw_room["roomname"])
+            room.name = raw_room["roomname"]
+        if room.players != raw_room["players"]:
+            changes["players"] = (room.players, raw_room["players"])
+            room.players = raw_room["players"]
+        if room.max_players != raw_room["maxplayers"]:
+            changes["max_players"] = (room.max_players, raw_room["maxplayers"])
+            room.max_players = raw_room["maxplayers"]
+        if room.has_password != (raw_room["password"] == 1):
+            changes["has_password"] = (room.has_password, raw_room["password"] == 1)
+            room.has_password = raw_room["password"] == 1
+        if room.mode.short_name != raw_room["mode_mo"]:
+            mode = mode_from_short_name(raw_room["mode_mo"])
+            changes["mode"] = (room.mode, mode)
+            room.mode = mode
+        if room.min_level != raw_room["minlevel"]:
+            changes["min_level"] = (room.min_level, raw_room["minlevel"])
+            room.min_level = raw_room["minlevel"]
+        if room.max_level != raw_room["maxlevel"]:
+            changes["max_level"] = (room.max_level, raw_room["maxlevel"])
+            room.max_level = raw_room["maxlevel"]
+
+        return changes
+
+    async def __run(self) -> None:
+        try:
+            changed = await self.poll()
+            churn = changed / max(1, len(self.rooms))
+
+            if churn > 0.1:
+                self.interval = max(self.min_interval, self.interval / 2)
+            elif churn == 0:
+                self.interval = min(self.max_interval, self.interval * 1.5)
+        finally:
+            if self.__task is not None:
+                self.__task = self.bot.scheduler.schedule_after(self.interval, self.__run)
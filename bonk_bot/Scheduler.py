@@ -0,0 +1,227 @@
+import asyncio
+import datetime
+import math
+import time
+from typing import Callable, List, Union
+
+
+class ScheduledTask:
+    """
+    Handle of the callback scheduled in TimerWheel.
+
+    :param callback: function or coroutine function that is called.
+    :param args: arguments that are passed to callback.
+    :param delay: seconds before the first call.
+    :param interval: seconds between calls. None for one-shot callbacks.
+    """
+
+    __slots__ = ("callback", "args", "delay", "interval", "is_cancelled", "tick")
+
+    def __init__(self, callback: Callable, args: tuple, delay: float, interval: Union[float, None]) -> None:
+        self.callback: Callable = callback
+        self.args: tuple = args
+        self.delay: float = delay
+        self.interval: Union[float, None] = interval
+        self.is_cancelled: bool = False
+        self.tick: int = 0
+
+    def cancel(self) -> None:
+        """Stops calling the callback."""
+
+        self.is_cancelled = True
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel that drives all scheduled callbacks from one asyncio task.
+
+    Callbacks that are due on the same tick are fired as one batch, coroutines of the batch are gathered in one task.
+
+    :param tick: wheel resolution in seconds.
+    :param slots: amount of wheel slots.
+    """
+
+    def __init__(self, tick: float = 0.1, slots: int = 512) -> None:
+        self.tick: float = tick
+        self.__slots: List[List[ScheduledTask]] = [[] for _ in range(slots)]
+        self.__pending: List[ScheduledTask] = []
+        self.__current_tick: int = 0
+        self.__start_time: float = 0
+        self.__size: int = 0
+        self.__runner: Union[asyncio.Task, None] = None
+
+    def schedule_after(self, delay: float, callback: Callable, *args) -> ScheduledTask:
+        """
+        Calls callback once after delay seconds.
+
+        :param delay: seconds before the call.
+        :param callback: function or coroutine function that is called.
+        :param args: arguments that are passed to callback.
+        """
+
+        task = ScheduledTask(callback, args, max(0.0, delay), None)
+        self.__add(task)
+
+        return task
+
+    def schedule_at(self, when: Union[float, datetime.datetime], callback: Callable, *args) -> ScheduledTask:
+        """
+        Calls callback once at the given time.
+
+        :param when: unix timestamp or datetime of the call.
+        :param callback: function or coroutine function that is called.
+        :param args: arguments that are passed to callback.
+        """
+
+        if isinstance(when, datetime.datetime):
+            when = when.timestamp()
+
+        return self.schedule_after(when - time.time(), callback, *args)
+
+    def schedule_every(
+        self,
+        interval: float,
+        callback: Callable,
+        *args,
+        delay: Union[float, None] = None
+    ) -> ScheduledTask:
+        """
+        Calls callback every interval seconds.
+
+        :param interval: seconds between calls.
+        :param callback: function or coroutine function that is called.
+        :param args: arguments that are passed to callback.
+        :param delay: seconds before the first call. Default is interval.
+        """
+
+        if interval <= 0:
+            raise ValueError("Interval must be greater than 0")
+
+        task = ScheduledTask(callback, args, interval if delay is None else max(0.0, delay), interval)
+        self.__add(task)
+
+        return task
+
+    def start(self) -> None:
+        """Starts the wheel in the running event loop. It is also started automatically on scheduling."""
+
+        if self.__runner is not None and not self.__runner.done():
+            return
+
+        loop = asyncio.get_running_loop()
+
+        if self.__size == 0:
+            self.__start_time = loop.time()
+            self.__current_tick = 0
+
+        pending = self.__pending
+        self.__pending = []
+
+        for task in pending:
+            self.__place(task, self.__ticks_from_now(loop, task.delay))
+
+        if self.__size:
+            self.__runner = asyncio.ensure_future(self.__run())
+
+    def stop(self) -> None:
+        """Cancels all scheduled callbacks and stops the wheel."""
+
+        if self.__runner is not None:
+            self.__runner.cancel()
+            self.__runner = None
+
+        for slot in self.__slots:
+            for task in slot:
+                task.cancel()
+            slot.clear()
+
+        for task in self.__pending:
+            task.cancel()
+
+        self.__pending.clear()
+        self.__size = 0
+
+    def __len__(self) -> int:
+        return self.__size + len(self.__pending)
+
+    def __add(self, task: ScheduledTask) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.__pending.append(task)
+            return
+
+        if self.__runner is None or self.__runner.done():
+            self.__pending.append(task)
+            self.start()
+        else:
+            self.__place(task, self.__ticks_from_now(loop, task.delay))
+
+    def __ticks_from_now(self, loop: asyncio.AbstractEventLoop, delay: float) -> int:
+        return math.ceil((loop.time() + delay - self.__start_time) / self.tick)
+
+    def __place(self, task: ScheduledTask, tick: int) -> None:
+        task.tick = max(tick, self.__current_tick + 1)
+        self.__slots[task.tick % len(self.__slots)].append(task)
+        self.__size += 1
+
+    async def __run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while self.__size:
+            delay = self.__start_time + (self.__current_tick + 1) * self.tick - loop.time()
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            now_tick = int((loop.time() - self.__start_time) / self.tick)
+
+            while self.__current_tick < now_tick and self.__size:
+                self.__current_tick += 1
+                self.__fire(self.__current_tick)
+
+    def __fire(self, tick: int) -> None:
+        slot = self.__slots[tick % len(self.__slots)]
+
+        if not slot:
+            return
+
+        due = [task for task in slot if task.tick <= tick]
+
+        if not due:
+            return
+
+        slot[:] = [task for task in slot if task.tick > tick]
+        self.__size -= len(due)
+        coroutines = []
+
+        for task in due:
+            if task.is_cancelled:
+                continue
+
+            if task.interval is not None:
+                self.__place(task, task.tick + max(1, round(task.interval / self.tick)))
+
+            try:
+                result = task.callback(*task.args)
+            except Exception as e:
+                self.__report(e)
+                continue
+
+            if asyncio.iscoroutine(result):
+                coroutines.append(result)
+
+        if coroutines:
+            asyncio.ensure_future(self.__run_batch(coroutines))
+
+    async def __run_batch(self, coroutines: list) -> None:
+        for result in await asyncio.gather(*coroutines, return_exceptions=True):
+            if isinstance(result, Exception):
+                self.__report(result)
+
+    @staticmethod
+    def __report(exception: Exception) -> None:
+        asyncio.get_event_loop().call_exception_handler({
+            "message": "Exception in scheduled callback",
+            "exception": exception
+        })
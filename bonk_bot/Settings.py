@@ -1,3 +1,6 @@
+from typing import Union
+from urllib.parse import urlsplit
+
 PROTOCOL_VERSION = 49
 links = {
     "login": "https://bonk2.io/scripts/login_legacy.php",
@@ -9,3 +12,39 @@ links = {
     "rooms": "https://bonk2.io/scripts/getrooms.php",
     "get_room_address": "https://bonk2.io/scripts/getroomaddress.php"
 }
+DEFAULT_LINKS = dict(links)
+# Address of game socket server, {server} is replaced with server hostname (e.g. b2warsaw1)
+DEFAULT_SOCKET_ADDRESS = "https://{server}.bonk.io/socket.io"
+socket_address = DEFAULT_SOCKET_ADDRESS
+
+
+def get_socket_address(server: str) -> str:
+    """
+    Returns socket.io address of the game server.
+
+    :param server: server hostname (e.g. b2warsaw1).
+    """
+
+    return socket_address.format(server=server)
+
+
+def use_server(address: Union[str, None]) -> None:
+    """
+    Points api links and game servers to another address, e.g. local FakeServer. Call it before the bot logs in.
+
+    :param address: server address (e.g. http://127.0.0.1:8080). None restores bonk.io addresses.
+    """
+
+    global socket_address
+
+    if address is None:
+        links.update(DEFAULT_LINKS)
+        socket_address = DEFAULT_SOCKET_ADDRESS
+        return
+
+    address = address.rstrip("/")
+
+    for name, url in DEFAULT_LINKS.items():
+        links[name] = address + urlsplit(url).path
+
+    socket_address = address + "/socket.io"
@@ -1,219 +1,260 @@
-class Servers:
-    """Class for holding server types."""
+from typing import Dict, FrozenSet
 
-    class Warsaw:
-        def __init__(self) -> None:
-            self.latitude = 52.2370
-            self.longitude = 21.0175
-            self.country = "PL"
-
-        def __str__(self) -> str:
-            return "b2warsaw1"
-
-    class Stockholm:
-        def __init__(self) -> None:
-            self.latitude = 59.3346
-            self.longitude = 18.0632
-            self.country = "SE"
-
-        def __str__(self) -> str:
-            return "b2stockholm1"
-
-    class Frankfurt:
-        def __init__(self) -> None:
-            self.latitude = 50.1109
-            self.longitude = 8.6821
-            self.country = "GE"
-
-        def __str__(self) -> str:
-            return "b2frankfurt1"
-
-    class London:
-        def __init__(self) -> None:
-            self.latitude = 51.5098
-            self.longitude = -0.1180
-            self.country = "UK"
-
-        def __str__(self) -> str:
-            return "b2london1"
-
-    class Seoul:
-        def __init__(self) -> None:
-            self.latitude = 37.5326
-            self.longitude = 127.0246
-            self.country = "KR"
-
-        def __str__(self) -> str:
-            return "b2seoul1"
-
-    class Seattle:
-        def __init__(self) -> None:
-            self.latitude = 47.6080
-            self.longitude = -122.3352
-            self.country = "US"
-
-        def __str__(self) -> str:
-            return "b2seattle1"
-
-    class SanFrancisco:
-        def __init__(self) -> None:
-            self.latitude = 37.7740
-            self.longitude = -122.4312
-            self.country = "US"
-
-        def __str__(self) -> str:
-            return "b2sanfrancisco1"
-
-    class Mississippi:
-        def __init__(self) -> None:
-            self.latitude = 35.5147
-            self.longitude = -89.9125
-            self.country = "US"
-
-        def __str__(self) -> str:
-            return "b2river1"
-
-    class Dallas:
-        def __init__(self) -> None:
-            self.latitude = 32.7792
-            self.longitude = -96.8089
-            self.country = "US"
-
-        def __str__(self) -> str:
-            return "b2dallas1"
-
-    class NewYork:
-        def __init__(self) -> None:
-            self.latitude = 40.7306
-            self.longitude = -73.9352
-            self.country = "US"
-
-        def __str__(self) -> str:
-            return "b2ny1"
-
-    class Atlanta:
-        def __init__(self) -> None:
-            self.latitude = 33.7537
-            self.longitude = -84.3863
-            self.country = "US"
-
-        def __str__(self) -> str:
-            return "b2atlanta1"
-
-    class Sydney:
-        def __init__(self) -> None:
-            self.latitude = -33.8651
-            self.longitude = 151.2099
-            self.country = "AU"
-
-        def __str__(self) -> str:
-            return "b2sydney1"
-
-    class Brazil:
-        def __init__(self) -> None:
-            self.latitude = -22.9083
-            self.longitude = -43.1963
-            self.country = "BR"
-
-        def __str__(self) -> str:
-            return "b2brazil1"
 
+class _InternedType(type):
+    """Metaclass that forbids changing class attributes, so values of interned types can't be changed."""
 
-class Modes:
-    """Class for holding mode types."""
+    def __setattr__(cls, name: str, value) -> None:
+        raise AttributeError(f"Can't set {name}: {cls.__qualname__} is immutable")
 
-    class Classic:
-        def __init__(self) -> None:
-            self.ga = "b"
-            self.short_name = "b"
+    def __delattr__(cls, name: str) -> None:
+        raise AttributeError(f"Can't delete {name}: {cls.__qualname__} is immutable")
 
-        def __str__(self) -> str:
-            return "Classic"
 
-    class Arrows:
-        def __init__(self) -> None:
-            self.ga = "b"
-            self.short_name = "ar"
+class _Interned(metaclass=_InternedType):
+    """
+    Base of immutable types that have exactly one instance. Constructor returns the same instance on every call, so
+    Teams.Red() is Teams.Red() and values can be compared by identity. Values are class attributes that can't be
+    changed and there are no instance attributes, so neither instances nor types can be changed.
+    """
 
-        def __str__(self) -> str:
-            return "Arrows"
+    __slots__ = ()
 
-    class DeathArrows:
-        def __init__(self) -> None:
-            self.ga = "b"
-            self.short_name = "ard"
+    def __new__(cls) -> "_Interned":
+        instance = cls.__dict__.get("_instance")
 
-        def __str__(self) -> str:
-            self.ga = "b"
-            return "Death Arrows"
+        if instance is None:
+            instance = super().__new__(cls)
+            type.__setattr__(cls, "_instance", instance)
 
-    class Grapple:
-        def __init__(self) -> None:
-            self.ga = "b"
-            self.short_name = "sp"
+        return instance
 
-        def __str__(self) -> str:
-            self.ga = "b"
-            return "Grapple"
+    def __reduce__(self) -> tuple:
+        return self.__class__, ()
 
-    class VTOL:
-        def __init__(self) -> None:
-            self.ga = "b"
-            self.short_name = "v"
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}()"
 
-        def __str__(self) -> str:
-            return "VTOL"
 
-    class Football:
-        def __init__(self) -> None:
-            self.ga = "f"
-            self.short_name = "f"
+class Server(_Interned):
+    """Base class of server types."""
 
-        def __str__(self) -> str:
-            return "Football"
+    __slots__ = ()
+    hostname: str = ""
+    latitude: float = 0
+    longitude: float = 0
+    country: str = ""
 
+    def __str__(self) -> str:
+        return self.hostname
 
-class Teams:
-    """Class for holding team types."""
 
-    class Spectator:
-        def __init__(self) -> None:
-            self.number = 0
+class Mode(_Interned):
+    """Base class of mode types."""
+
+    __slots__ = ()
+    name: str = ""
+    ga: str = ""
+    short_name: str = ""
+
+    def __str__(self) -> str:
+        return self.name
 
-        def __str__(self) -> str:
-            return "Spectator"
 
-    class FFA:
-        def __init__(self) -> None:
-            self.number = 1
+class Team(_Interned):
+    """Base class of team types."""
 
-        def __str__(self) -> str:
-            return "FFA"
+    __slots__ = ()
+    name: str = ""
+    number: int = 0
 
-    class Red:
-        def __init__(self) -> None:
-            self.number = 2
+    def __str__(self) -> str:
+        return self.name
 
-        def __str__(self) -> str:
-            return "Red"
 
-    class Blue:
-        def __init__(self) -> None:
-            self.number = 3
+class Servers:
+    """Class for holding server types."""
+
+    class Warsaw(Server):
+        __slots__ = ()
+        hostname = "b2warsaw1"
+        latitude = 52.2370
+        longitude = 21.0175
+        country = "PL"
+
+    class Stockholm(Server):
+        __slots__ = ()
+        hostname = "b2stockholm1"
+        latitude = 59.3346
+        longitude = 18.0632
+        country = "SE"
+
+    class Frankfurt(Server):
+        __slots__ = ()
+        hostname = "b2frankfurt1"
+        latitude = 50.1109
+        longitude = 8.6821
+        country = "GE"
+
+    class London(Server):
+        __slots__ = ()
+        hostname = "b2london1"
+        latitude = 51.5098
+        longitude = -0.1180
+        country = "UK"
+
+    class Seoul(Server):
+        __slots__ = ()
+        hostname = "b2seoul1"
+        latitude = 37.5326
+        longitude = 127.0246
+        country = "KR"
+
+    class Seattle(Server):
+        __slots__ = ()
+        hostname = "b2seattle1"
+        latitude = 47.6080
+        longitude = -122.3352
+        country = "US"
+
+    class SanFrancisco(Server):
+        __slots__ = ()
+        hostname = "b2sanfrancisco1"
+        latitude = 37.7740
+        longitude = -122.4312
+        country = "US"
+
+    class Mississippi(Server):
+        __slots__ = ()
+        hostname = "b2river1"
+        latitude = 35.5147
+        longitude = -89.9125
+        country = "US"
+
+    class Dallas(Server):
+        __slots__ = ()
+        hostname = "b2dallas1"
+        latitude = 32.7792
+        longitude = -96.8089
+        country = "US"
+
+    class NewYork(Server):
+        __slots__ = ()
+        hostname = "b2ny1"
+        latitude = 40.7306
+        longitude = -73.9352
+        country = "US"
+
+    class Atlanta(Server):
+        __slots__ = ()
+        hostname = "b2atlanta1"
+        latitude = 33.7537
+        longitude = -84.3863
+        country = "US"
+
+    class Sydney(Server):
+        __slots__ = ()
+        hostname = "b2sydney1"
+        latitude = -33.8651
+        longitude = 151.2099
+        country = "AU"
+
+    class Brazil(Server):
+        __slots__ = ()
+        hostname = "b2brazil1"
+        latitude = -22.9083
+        longitude = -43.1963
+        country = "BR"
+
 
-        def __str__(self) -> str:
-            return "Blue"
+class Modes:
+    """Class for holding mode types."""
 
-    class Green:
-        def __init__(self) -> None:
-            self.number = 4
+    class Classic(Mode):
+        __slots__ = ()
+        name = "Classic"
+        ga = "b"
+        short_name = "b"
+
+    class Arrows(Mode):
+        __slots__ = ()
+        name = "Arrows"
+        ga = "b"
+        short_name = "ar"
+
+    class DeathArrows(Mode):
+        __slots__ = ()
+        name = "Death Arrows"
+        ga = "b"
+        short_name = "ard"
+
+    class Grapple(Mode):
+        __slots__ = ()
+        name = "Grapple"
+        ga = "b"
+        short_name = "sp"
+
+    class VTOL(Mode):
+        __slots__ = ()
+        name = "VTOL"
+        ga = "b"
+        short_name = "v"
+
+    class Football(Mode):
+        __slots__ = ()
+        name = "Football"
+        ga = "f"
+        short_name = "f"
 
-        def __str__(self) -> str:
-            return "Green"
 
-    class Yellow:
-        def __init__(self) -> None:
-            self.number = 5
+class Teams:
+    """Class for holding team types."""
 
-        def __str__(self) -> str:
-            return "Yellow"
+    class Spectator(Team):
+        __slots__ = ()
+        name = "Spectator"
+        number = 0
+
+    class FFA(Team):
+        __slots__ = ()
+        name = "FFA"
+        number = 1
+
+    class Red(Team):
+        __slots__ = ()
+        name = "Red"
+        number = 2
+
+    class Blue(Team):
+        __slots__ = ()
+        name = "Blue"
+        number = 3
+
+    class Green(Team):
+        __slots__ = ()
+        name = "Green"
+        number = 4
+
+    class Yellow(Team):
+        __slots__ = ()
+        name = "Yellow"
+        number = 5
+
+
+# Lookup tables of all instances by their bonk.io api values
+SERVERS_BY_HOSTNAME: Dict[str, Server] = {
+    server.hostname: server
+    for server in (server_type() for server_type in vars(Servers).values() if isinstance(server_type, type))
+}
+MODES_BY_SHORT_NAME: Dict[str, Mode] = {
+    mode.short_name: mode
+    for mode in (mode_type() for mode_type in vars(Modes).values() if isinstance(mode_type, type))
+}
+TEAMS_BY_NUMBER: Dict[int, Team] = {
+    team.number: team
+    for team in (team_type() for team_type in vars(Teams).values() if isinstance(team_type, type))
+}
+# Sets of all instances for validation with one membership test
+SERVERS: FrozenSet[Server] = frozenset(SERVERS_BY_HOSTNAME.values())
+MODES: FrozenSet[Mode] = frozenset(MODES_BY_SHORT_NAME.values())
+TEAMS: FrozenSet[Team] = frozenset(TEAMS_BY_NUMBER.values())
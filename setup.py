@@ -10,5 +10,6 @@ setup(
     license="MIT",
     long_description=long_description,
     author="Safizapi",
-    packages=find_packages(exclude=["tests"])
+    packages=find_packages(exclude=["tests", "benchmarks"]),
+    package_data={"bonk_bot": ["dbids.json"]}
 )
@@ -0,0 +1,57 @@
+import base64
+import gc
+from urllib.parse import quote_plus
+
+import pytest
+
+from bonk_bot import Avatar as avatar_module
+from bonk_bot.Avatar import AVATAR_LAYER, Avatar
+from bonk_bot.Parsers import parse_avatar
+
+# Avatar string laid out as the api sends it, every framing byte is distinct from zero
+HEADER = bytes([0x0A, 0x07, 0x03, 0x61, 0x02, 0x09, 0x05])
+AFTER_COUNT = bytes([0x01, 0x0A, 0x05])
+BEFORE_LAYERS = bytes([0x00, 0x00, 0x00, 0x00, 0x0A, 0x11])
+SEPARATOR = bytes([0x0A, 0x05, 0x01, 0x00, 0x02])
+LAYERS = [
+    {"id": 13, "scale": 0.5, "angle": 90.0, "x": -2.0, "y": 4.25, "flipX": True, "flipY": False, "color": 0x448AFF},
+    {"id": 7, "scale": 1.0, "angle": 0.0, "x": 3.5, "y": 0.0, "flipX": False, "flipY": True, "color": 0xFF0000}
+]
+
+
+def api_string(layers, bc):
+    data = bytearray(HEADER)
+    data.append(len(layers) * 2 + 1)
+    data += AFTER_COUNT + BEFORE_LAYERS
+
+    for index, layer in enumerate(layers):
+        if index != 0:
+            data += SEPARATOR
+
+        data += AVATAR_LAYER.pack(layer["id"], layer["scale"], layer["angle"], layer["x"], layer["y"], layer["flipX"],
+                                  layer["flipY"], layer["color"] >> 16, layer["color"] & 0xFFFF)
+
+    data += bc.to_bytes(3, "big")
+    return quote_plus(base64.b64encode(bytes(data)).decode())
+
+
+@pytest.fixture
+def framing(monkeypatch):
+    monkeypatch.setattr(avatar_module, "AVATAR_FRAMING", dict(avatar_module.AVATAR_FRAMING))
+    monkeypatch.setattr(avatar_module, "_remembered_framing", set())
+
+
+def test_built_avatar_is_encoded_with_api_framing(framing):
+    encoded = api_string(LAYERS, 0x123456)
+    pool_size = Avatar.pool_size()
+    assert parse_avatar(encoded).encode() == encoded
+    gc.collect()
+
+    # Same content built in code, the decoded avatar with cached string is no longer in the pool
+    assert Avatar.pool_size() == pool_size
+    assert Avatar({"layers": [dict(layer) for layer in LAYERS], "bc": 0x123456}).encode() == encoded
+
+    other_layers = [dict(LAYERS[1], color=0x00FF00), dict(LAYERS[0], id=21), dict(LAYERS[1], x=-8.0)]
+    built = Avatar({"layers": other_layers, "bc": 0xABCDEF})
+    assert built.encode() == api_string(other_layers, 0xABCDEF)
+    assert parse_avatar(built.encode()).json_data == built.json_data
@@ -0,0 +1,36 @@
+import pytest
+
+from bonk_bot.Commands import Command
+
+
+async def callback(game, message, args):
+    return None
+
+
+def test_user_limit():
+    command = Command("ping", callback, user_limit=2, user_window=10)
+
+    assert command.try_use("player", 0)
+    assert command.try_use("player", 1)
+    assert not command.try_use("player", 2)
+    assert command.try_use("other", 2)
+    assert command.try_use("player", 10)
+
+
+def test_idle_players_are_forgotten():
+    command = Command("ping", callback, user_limit=1, user_window=10)
+
+    for index in range(1000):
+        command.try_use(f"player{index}", index * 0.001)
+
+    command.try_use("late", 100)
+
+    assert len(command._Command__user_uses) == 1
+
+
+def test_sync_callback_is_rejected():
+    def sync_callback(game, message, args):
+        return "Pong!"
+
+    with pytest.raises(TypeError):
+        Command("ping", sync_callback)
@@ -0,0 +1,43 @@
+import asyncio
+from types import SimpleNamespace
+
+from pymitter import EventEmitter
+
+from bonk_bot.EventRouter import EventRouter
+from bonk_bot.Metrics import NullRegistry
+
+
+class FakeGame:
+    room_name = "room"
+
+
+def test_failing_coroutine_handlers_are_reported():
+    async def emit():
+        bot = SimpleNamespace(event_emitter=EventEmitter(), metrics=NullRegistry(), profiler=None)
+        router = EventRouter(bot)
+        game = FakeGame()
+        handled = []
+        reported = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: reported.append(context["exception"]))
+
+        async def on_message_in_game(game, message):
+            raise ValueError(message)
+
+        async def on_message(game, message):
+            handled.append(message)
+
+        router.on("message", on_message_in_game, game=game)
+        router.on("message", on_message)
+        router.on("message", on_message, room="ro.*")
+        router.emit("message", game, "hello")
+
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        return handled, reported
+
+    handled, reported = asyncio.run(emit())
+
+    assert handled == ["hello", "hello"]
+    assert [str(exception) for exception in reported] == ["hello"]
+    assert isinstance(reported[0], ValueError)
@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+
+from pymitter import EventEmitter
+
+from bonk_bot.Avatar import Avatar
+from bonk_bot.BonkBot import BonkBot
+from bonk_bot.EventRouter import EventRouter
+from bonk_bot.Game import Game
+from bonk_bot.Metrics import NullRegistry
+from bonk_bot.Types import Modes, Servers
+
+
+class LateSocketClient:
+    """Socket client that runs its connect handler after connect() returns, like python-socketio 4."""
+
+    def __init__(self) -> None:
+        self.sent = []
+        self.handlers = {}
+
+    def event(self, handler):
+        self.handlers[handler.__name__] = handler
+        return handler
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def connect(self, address):
+        asyncio.ensure_future(self.handlers["connect"]())
+
+    async def emit(self, event, data=None):
+        self.sent.append(event)
+
+    async def disconnect(self):
+        pass
+
+
+def test_queued_events_are_sent_after_room_is_confirmed():
+    async def connect():
+        bot = SimpleNamespace(
+            games=[],
+            event_emitter=EventEmitter(),
+            metrics=NullRegistry(),
+            profiler=None,
+            is_guest=True,
+            username="bot",
+            main_avatar=SimpleNamespace(json_data={}),
+            get_level=lambda: 0,
+            schedule_every=lambda *args, **kwargs: SimpleNamespace(cancel=lambda: None)
+        )
+        socket_client = LateSocketClient()
+        game = Game(
+            bot,
+            "room",
+            socket_client,
+            True,
+            Modes.Classic(),
+            True,
+            EventRouter(bot),
+            game_create_params=["room", 6, False, "", 0, 999, Servers.Warsaw()]
+        )
+        # Event that was queued while the game was disconnected
+        await game.send_message("hello")
+        connecting = asyncio.ensure_future(game.connect())
+
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        sent_before_confirmation = list(socket_client.sent)
+        await game.feed(2, 7, "address")
+        await connecting
+
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        return sent_before_confirmation, socket_client.sent
+
+    sent_before_confirmation, sent = asyncio.run(connect())
+
+    assert sent_before_confirmation == [12]
+    assert sent == [12, 10]
+
+
+def test_games_gauge_drops_game_after_leave():
+    async def connect_and_leave():
+        bot = BonkBot("bot", True, 0, None, Avatar({"layers": [], "bc": 4492031}), None)
+        registry = bot.enable_metrics()
+        game = Game(
+            bot,
+            "room",
+            LateSocketClient(),
+            True,
+            Modes.Classic(),
+            True,
+            bot.router,
+            game_create_params=["room", 6, False, "", 0, 999, Servers.Warsaw()]
+        )
+        connecting = asyncio.ensure_future(game.connect())
+
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        await game.feed(2, 7, "address")
+        await connecting
+        connected = registry.metrics["bonk_games"].samples()[0][2]
+
+        await game.leave()
+        bot.scheduler.stop()
+
+        return connected, registry.metrics["bonk_games"].samples()[0][2], bot.games
+
+    connected, left, games = asyncio.run(connect_and_leave())
+
+    assert connected == 1
+    assert left == 0
+    assert games == []
@@ -0,0 +1,65 @@
+import asyncio
+from types import SimpleNamespace
+
+import aiohttp
+import socketio
+from pymitter import EventEmitter
+
+from bonk_bot.EventRouter import EventRouter
+from bonk_bot.Game import Game
+from bonk_bot.Metrics import NullRegistry
+from bonk_bot.Types import Modes, Servers
+
+
+def offline_bot(post) -> SimpleNamespace:
+    return SimpleNamespace(
+        games=[],
+        event_emitter=EventEmitter(),
+        metrics=NullRegistry(),
+        profiler=None,
+        aiohttp_session=SimpleNamespace(post=post),
+        is_guest=True,
+        username="bot"
+    )
+
+
+def test_failed_room_lookup_is_retried_and_ends_with_disconnect():
+    lookups = []
+
+    def post(url, data):
+        lookups.append(data["id"])
+        raise aiohttp.ClientConnectionError("room address lookup is unreachable")
+
+    async def reconnect():
+        bot = offline_bot(post)
+        router = EventRouter(bot)
+        game = Game(
+            bot,
+            "room",
+            socketio.AsyncClient(),
+            True,
+            Modes.Classic(),
+            True,
+            router,
+            game_create_params=["room", 6, False, "", 0, 999, Servers.Warsaw()]
+        )
+        game.reconnect_attempts = 3
+        game.reconnect_base_delay = 0
+        disconnects = []
+        router.on("game_disconnect", lambda game: disconnects.append(game))
+
+        await game.start_offline()
+        # Server confirms the created room with its room list ID, then bot hands host away
+        await game.feed(2, 7, "address")
+        game.is_host = False
+
+        await game._Game__reconnect()
+        await asyncio.wait_for(game.wait(), 1)
+
+        return disconnects
+
+    disconnects = asyncio.run(reconnect())
+
+    # Bot that isn't host rejoins its room instead of creating a new one, every attempt looks up the room address
+    assert lookups == [7, 7, 7]
+    assert len(disconnects) == 1
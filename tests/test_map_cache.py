@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+from pymitter import EventEmitter
+
+from bonk_bot.EventRouter import EventRouter
+from bonk_bot.Game import Game
+from bonk_bot.MapCache import MapCache
+from bonk_bot.MapData import MapData
+from bonk_bot.Metrics import NullRegistry
+from bonk_bot.Types import Modes
+
+
+def test_put_doesnt_count_lookups():
+    cache = MapCache()
+    cache.put(1, "map")
+    cache.put(1, "map")
+
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["misses"] == 0
+    assert cache.get(1) == "map"
+    assert cache.get(2) is None
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_disk_store_is_read_between_runs(tmp_path):
+    path = str(tmp_path / "maps.sqlite")
+
+    async def put_maps():
+        cache = MapCache(path=path)
+
+        for map_id in range(100):
+            cache.put(map_id, f"map{map_id}")
+
+        # Writes are done in the executor, the maps are readable before they are written
+        assert await cache.load(5) == "map5"
+
+        await asyncio.sleep(0.1)
+        cache.close()
+
+    asyncio.run(put_maps())
+
+    async def load_maps():
+        cache = MapCache(path=path)
+        maps = [await cache.load(map_id) for map_id in (0, 99, 100)]
+        cache.close()
+
+        return maps, cache.stats()
+
+    maps, stats = asyncio.run(load_maps())
+
+    assert maps == ["map0", "map99", None]
+    assert (stats["disk_hits"], stats["misses"]) == (2, 1)
+
+
+def test_close_writes_unsaved_maps(tmp_path):
+    path = str(tmp_path / "maps.sqlite")
+
+    async def put_map():
+        cache = MapCache(path=path)
+        cache.put(1, "map")
+        cache.close()
+
+    asyncio.run(put_map())
+
+    assert MapCache(path=path).get(1) == "map"
+
+
+def test_set_map_by_id_counts_store_lookups(tmp_path):
+    path = str(tmp_path / "maps.sqlite")
+    encoded = MapData(meta={"n": "cached"}).encode()
+    cache = MapCache(path=path)
+    cache.put(7, encoded)
+    cache.close()
+
+    async def set_map():
+        bot = SimpleNamespace(
+            games=[],
+            event_emitter=EventEmitter(),
+            metrics=NullRegistry(),
+            profiler=None,
+            map_cache=MapCache(path=path)
+        )
+        game = Game(bot, "room", None, True, Modes.Classic(), True, EventRouter(bot))
+
+        # Map is read from the sqlite store first and from memory after that
+        await game.set_map(7)
+        first = bot.map_cache.stats()
+        await game.set_map(7)
+        bot.map_cache.close()
+
+        return first, bot.map_cache.stats(), game.map_data
+
+    first, second, map_data = asyncio.run(set_map())
+
+    assert (first["hits"], first["disk_hits"], first["misses"]) == (1, 1, 0)
+    assert (second["hits"], second["disk_hits"], second["misses"]) == (2, 1, 0)
+    assert map_data.meta["n"] == "cached"
@@ -0,0 +1,17 @@
+import base64
+
+import pytest
+
+from bonk_bot.LZString import compress_to_encoded_uri_component, decompress_from_encoded_uri_component
+from bonk_bot.MapData import MapData, MapDecodeError, decode_map
+
+
+def test_truncated_physics_raises_on_every_access():
+    raw = base64.b64decode(decompress_from_encoded_uri_component(MapData(meta={"n": "truncated"}).encode()))
+    truncated = decode_map(compress_to_encoded_uri_component(base64.b64encode(raw[:-3]).decode()))
+
+    for _ in range(2):
+        with pytest.raises(MapDecodeError):
+            truncated.shapes
+
+    assert not truncated.is_physics_decoded
@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+from bonk_bot.MessageHistory import MessageHistory
+
+
+def make_history(count: int, max_size: int = 500) -> MessageHistory:
+    history = MessageHistory(max_size)
+
+    for index in range(count):
+        history.append(SimpleNamespace(content=str(index), author=SimpleNamespace(username="player"), timestamp=index))
+
+    return history
+
+
+def contents(messages) -> list:
+    return [message.content for message in messages]
+
+
+def test_slices_match_list_slices():
+    history = make_history(20)
+    expected = [str(index) for index in range(20)]
+
+    for index in (slice(-10, None), slice(None, 5), slice(3, 8), slice(None, None, 2), slice(None, None, -1),
+                  slice(15, 5, -3), slice(8, 3), slice(100, None), slice(-100, 2)):
+        assert contents(history[index]) == expected[index]
+
+
+def test_slices_after_old_messages_are_dropped():
+    history = make_history(30, max_size=10)
+
+    assert contents(history[-3:]) == ["27", "28", "29"]
+    assert history[0].content == "20"
+    assert history[-1].content == "29"
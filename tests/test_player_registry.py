@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+from bonk_bot.PlayerRegistry import PlayerRegistry
+
+
+def player(short_id: int, username: str) -> SimpleNamespace:
+    return SimpleNamespace(short_id=short_id, peer_id=f"peer{short_id}", username=username, is_bot=False)
+
+
+def test_iteration_survives_joins_and_leaves():
+    registry = PlayerRegistry()
+    players = [player(short_id, f"player{short_id}") for short_id in range(5)]
+
+    for item in players:
+        registry.add(item)
+
+    seen = []
+
+    for item in registry.view:
+        seen.append(item)
+        registry.remove(players[4])
+        registry.add(player(10 + len(seen), "late"))
+
+    assert seen == players
+    assert len(registry.view) == 4 + len(seen)
+
+
+def test_view_behaves_like_list():
+    registry = PlayerRegistry()
+    players = [player(short_id, f"player{short_id}") for short_id in range(5)]
+
+    for item in players:
+        registry.add(item)
+
+    registry.remove(players[1])
+    players.remove(players[1])
+
+    assert list(registry.view) == players
+    assert registry.view[-1] is players[-1]
+    assert registry.view[1:3] == players[1:3]
+    assert registry.view.index(players[2]) == 2
+    assert registry.view.count(players[2]) == 1
+    assert players[0] in registry.view
+
+
+def test_players_with_same_username():
+    registry = PlayerRegistry()
+    first, second = player(1, "Guest"), player(2, "Guest")
+    registry.add(first)
+    registry.add(second)
+
+    assert registry.get_by_username("Guest") is first
+    assert registry.get_all_by_username("Guest") == [first, second]
+
+    registry.remove(first)
+
+    assert registry.get_by_username("Guest") is second
+
+    registry.remove(second)
+
+    assert registry.get_by_username("Guest") is None
+    assert registry.get_all_by_username("Guest") == []
@@ -0,0 +1,22 @@
+import pytest
+
+from bonk_bot.Types import TEAMS_BY_NUMBER, Modes, Teams
+
+
+def test_interned_types_are_singletons():
+    assert Teams.Red() is Teams.Red()
+    assert TEAMS_BY_NUMBER[2] is Teams.Red()
+
+
+@pytest.mark.parametrize("statement", [
+    "Teams.Red.number = 7",
+    "Teams.Red().number = 7",
+    "del Modes.Classic.name",
+    "Modes.Classic._instance = None"
+])
+def test_interned_types_are_immutable(statement):
+    with pytest.raises(AttributeError):
+        exec(statement)
+
+    assert Teams.Red.number == 2
+    assert Modes.Classic.name == "Classic"